@@ -6,11 +6,12 @@ import re
 import secrets
 import shlex
 import shutil
+import socket
 import subprocess
 import time
 import hashlib
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import List, Optional
 
 try:  # Camilla v3 exposes control API over WebSocket
     import websockets
@@ -19,12 +20,22 @@ except ImportError:  # pragma: no cover - optional dependency
     websockets = None  # type: ignore
     ws_exceptions = None  # type: ignore
 
+try:  # Zero-configuration announcement so controllers can find us without scanning
+    from zeroconf import IPVersion, ServiceInfo
+    from zeroconf.asyncio import AsyncZeroconf
+except ImportError:  # pragma: no cover - optional dependency
+    AsyncZeroconf = None  # type: ignore
+    IPVersion = None  # type: ignore
+    ServiceInfo = None  # type: ignore
+
 from fastapi import FastAPI, HTTPException, Request
 from pydantic import BaseModel, Field
 
 
-AGENT_VERSION = os.getenv("AGENT_VERSION", "0.3.23")
+AGENT_VERSION = os.getenv("AGENT_VERSION", "0.3.29")
 MIXER_CONTROL = os.getenv("MIXER_CONTROL", "Master")
+AMIXER_BIN = os.getenv("AMIXER_BIN", "amixer")
+MIXER_ACK_TIMEOUT = float(os.getenv("MIXER_ACK_TIMEOUT", "2"))
 MIXER_FALLBACKS = [
     MIXER_CONTROL,
     "Master",
@@ -62,6 +73,9 @@ UPDATE_COMMAND = os.getenv("ROOMCAST_UPDATE_COMMAND", "sudo /usr/local/bin/roomc
 UPDATE_COMMAND_ARGS = shlex.split(UPDATE_COMMAND) if UPDATE_COMMAND else []
 RESTART_COMMAND = os.getenv("ROOMCAST_RESTART_COMMAND", "sudo /sbin/reboot")
 RESTART_COMMAND_ARGS = shlex.split(RESTART_COMMAND) if RESTART_COMMAND else []
+AGENT_PORT = int(os.getenv("AGENT_PORT", "9700"))
+MDNS_ENABLED = os.getenv("AGENT_MDNS_ENABLED", "1").lower() not in {"0", "false", "no"}
+MDNS_SERVICE_TYPE = "_roomcast._tcp.local."
 
 app = FastAPI(title="RoomCast Node Agent", version=AGENT_VERSION)
 
@@ -79,6 +93,8 @@ snapclient_lock = asyncio.Lock()
 
 recovery_state: dict = {}
 recovery_task: asyncio.Task | None = None
+mdns_zeroconf = None
+mdns_service = None
 
 
 def _normalize_eq_max_bands(value: int) -> int:
@@ -555,6 +571,8 @@ async def _restart_camilla_service() -> None:
         await loop.run_in_executor(None, _restart_camilla_service_sync)
     except subprocess.CalledProcessError as exc:
         raise HTTPException(status_code=500, detail=exc.stderr.decode() or str(exc))
+    finally:
+        await camilla.reset()
 
 
 async def _set_playback_device(device: str) -> dict:
@@ -589,9 +607,7 @@ def _list_mixer_controls() -> list[str]:
         return [MIXER_CONTROL]
     card = _current_playback_card()
     try:
-        args = ["amixer"]
-        if card:
-            args.extend(["-c", card])
+        args = _amixer_base_args(card)
         args.append("scontrols")
         proc = subprocess.run(
             args,
@@ -643,38 +659,335 @@ def _mixer_candidate_order() -> list[str]:
     return candidates
 
 
-def _try_mixer_command(builder: Callable[[str], list[str]]) -> None:
+def _amixer_base_args(card: Optional[str]) -> list[str]:
+    args = [AMIXER_BIN]
+    if card:
+        args.extend(["-c", card])
+    return args
+
+
+def _parse_mixer_capabilities(output: str) -> set[str]:
+    for line in output.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("Capabilities:"):
+            return set(stripped.split(":", 1)[1].split())
+    return set()
+
+
+def _resolve_mixer_control(card: Optional[str]) -> tuple[str, set[str]]:
+    global _resolved_control
     last_error: Optional[str] = None
-    card = _current_playback_card()
     for control in _mixer_candidate_order():
-        args = ["amixer"]
-        if card:
-            args.extend(["-c", card])
-        args.extend(builder(control))
         try:
-            subprocess.run(
-                args,
+            proc = subprocess.run(
+                _amixer_base_args(card) + ["sget", control],
                 check=True,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
             )
         except FileNotFoundError:
-            raise HTTPException(status_code=500, detail="amixer not installed")
+            raise RuntimeError("amixer not installed")
         except subprocess.CalledProcessError as exc:
             detail = exc.stderr.decode(errors="ignore") or str(exc)
-            log.warning("Mixer control '%s' failed via amixer: %s", control, detail.strip() or detail)
+            log.warning("Mixer control '%s' unavailable via amixer: %s", control, detail.strip() or detail)
             last_error = detail
             continue
-        global _resolved_control
         _resolved_control = control
-        return
+        return control, _parse_mixer_capabilities(proc.stdout.decode(errors="ignore"))
+    raise RuntimeError(last_error or "Unable to control mixer. Set MIXER_CONTROL to a valid ALSA control.")
+
+
+class MixerBackend:
+    """Applies volume and mute through one long-lived ``amixer -s`` process.
+
+    Requests are merged per kind, so a slider drag only applies the latest value.
+    Every submission gets a future that resolves once amixer echoes the new
+    control state, so callers still see failures instead of a silent ok.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[str, tuple[object, asyncio.Future]] = {}
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._proc_card: Optional[str] = None
+        self._stderr_task: asyncio.Task | None = None
+        self._control: Optional[str] = None
+        self._control_card: Optional[str] = None
+        self._caps: set[str] = set()
+        self._idle: asyncio.Event | None = None
+        self._last_error: Optional[str] = None
+        self.stats = {"submitted": 0, "merged": 0, "applied": 0, "failed": 0, "spawned": 0}
+
+    def submit(self, kind: str, value: object) -> asyncio.Future:
+        self.stats["submitted"] += 1
+        previous = self._pending.pop(kind, None)
+        if previous is not None:
+            # Superseded callers share the outcome of the value that is actually applied.
+            self.stats["merged"] += 1
+            future = previous[1]
+        else:
+            future = asyncio.get_running_loop().create_future()
+        # Re-insert so pending commands keep the order they were last requested in.
+        self._pending[kind] = (value, future)
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+        self._idle.clear()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+        return future
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "pending": len(self._pending),
+            "control": self._control,
+            "persistent": bool(self._proc and self._proc.returncode is None),
+        }
+
+    async def drain(self, timeout: float = 2.0) -> None:
+        if self._idle is None or not self._task or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            log.warning("Mixer commands still pending after %ss", timeout)
 
-    raise HTTPException(
-        status_code=500,
-        detail=last_error or "Unable to control mixer. Set MIXER_CONTROL to a valid ALSA control.",
+    async def close(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        for _, future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("mixer shutting down"))
+        self._pending.clear()
+        await self._stop_process()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None and self._idle is not None
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                kind = next(iter(self._pending))
+                value, future = self._pending.pop(kind)
+                try:
+                    if kind == "volume":
+                        await self._apply_volume(int(value))
+                    elif kind == "mute":
+                        await self._apply_mute(bool(value))
+                except Exception as exc:  # pragma: no cover - hardware path
+                    self.stats["failed"] += 1
+                    log.warning("Failed to apply mixer %s=%s: %s", kind, value, exc)
+                    if not future.done():
+                        future.set_exception(exc)
+                else:
+                    self.stats["applied"] += 1
+                    if not future.done():
+                        future.set_result(None)
+            self._idle.set()
+
+    async def _apply_volume(self, percent: int) -> None:
+        if DRY_RUN:
+            return
+        control = await self._ensure_control()
+        await self._send(f"sset '{control}' {max(0, min(100, percent))}%")
+
+    async def _apply_mute(self, muted: bool) -> None:
+        global pre_mute_volume
+        target = _effective_volume(last_requested_volume)
+        if DRY_RUN:
+            pre_mute_volume = target if muted else None
+            return
+        control = await self._ensure_control()
+        if self._caps & {"pswitch", "switch"}:
+            await self._send(f"sset '{control}' {'mute' if muted else 'unmute'}")
+            pre_mute_volume = target if muted else None
+            return
+        log.info("Mixer control '%s' has no mute switch; falling back to volume control", control)
+        if muted:
+            pre_mute_volume = target
+            await self._apply_volume(0)
+        else:
+            restored = pre_mute_volume if pre_mute_volume is not None else target
+            pre_mute_volume = None
+            await self._apply_volume(restored)
+
+    async def _ensure_control(self) -> str:
+        card = _current_playback_card()
+        if self._control and self._control_card == card:
+            return self._control
+        loop = asyncio.get_running_loop()
+        control, caps = await loop.run_in_executor(None, _resolve_mixer_control, card)
+        self._control, self._control_card, self._caps = control, card, caps
+        return control
+
+    async def _ensure_process(self) -> asyncio.subprocess.Process:
+        card = _current_playback_card()
+        if self._proc and self._proc.returncode is None and self._proc_card == card:
+            return self._proc
+        await self._stop_process()
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *_amixer_base_args(card),
+                "-M",
+                "-s",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            raise RuntimeError("amixer not installed")
+        self._proc, self._proc_card = proc, card
+        self._stderr_task = asyncio.create_task(self._watch_stderr(proc))
+        self.stats["spawned"] += 1
+        return proc
+
+    async def _send(self, line: str) -> None:
+        # A write can land in the pipe buffer of a process that is already dying, so
+        # only the echoed control state confirms the command; otherwise restart once.
+        for attempt in range(2):
+            proc = await self._ensure_process()
+            assert proc.stdin is not None
+            self._last_error = None
+            try:
+                proc.stdin.write(f"{line}\n".encode())
+                await proc.stdin.drain()
+                await asyncio.wait_for(self._read_ack(proc), timeout=MIXER_ACK_TIMEOUT)
+                return
+            except (BrokenPipeError, ConnectionResetError):
+                await self._stop_process()
+                if attempt:
+                    raise RuntimeError(self._last_error or "amixer exited unexpectedly")
+            except asyncio.TimeoutError:
+                await self._stop_process()
+                if attempt:
+                    raise RuntimeError(self._last_error or "amixer did not confirm the command")
+
+    async def _read_ack(self, proc: asyncio.subprocess.Process) -> None:
+        assert proc.stdout is not None
+        while True:
+            raw = await proc.stdout.readline()
+            if not raw:
+                raise ConnectionResetError("amixer exited")
+            # Each sset echoes a "Simple mixer control ..." header followed by indented
+            # detail lines; the header is the acknowledgement.
+            if not raw[:1].isspace():
+                return
+
+    async def _watch_stderr(self, proc: asyncio.subprocess.Process) -> None:
+        assert proc.stderr is not None
+        async for raw in proc.stderr:
+            message = raw.decode(errors="ignore").strip()
+            if not message:
+                continue
+            log.warning("amixer: %s", message)
+            self._last_error = message
+            # Re-resolve on the next command in case the control disappeared (e.g. output change).
+            self._control = None
+
+    async def _stop_process(self) -> None:
+        proc, self._proc = self._proc, None
+        if self._stderr_task and not self._stderr_task.done():
+            self._stderr_task.cancel()
+        self._stderr_task = None
+        if not proc or proc.returncode is not None:
+            return
+        if proc.stdin is not None:
+            proc.stdin.close()
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=2)
+        except asyncio.TimeoutError:  # pragma: no cover - hung amixer
+            proc.kill()
+            await proc.wait()
+
+
+mixer = MixerBackend()
+
+
+def _primary_ipv4_address() -> Optional[str]:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # No packets are sent; connecting a UDP socket only selects the outbound interface.
+        sock.connect(("10.255.255.255", 1))
+        address = sock.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        sock.close()
+    return None if address.startswith("127.") else address
+
+
+def _mdns_service_info():
+    address = _primary_ipv4_address()
+    if not address:
+        return None
+    return ServiceInfo(
+        MDNS_SERVICE_TYPE,
+        f"roomcast-{node_uid[:12]}.{MDNS_SERVICE_TYPE}",
+        port=AGENT_PORT,
+        parsed_addresses=[address],
+        properties={
+            "fingerprint": node_uid,
+            "version": AGENT_VERSION,
+            "paired": "1" if agent_secret else "0",
+        },
+        server=f"roomcast-{node_uid[:12]}.local.",
     )
 
 
+async def _start_mdns() -> None:
+    global mdns_zeroconf, mdns_service
+    if not MDNS_ENABLED or AsyncZeroconf is None or mdns_zeroconf is not None:
+        return
+    info = _mdns_service_info()
+    if info is None:
+        log.info("No routable IPv4 address; skipping mDNS announcement")
+        return
+    try:
+        zc = AsyncZeroconf(ip_version=IPVersion.V4Only)
+        await zc.async_register_service(info)
+    except Exception as exc:  # pragma: no cover - network edge
+        log.warning("Failed to announce %s via mDNS: %s", MDNS_SERVICE_TYPE, exc)
+        return
+    mdns_zeroconf, mdns_service = zc, info
+    log.info("Announced %s as %s", MDNS_SERVICE_TYPE, info.name)
+
+
+async def _refresh_mdns() -> None:
+    global mdns_service
+    if mdns_zeroconf is None:
+        return
+    info = _mdns_service_info()
+    if info is None:
+        return
+    try:
+        await mdns_zeroconf.async_update_service(info)
+        mdns_service = info
+    except Exception as exc:  # pragma: no cover - network edge
+        log.warning("Failed to update mDNS announcement: %s", exc)
+
+
+async def _stop_mdns() -> None:
+    global mdns_zeroconf, mdns_service
+    zc, mdns_zeroconf = mdns_zeroconf, None
+    if zc is None:
+        return
+    try:
+        if mdns_service is not None:
+            await zc.async_unregister_service(mdns_service)
+        await zc.async_close()
+    except Exception as exc:  # pragma: no cover - network edge
+        log.warning("Failed to withdraw mDNS announcement: %s", exc)
+    mdns_service = None
+
+
 def _snapclient_args(config: dict) -> list[str]:
     host = config.get("snapserver_host")
     port = int(config.get("snapserver_port", SNAPCLIENT_DEFAULT_PORT))
@@ -790,12 +1103,32 @@ class StereoModePayload(BaseModel):
     mode: str = Field(default="both")
 
 
+class CamillaUnsupportedCommand(RuntimeError):
+    """Camilla does not know the command at all (an older build), as opposed to rejecting its arguments."""
+
+
 class CamillaController:
+    """Keeps one control connection to CamillaDSP and pushes only changed EQ bands.
+
+    Filter parameters are cached after the first ``GetConfigJson``; later updates
+    are sent as ``PatchConfig`` with just the filters that differ, falling back to
+    a full ``SetConfigJson`` on Camilla builds without patch support. Concurrent
+    ``apply_eq`` calls are merged so only the latest request is pushed.
+    """
+
     def __init__(self, host: str, port: int, filter_path: str) -> None:
         self.host = host
         self.port = port
         self.filter_path = filter_path
         self._ws_uri = f"ws://{self.host}:{self.port}"
+        self._ws = None
+        self._io_lock = asyncio.Lock()
+        self._apply_lock = asyncio.Lock()
+        self._desired: tuple[list[tuple[float, float, float]], int] | None = None
+        self._last_error: BaseException | None = None
+        self._filters: dict[str, tuple[float, float, float]] | None = None
+        self._patch_supported = True
+        self.stats = {"requested": 0, "merged": 0, "patched": 0, "full_updates": 0, "unchanged": 0, "bands_sent": 0}
 
     # Camilla v3 exposes single filters, so we need a predictable per-slot path.
     def _filter_path_for_slot(self, slot: int) -> str:
@@ -835,8 +1168,6 @@ class CamillaController:
     async def apply_eq(self, bands: List[EqBand], target_slots: int) -> None:
         if not CAMILLA_ENABLED:
             return
-        config = await self._get_config_json()
-        filters = config.setdefault("filters", {})
         slots = max(1, min(CAMILLA_MAX_BANDS, target_slots))
         normalized: list[tuple[float, float, float]] = []
         for band in bands[:slots]:
@@ -849,35 +1180,104 @@ class CamillaController:
                 gain = float(getattr(band, "gain", 0.0))
                 q_val = float(getattr(band, "q", 1.0))
             normalized.append((freq, gain, q_val))
-
-        def _upsert_filter(name: str) -> dict:
-            entry = filters.setdefault(name, {})
-            entry["type"] = "Biquad"
-            params = entry.setdefault("parameters", {})
-            params["type"] = "Peaking"
-            return params
-
-        for idx in range(slots):
+        self.stats["requested"] += 1
+        self._desired = (normalized, slots)
+        async with self._apply_lock:
+            desired, self._desired = self._desired, None
+            if desired is None:
+                # A newer request already pushed while we waited; report its outcome.
+                self.stats["merged"] += 1
+                if self._last_error is not None:
+                    raise self._last_error
+                return
+            try:
+                await self._push_eq(*desired)
+            except BaseException as exc:
+                self._last_error = exc
+                self._filters = None
+                raise
+            self._last_error = None
+
+    async def reset(self) -> None:
+        """Drop the connection and cached filters, e.g. after Camilla restarts."""
+        self._filters = None
+        self._patch_supported = True
+        async with self._io_lock:
+            await self._close_ws()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "connected": self._ws is not None, "patch_supported": self._patch_supported}
+
+    def _target_filters(
+        self, normalized: list[tuple[float, float, float]], slots: int, current: dict[str, tuple[float, float, float]]
+    ) -> dict[str, tuple[float, float, float]]:
+        target: dict[str, tuple[float, float, float]] = {}
+        for idx in range(CAMILLA_MAX_BANDS):
             name = self._filter_name_for_slot(idx)
-            params = _upsert_filter(name)
-            if idx < len(normalized):
-                freq, gain, q_val = normalized[idx]
+            if idx < slots and idx < len(normalized):
+                target[name] = normalized[idx]
+                continue
+            freq, _gain, q_val = current.get(name, (1000.0, 0.0, 1.0))
+            target[name] = (freq, 0.0, q_val)
+        return target
+
+    async def _push_eq(self, normalized: list[tuple[float, float, float]], slots: int) -> None:
+        if self._filters is None:
+            self._filters = self._filters_from_config(await self._get_config_json())
+        target = self._target_filters(normalized, slots, self._filters)
+        changed = {
+            name: params
+            for name, params in target.items()
+            if _rounded_band(self._filters.get(name)) != _rounded_band(params)
+        }
+        if not changed:
+            self.stats["unchanged"] += 1
+            return
+        if self._patch_supported:
+            patch = {"filters": {name: self._filter_entry(params) for name, params in changed.items()}}
+            try:
+                # PatchConfig takes the patch as a JSON object; only SetConfigJson wants a string.
+                await self._invoke("PatchConfig", patch)
+            except CamillaUnsupportedCommand as exc:
+                log.info("CamillaDSP PatchConfig unavailable (%s); using full config updates", exc)
+                self._patch_supported = False
+            except RuntimeError as exc:
+                # A rejected patch says nothing about later ones; only this update goes in full.
+                log.warning("CamillaDSP PatchConfig failed (%s); sending a full config update", exc)
             else:
-                freq = float(params.get("freq", 1000.0))
-                gain = 0.0
-                q_val = float(params.get("q", 1.0))
-            params["freq"] = freq
-            params["gain"] = gain
-            params["q"] = q_val
-
-        for idx in range(slots, CAMILLA_MAX_BANDS):
-            name = self._filter_name_for_slot(idx)
-            params = _upsert_filter(name)
-            params["freq"] = float(params.get("freq", 1000.0))
-            params["gain"] = 0.0
-            params["q"] = float(params.get("q", 1.0))
-
+                self.stats["patched"] += 1
+                self.stats["bands_sent"] += len(changed)
+                self._filters.update(changed)
+                return
+        config = await self._get_config_json()
+        filters = config.setdefault("filters", {})
+        for name, params in target.items():
+            filters[name] = self._filter_entry(params)
         await self._set_config_json(config)
+        self.stats["full_updates"] += 1
+        self.stats["bands_sent"] += len(target)
+        self._filters = self._filters_from_config(config)
+
+    @staticmethod
+    def _filter_entry(params: tuple[float, float, float]) -> dict:
+        freq, gain, q_val = params
+        return {"type": "Biquad", "parameters": {"type": "Peaking", "freq": freq, "gain": gain, "q": q_val}}
+
+    def _filters_from_config(self, config: dict) -> dict[str, tuple[float, float, float]]:
+        filters = config.get("filters") or {}
+        cached: dict[str, tuple[float, float, float]] = {}
+        for idx in range(CAMILLA_MAX_BANDS):
+            name = self._filter_name_for_slot(idx)
+            params = (filters.get(name) or {}).get("parameters") or {}
+            try:
+                cached[name] = (
+                    float(params.get("freq", 1000.0)),
+                    float(params.get("gain", 0.0)),
+                    float(params.get("q", 1.0)),
+                )
+            except (TypeError, ValueError):
+                continue
+        return cached
 
     def _parse_response(self, payload: str | bytes | bytearray, command: str) -> object | None:
         if isinstance(payload, (bytes, bytearray)):
@@ -890,6 +1290,9 @@ class CamillaController:
             detail = response["Invalid"]
             if isinstance(detail, dict):
                 detail = detail.get("error") or detail
+            # serde reports a command name it cannot map as "unknown variant `Name`".
+            if "unknown variant" in str(detail) and f"`{command}`" in str(detail):
+                raise CamillaUnsupportedCommand(f"Camilla does not support {command}: {detail}")
             raise RuntimeError(f"Camilla rejected command: {detail}")
         if command not in response:
             return response
@@ -907,11 +1310,30 @@ class CamillaController:
         if websockets is None:
             raise RuntimeError("websockets dependency missing; Camilla control unavailable")
         message = json.dumps({command: payload})
-        async with websockets.connect(self._ws_uri, ping_interval=None) as ws:
-            await ws.send(message)
-            response_line = await ws.recv()
+        async with self._io_lock:
+            for attempt in range(2):
+                try:
+                    if self._ws is None:
+                        self._ws = await websockets.connect(self._ws_uri, ping_interval=None)
+                    await self._ws.send(message)
+                    response_line = await self._ws.recv()
+                    break
+                except Exception as exc:
+                    await self._close_ws()
+                    # A stale socket fails on first use after Camilla restarts; retry once on a fresh one.
+                    if attempt or not _is_connection_error(exc):
+                        raise
         return self._parse_response(response_line, command)
 
+    async def _close_ws(self) -> None:
+        ws, self._ws = self._ws, None
+        if ws is None:
+            return
+        try:
+            await ws.close()
+        except Exception:  # pragma: no cover - already closed
+            pass
+
     async def _get_config_json(self) -> dict:
         raw = await self._invoke("GetConfigJson", None)
         if not isinstance(raw, str):
@@ -926,6 +1348,12 @@ class CamillaController:
         await self._invoke("SetConfigJson", serialized)
 
 
+def _rounded_band(params: tuple[float, float, float] | None) -> tuple[float, ...] | None:
+    if params is None:
+        return None
+    return tuple(round(value, 3) for value in params)
+
+
 camilla = CamillaController(CAMILLA_HOST, CAMILLA_PORT, CAMILLA_FILTER_PATH)
 camilla_retry_task: asyncio.Task | None = None
 camilla_pending_eq = False
@@ -1021,40 +1449,22 @@ def _auth(request: Request) -> None:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
 
-def _amixer_set(percent: int) -> None:
-    if DRY_RUN:
-        return
-    clamped = max(0, min(100, int(percent)))
-    _try_mixer_command(lambda control: ["-M", "set", control, f"{clamped}%"])
+async def _await_mixer(future: asyncio.Future) -> None:
+    # Shield the shared future: a disconnecting client must not cancel merged callers.
+    try:
+        await asyncio.wait_for(asyncio.shield(future), timeout=MIXER_ACK_TIMEOUT * 3)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=500, detail="Mixer command timed out")
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc))
 
 
-def _amixer_mute(muted: bool) -> None:
-    global pre_mute_volume
-    if DRY_RUN:
-        if muted:
-            pre_mute_volume = _effective_volume(last_requested_volume)
-        else:
-            pre_mute_volume = None
-        return
-    cmd = "mute" if muted else "unmute"
-    try:
-        _try_mixer_command(lambda control: ["-M", "set", control, cmd])
-        if muted:
-            pre_mute_volume = _effective_volume(last_requested_volume)
-        else:
-            pre_mute_volume = None
-        return
-    except HTTPException as exc:
-        log.info("Mute switch not available via amixer; falling back to volume control: %s", exc.detail)
+async def _amixer_set(percent: int) -> None:
+    await _await_mixer(mixer.submit("volume", max(0, min(100, int(percent)))))
 
-    target = _effective_volume(last_requested_volume)
-    if muted:
-        pre_mute_volume = target
-        _amixer_set(0)
-    else:
-        restored = pre_mute_volume if pre_mute_volume is not None else target
-        pre_mute_volume = None
-        _amixer_set(restored)
+
+async def _amixer_mute(muted: bool) -> None:
+    await _await_mixer(mixer.submit("mute", bool(muted)))
 
 
 async def _run_maintenance_command(args: list[str], label: str) -> None:
@@ -1105,6 +1515,8 @@ async def health() -> dict:
         "wifi": _wifi_signal_snapshot(),
         "eq_max_bands": EQ_MAX_ACTIVE_BANDS,
         "eq_active_bands": _count_active_eq_bands(eq_state.get("bands", [])),
+        "mixer": mixer.snapshot(),
+        "camilla": camilla.snapshot(),
     }
 
 
@@ -1134,6 +1546,7 @@ async def pair(request: Request, payload: PairPayload | None = None) -> dict:
 
     agent_secret = secrets.token_urlsafe(32)
     _persist_agent_secret(agent_secret)
+    await _refresh_mdns()
     return {"secret": agent_secret}
 
 
@@ -1164,7 +1577,7 @@ async def set_max_volume_limit(payload: VolumePayload, request: Request) -> dict
     agent_config["max_volume_percent"] = value
     _persist_agent_config(agent_config)
     effective = _effective_volume(last_requested_volume)
-    _amixer_set(effective)
+    await _amixer_set(effective)
     return {"ok": True, "max_volume_percent": value, "applied_volume": effective}
 
 
@@ -1188,7 +1601,7 @@ async def set_volume(payload: VolumePayload, request: Request) -> dict:
     requested = max(0, min(100, int(payload.percent)))
     last_requested_volume = requested
     effective = _effective_volume(requested)
-    _amixer_set(effective)
+    await _amixer_set(effective)
     return {
         "ok": True,
         "requested": requested,
@@ -1202,7 +1615,7 @@ async def set_mute(payload: MutePayload, request: Request) -> dict:
     _auth(request)
     global muted_state
     muted_state = payload.muted
-    _amixer_mute(payload.muted)
+    await _amixer_mute(payload.muted)
     return {"ok": True, "muted": muted_state}
 
 
@@ -1342,6 +1755,7 @@ async def on_startup() -> None:
 
     await _ensure_camilla_config_current()
     await _reconcile_snapclient()
+    await _start_mdns()
 
 
 @app.on_event("shutdown")
@@ -1349,10 +1763,14 @@ async def on_shutdown() -> None:
     global recovery_task
     if recovery_task and not recovery_task.done():
         recovery_task.cancel()
+    await mixer.drain()
+    await mixer.close()
+    await camilla.reset()
+    await _stop_mdns()
     await _stop_snapclient()
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=9700)
+    uvicorn.run(app, host="0.0.0.0", port=AGENT_PORT)
@@ -0,0 +1,87 @@
+"""Mixer throughput benchmark for the node agent.
+
+Runs without ALSA hardware: a stub ``amixer`` that accepts the same arguments is
+placed on a temporary path, so the numbers compare process-management overhead
+only. Usage: ``python bench_mixer.py [count]``.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+STUB = """#!/bin/sh
+case " $* " in *" -s "*) while read -r _; do echo "Simple mixer control 'Master',0"; done; exit 0;; esac
+case " $* " in *" sget "*) echo "  Capabilities: pvolume pswitch";; esac
+exit 0
+"""
+
+
+def _prepare_env(root: Path) -> Path:
+    stub = root / "amixer"
+    stub.write_text(STUB)
+    stub.chmod(0o755)
+    os.environ.update(
+        {
+            "AMIXER_BIN": str(stub),
+            "AGENT_DRY_RUN": "0",
+            "CAMILLA_ENABLED": "0",
+            "NODE_UID_PATH": str(root / "node-uid"),
+            "AGENT_SECRET_PATH": str(root / "agent-secret"),
+            "AGENT_CONFIG_PATH": str(root / "agent-config.json"),
+            "RECOVERY_CODE_PATH": str(root / "recovery-code.json"),
+        }
+    )
+    return stub
+
+
+def _bench_fork_per_command(stub: Path, count: int) -> float:
+    start = time.perf_counter()
+    for idx in range(count):
+        subprocess.run(
+            [str(stub), "-M", "set", "Master", f"{idx % 101}%"],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    return count / (time.perf_counter() - start)
+
+
+async def _bench_backend(count: int, *, burst: bool) -> tuple[float, dict]:
+    import agent
+
+    backend = agent.MixerBackend()
+    agent.mixer = backend
+    start = time.perf_counter()
+    pending = []
+    for idx in range(count):
+        if burst:
+            pending.append(backend.submit("volume", idx % 101))
+            await asyncio.sleep(0)
+        else:
+            await agent._amixer_set(idx % 101)
+    await asyncio.gather(*pending)
+    rate = count / (time.perf_counter() - start)
+    stats = backend.snapshot()
+    await backend.close()
+    return rate, stats
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as tmp:
+        stub = _prepare_env(Path(tmp))
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        before = _bench_fork_per_command(stub, count)
+        sequential, seq_stats = asyncio.run(_bench_backend(count, burst=False))
+        burst, burst_stats = asyncio.run(_bench_backend(count, burst=True))
+    print(f"fork per command:         {before:10.0f} cmds/s")
+    print(f"persistent, sequential:   {sequential:10.0f} cmds/s (applied {seq_stats['applied']})")
+    print(f"persistent, slider burst: {burst:10.0f} cmds/s (applied {burst_stats['applied']}, merged {burst_stats['merged']})")
+
+
+if __name__ == "__main__":
+    main()
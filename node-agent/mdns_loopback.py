@@ -0,0 +1,84 @@
+"""mDNS loopback check for the controller's node index.
+
+Announces a ``_roomcast._tcp`` service on 127.0.0.1 the way the agent does and
+asserts that ``NodeMdnsIndex`` (server/services/node_mdns.py) resolves it, picks
+up a TXT change and forgets it after the announcement is withdrawn. Needs no
+network beyond loopback multicast. Usage: ``python mdns_loopback.py [timeout]``.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from zeroconf import IPVersion, ServiceInfo
+from zeroconf.asyncio import AsyncZeroconf
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "server"))
+
+from services.node_mdns import ROOMCAST_SERVICE_TYPE, NodeMdnsIndex  # noqa: E402
+
+LOOPBACK = "127.0.0.1"
+FINGERPRINT = "loopback-check-0123456789"
+PORT = 9799
+
+
+def _service_info(*, version: str, paired: bool) -> ServiceInfo:
+    return ServiceInfo(
+        ROOMCAST_SERVICE_TYPE,
+        f"roomcast-{FINGERPRINT[:12]}.{ROOMCAST_SERVICE_TYPE}",
+        port=PORT,
+        parsed_addresses=[LOOPBACK],
+        properties={"fingerprint": FINGERPRINT, "version": version, "paired": "1" if paired else "0"},
+        server=f"roomcast-{FINGERPRINT[:12]}.local.",
+    )
+
+
+async def _wait_for(label: str, predicate, timeout: float) -> float:
+    start = time.perf_counter()
+    while not predicate():
+        if time.perf_counter() - start > timeout:
+            raise AssertionError(f"timed out after {timeout}s waiting for {label}")
+        await asyncio.sleep(0.05)
+    return time.perf_counter() - start
+
+
+async def _run(timeout: float) -> None:
+    index = NodeMdnsIndex(interfaces=[LOOPBACK])
+    announcer = AsyncZeroconf(interfaces=[LOOPBACK], ip_version=IPVersion.V4Only)
+    await index.start()
+    try:
+        info = _service_info(version="0.0.1", paired=False)
+        await announcer.async_register_service(info)
+        took = await _wait_for("resolve", lambda: index.lookup(FINGERPRINT) is not None, timeout)
+        entry = index.lookup(FINGERPRINT)
+        assert entry["host"] == LOOPBACK, entry
+        assert entry["url"] == f"http://{LOOPBACK}:{PORT}", entry
+        assert entry["version"] == "0.0.1" and entry["paired"] is False, entry
+        print(f"resolved:     {took * 1000:7.0f} ms")
+
+        info = _service_info(version="0.0.2", paired=True)
+        await announcer.async_update_service(info)
+        took = await _wait_for(
+            "TXT update", lambda: (index.lookup(FINGERPRINT) or {}).get("version") == "0.0.2", timeout
+        )
+        assert index.lookup(FINGERPRINT)["paired"] is True
+        print(f"txt update:   {took * 1000:7.0f} ms")
+
+        await announcer.async_unregister_service(info)
+        took = await _wait_for("removal", lambda: index.lookup(FINGERPRINT) is None, timeout)
+        assert not index.entries()
+        print(f"unregistered: {took * 1000:7.0f} ms")
+    finally:
+        await announcer.async_close()
+        await index.stop()
+
+
+def main() -> None:
+    timeout = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    asyncio.run(_run(timeout))
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
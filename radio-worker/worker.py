@@ -2,11 +2,15 @@
 import asyncio
 import logging
 import os
+import random
 import signal
 import stat
-from dataclasses import dataclass
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, Optional
+from urllib.parse import urljoin
 
 import httpx
 
@@ -14,7 +18,28 @@ POLL_INTERVAL = int(os.getenv("RADIO_ASSIGNMENT_INTERVAL", "10"))
 CONTROLLER_BASE_URL = os.getenv("CONTROLLER_BASE_URL", "http://localhost:8000").rstrip("/")
 RADIO_WORKER_TOKEN = os.getenv("RADIO_WORKER_TOKEN", "")
 FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
-STARTUP_DELAY = int(os.getenv("RADIO_RESTART_DELAY", "5"))
+RESTART_DELAY = float(os.getenv("RADIO_RESTART_DELAY", "5"))
+RESTART_MAX_DELAY = float(os.getenv("RADIO_RESTART_MAX_DELAY", "60"))
+CONNECT_TIMEOUT = float(os.getenv("RADIO_CONNECT_TIMEOUT", "20"))
+STALL_TIMEOUT = float(os.getenv("RADIO_STALL_TIMEOUT", "6"))
+STATUS_INTERVAL = float(os.getenv("RADIO_STATUS_INTERVAL", "15"))
+# A run that delivered audio for this long resets the restart backoff.
+STABLE_AFTER = 30.0
+OUTPUT_RATE = int(os.getenv("RADIO_OUTPUT_RATE", "48000"))
+FRAME_BYTES = 4  # s16le stereo
+BYTES_PER_SECOND = OUTPUT_RATE * FRAME_BYTES
+# Audio a playing channel's decoder may hold while the FIFO reader lags behind.
+ACTIVE_BUFFER_SECONDS = 10.0
+WARM_TUNERS = int(os.getenv("RADIO_WARM_TUNERS", "0"))
+WARM_BUFFER_SECONDS = float(os.getenv("RADIO_WARM_BUFFER_SECONDS", "3"))
+WARM_MAX_KBPS = int(os.getenv("RADIO_WARM_MAX_KBPS", "512"))
+WARM_MAX_MEMORY_MB = float(os.getenv("RADIO_WARM_MAX_MEMORY_MB", "128"))
+# Rough resident size of one idle ffmpeg decoder, counted against the memory budget.
+DECODER_OVERHEAD_MB = 20.0
+# Assumed for standby stations whose bitrate the directory does not list.
+DEFAULT_STATION_KBPS = 128
+RESOLVE_TTL = float(os.getenv("RADIO_RESOLVE_TTL", "3600"))
+RESOLVE_TIMEOUT = float(os.getenv("RADIO_RESOLVE_TIMEOUT", "5"))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
 logging.basicConfig(level=LOG_LEVEL, format="[%(asctime)s] %(levelname)s %(name)s: %(message)s")
@@ -29,6 +54,8 @@ class Assignment:
     stream_url: Optional[str]
     station_id: Optional[str]
     playback_enabled: bool
+    bitrate: Optional[int] = None
+    fallback_url: Optional[str] = None
 
     @classmethod
     def from_dict(cls, data: dict) -> "Assignment":
@@ -50,9 +77,18 @@ class Assignment:
             stream_url=stream_url,
             station_id=data.get("station_id"),
             playback_enabled=playback_enabled,
+            bitrate=_optional_int(data.get("bitrate")),
+            fallback_url=(data.get("fallback_url") or "").strip() or None,
         )
 
 
+def _optional_int(value) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 class ControllerClient:
     def __init__(self) -> None:
         self._client = httpx.AsyncClient(base_url=CONTROLLER_BASE_URL, timeout=15)
@@ -65,7 +101,11 @@ class ControllerClient:
             headers["X-Radio-Worker-Token"] = RADIO_WORKER_TOKEN
         return headers
 
-    async def fetch_assignments(self, since: Optional[int] = None, wait: int = POLL_INTERVAL) -> tuple[list[Assignment], Optional[int]]:
+    async def fetch_assignments(
+        self,
+        since: Optional[int] = None,
+        wait: int = POLL_INTERVAL,
+    ) -> tuple[list[Assignment], Optional[int], list[tuple[str, Optional[int]]]]:
         params = {}
         if since is not None:
             params["since"] = since
@@ -84,12 +124,26 @@ class ControllerClient:
             version = int(version_raw)
         except (TypeError, ValueError):
             version = None
-        return assignments, version
-
-    async def send_status(self, channel_id: str, state: str, *, message: Optional[str] = None, metadata: Optional[dict] = None) -> None:
+        standby = []
+        for entry in payload.get("standby") or []:
+            if isinstance(entry, dict) and (entry.get("stream_url") or "").strip():
+                standby.append((entry["stream_url"].strip(), _optional_int(entry.get("bitrate"))))
+        return assignments, version, standby
+
+    async def send_status(
+        self,
+        channel_id: str,
+        state: str,
+        *,
+        message: Optional[str] = None,
+        bitrate: Optional[int] = None,
+        metadata: Optional[dict] = None,
+    ) -> None:
         body = {"state": state}
         if message:
             body["message"] = message[:480]
+        if bitrate is not None:
+            body["bitrate"] = max(0, min(1536, bitrate))
         if metadata is not None:
             body["metadata"] = metadata
         endpoint = f"/api/radio/worker/status/{channel_id}"
@@ -103,13 +157,527 @@ class ControllerClient:
         await self._client.aclose()
 
 
+_PLAYLIST_TYPES = {
+    "audio/x-scpls",
+    "application/pls+xml",
+    "audio/x-mpegurl",
+    "audio/mpegurl",
+    "application/x-mpegurl",
+    "application/vnd.apple.mpegurl",
+}
+
+
+def _playlist_entries(text: str, base_url: str) -> Optional[list[str]]:
+    """Stream URLs listed in a .pls or .m3u body; None for HLS, which ffmpeg plays itself."""
+    if "#EXT-X-" in text:
+        return None
+    entries = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", "[")):
+            continue
+        key, sep, value = line.partition("=")
+        if sep and key.lower().startswith("file"):
+            line = value.strip()
+        elif sep and "://" not in key:
+            # Other .pls keys (Title1=, Length1=, NumberOfEntries=).
+            continue
+        try:
+            url = urljoin(base_url, line)
+        except ValueError:
+            # e.g. a malformed IPv6 host; skip the entry rather than the playlist.
+            continue
+        if url.startswith(("http://", "https://")):
+            entries.append(url)
+    return entries
+
+
+class StreamResolver:
+    """Resolves station URLs to their final stream endpoint and tracks how well each plays.
+
+    ``.pls``/``.m3u`` playlists are unpacked and redirects followed once, and the result
+    is cached for ``RESOLVE_TTL``, so neither a start nor ffmpeg's reconnects fetch the
+    playlist again. HLS playlists are left to ffmpeg. Each station URL also keeps a
+    health score from the runs that used it, which decides between the directory's
+    resolved URL and the station's original one.
+    """
+
+    _MAX_ENTRIES = 256
+    _MAX_DEPTH = 3
+
+    def __init__(self) -> None:
+        self._client = httpx.AsyncClient(timeout=RESOLVE_TIMEOUT, follow_redirects=True, max_redirects=5)
+        self._targets: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._health: OrderedDict[str, float] = OrderedDict()
+        self.stats = {"hits": 0, "resolved": 0, "failed": 0}
+
+    def pick(self, primary: str, fallback: Optional[str]) -> str:
+        """The station URL to play: the primary one unless the fallback has been doing better."""
+        if not fallback or fallback == primary:
+            return primary
+        return fallback if self._health.get(fallback, 1.0) > self._health.get(primary, 1.0) else primary
+
+    async def resolve(self, url: str) -> str:
+        cached = self._targets.get(url)
+        now = time.monotonic()
+        if cached and cached[1] > now:
+            self.stats["hits"] += 1
+            self._targets.move_to_end(url)
+            return cached[0]
+        try:
+            target = await self._resolve(url, 0)
+        except Exception as exc:
+            # Includes httpx.InvalidURL for a bad port: let ffmpeg try the URL itself and
+            # report its own error; it may still play.
+            self.stats["failed"] += 1
+            log.info("Could not resolve %s: %s", url, exc)
+            return url
+        self.stats["resolved"] += 1
+        if target != url:
+            log.info("Resolved %s -> %s", url, target)
+        self._targets[url] = (target, now + RESOLVE_TTL)
+        self._targets.move_to_end(url)
+        while len(self._targets) > self._MAX_ENTRIES:
+            self._targets.popitem(last=False)
+        return target
+
+    def report(self, url: str, ok: bool) -> None:
+        """Record whether a run from ``url`` played stably; a failure also forgets its resolution."""
+        self._health[url] = 0.5 * self._health.get(url, 1.0) + (0.5 if ok else 0.0)
+        self._health.move_to_end(url)
+        while len(self._health) > self._MAX_ENTRIES:
+            self._health.popitem(last=False)
+        if not ok:
+            self._targets.pop(url, None)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def _resolve(self, url: str, depth: int) -> str:
+        async with self._client.stream("GET", url, headers={"Icy-MetaData": "0"}) as resp:
+            resp.raise_for_status()
+            final = str(resp.url)
+            content_type = resp.headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type not in _PLAYLIST_TYPES and not resp.url.path.lower().endswith((".pls", ".m3u")):
+                # An audio stream: stop at the headers.
+                return final
+            body = b""
+            async for chunk in resp.aiter_bytes():
+                body += chunk
+                if len(body) >= 65536:
+                    break
+        entries = _playlist_entries(body.decode("utf-8", "replace"), final)
+        if not entries:
+            return final
+        if depth + 1 >= self._MAX_DEPTH:
+            return entries[0]
+        return await self._resolve(entries[0], depth + 1)
+
+
+@dataclass
+class StreamProgress:
+    """Decoded audio read from one ffmpeg run."""
+
+    started_at: Optional[float] = None
+    advanced_at: Optional[float] = None
+    total_size: int = 0
+    window: deque = field(default_factory=lambda: deque(maxlen=20))
+
+    def record(self, size: int, now: float) -> None:
+        if self.started_at is None:
+            self.started_at = now
+        self.advanced_at = now
+        self.total_size += size
+        if not self.window or now - self.window[-1][0] >= 0.5:
+            self.window.append((now, self.total_size))
+
+    @property
+    def out_time(self) -> float:
+        return self.total_size / BYTES_PER_SECOND
+
+    def healthy_for(self, since: Optional[float] = None) -> float:
+        """Seconds of steady output, counted from ``since`` when that is later than the first audio."""
+        if self.started_at is None or self.advanced_at is None:
+            return 0.0
+        start = self.started_at if since is None else max(self.started_at, since)
+        return max(0.0, self.advanced_at - start)
+
+    def bitrate_kbps(self, now: float) -> Optional[int]:
+        """Decoded audio actually delivered over the last few seconds."""
+        if not self.window or now <= self.window[0][0]:
+            return None
+        first_at, first_size = self.window[0]
+        return int((self.total_size - first_size) * 8 / 1000 / (now - first_at))
+
+    def speed(self, now: float) -> Optional[float]:
+        if not self.window or now <= self.window[0][0]:
+            return None
+        first_at, first_size = self.window[0]
+        return round((self.total_size - first_size) / BYTES_PER_SECOND / (now - first_at), 2)
+
+    def buffer_seconds(self, now: float) -> Optional[float]:
+        """Audio decoded ahead of real time; it shrinks towards zero and below while the upstream starves."""
+        if self.started_at is None:
+            return None
+        return round(self.out_time - (now - self.started_at), 2)
+
+    def metadata(self, now: float) -> dict:
+        return {
+            "speed": self.speed(now),
+            "buffer_seconds": self.buffer_seconds(now),
+            "out_time": round(self.out_time, 1),
+            "delivered_kbps": self.bitrate_kbps(now),
+            "bytes_decoded": self.total_size,
+        }
+
+
+def restart_backoff(failures: int) -> float:
+    """Exponential delay before restart number ``failures``, with jitter so channels do not restart in lockstep."""
+    delay = min(RESTART_MAX_DELAY, RESTART_DELAY * 2 ** max(0, failures - 1))
+    return random.uniform(delay / 2, delay)
+
+
+def _frames(seconds: float) -> int:
+    return max(1, int(seconds * OUTPUT_RATE)) * FRAME_BYTES
+
+
+def _ffmpeg_command(input_url: str) -> list[str]:
+    return [
+        FFMPEG_BIN,
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        os.getenv("FFMPEG_LOG_LEVEL", "warning"),
+        "-nostats",
+        "-reconnect",
+        "1",
+        "-reconnect_streamed",
+        "1",
+        "-reconnect_delay_max",
+        "10",
+        "-i",
+        input_url,
+        "-vn",
+        "-ac",
+        "2",
+        "-ar",
+        str(OUTPUT_RATE),
+        "-f",
+        "s16le",
+        "-acodec",
+        "pcm_s16le",
+        "pipe:1",
+    ]
+
+
+class Decoder:
+    """One ffmpeg decoding a station to PCM on its stdout.
+
+    Up to ``capacity`` bytes are buffered until read. A standby decoder drops older audio
+    a whole frame at a time, so it always holds the last few seconds; a paced (playing)
+    decoder stops reading ffmpeg at ``capacity`` instead, so the FIFO reader sets the pace
+    and no audio is skipped.
+    """
+
+    def __init__(
+        self,
+        stream_url: str,
+        *,
+        capacity: int,
+        paced: bool = False,
+        source_url: Optional[str] = None,
+        input_url: Optional[str] = None,
+    ) -> None:
+        # ``stream_url`` is the assigned station URL, ``source_url`` the station URL that was
+        # picked to play (it may be the fallback) and ``input_url`` what that resolved to.
+        self.stream_url = stream_url
+        self.source_url = source_url or stream_url
+        self.input_url = input_url or self.source_url
+        self.capacity = capacity
+        self.paced = paced
+        self.paused = False
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.progress = StreamProgress()
+        self.errors: deque = deque(maxlen=3)
+        self.started_at = 0.0
+        self._buffer = bytearray()
+        self._offset = 0
+        self._data = asyncio.Event()
+        self._room = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self.started_at = asyncio.get_running_loop().time()
+        self.process = await asyncio.create_subprocess_exec(
+            *_ffmpeg_command(self.input_url),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        self._tasks = [
+            asyncio.create_task(self._read_audio()),
+            asyncio.create_task(_collect_stderr(self.process, self.errors)),
+        ]
+
+    @property
+    def finished(self) -> bool:
+        return not self._tasks or self._tasks[0].done()
+
+    def set_paced(self, paced: bool, capacity: int) -> None:
+        self.paced = paced
+        self.capacity = capacity
+        self._room.set()
+
+    def stalled(self, now: float) -> Optional[str]:
+        if self.paused:
+            # Holding a full buffer for a slow reader is not a stall.
+            return None
+        if self.progress.advanced_at is None:
+            if now - self.started_at >= CONNECT_TIMEOUT:
+                return f"No audio within {CONNECT_TIMEOUT:.0f}s of connecting"
+            return None
+        if now - self.progress.advanced_at >= STALL_TIMEOUT:
+            return f"Stream stalled for {STALL_TIMEOUT:.0f}s"
+        return None
+
+    def healthy(self, now: float) -> bool:
+        return not self.finished and self.progress.advanced_at is not None and self.stalled(now) is None
+
+    async def read(self) -> tuple[int, bytes]:
+        """Everything buffered so far and its offset in the decoded stream; empty once ffmpeg is done."""
+        while not self._buffer:
+            if self.finished:
+                return self._offset, b""
+            self._data.clear()
+            await self._data.wait()
+        offset, data = self._offset, bytes(self._buffer)
+        self._buffer.clear()
+        self._offset += len(data)
+        self._room.set()
+        return offset, data
+
+    async def stop(self) -> str:
+        """Stop ffmpeg and describe how it ended."""
+        for task in self._tasks:
+            task.cancel()
+        if self.process:
+            await _terminate(self.process)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        message = f"ffmpeg exited with code {self.process.returncode if self.process else None}"
+        if self.errors:
+            message = f"{message}: {self.errors[-1]}"
+        return message
+
+    async def _read_audio(self) -> None:
+        assert self.process and self.process.stdout
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                chunk = await self.process.stdout.read(65536)
+                if not chunk:
+                    return
+                self.progress.record(len(chunk), loop.time())
+                self._buffer += chunk
+                self._data.set()
+                if self.paced:
+                    # High-water mark: leave the rest in ffmpeg's pipe until the reader catches up.
+                    while self.paced and len(self._buffer) >= self.capacity:
+                        self.paused = True
+                        self._room.clear()
+                        await self._room.wait()
+                    if self.paused:
+                        self.paused = False
+                        self.progress.advanced_at = loop.time()
+                    continue
+                excess = len(self._buffer) - self.capacity
+                if excess > 0:
+                    excess += -(self._offset + excess) % FRAME_BYTES
+                    del self._buffer[:excess]
+                    self._offset += excess
+        finally:
+            self._data.set()
+
+
+class FifoWriter:
+    """Non-blocking writer for a channel FIFO that keeps the stream frame-aligned across sources.
+
+    The FIFO is opened read-write, so opening never waits for the reader and a reader
+    restart does not break the pipe; writes wait for room instead.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.written = 0
+        self._fd: Optional[int] = None
+
+    def open(self) -> None:
+        if self._fd is None:
+            ensure_fifo(self.path)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_NONBLOCK)
+            self.written = 0
+
+    async def write(self, data: bytes) -> None:
+        # A write cut short by a source switch can end mid-frame; pad so the next one starts on a boundary.
+        data = bytes(-self.written % FRAME_BYTES) + data
+        assert self._fd is not None
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(self._fd, view)
+            except BlockingIOError:
+                await self._writable()
+                continue
+            self.written += written
+            view = view[written:]
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    async def _writable(self) -> None:
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        loop.add_writer(self._fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            loop.remove_writer(self._fd)
+
+
+class WarmPool:
+    """Standby decoders for the stations a channel is likely to switch to next.
+
+    Candidates are recently played stations followed by the favourites. A decoder is
+    kept for as many of them as fit in ``size`` and in the bandwidth and memory
+    budgets (each decoder is counted as its buffer plus ``DECODER_OVERHEAD_MB``).
+    Switching to a warm station hands its decoder, with a few seconds of audio already
+    buffered, to the channel; the decoder it replaces goes back into the pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        size: int,
+        buffer_seconds: float,
+        max_kbps: int,
+        max_memory_mb: float,
+        resolver: StreamResolver,
+    ) -> None:
+        self.resolver = resolver
+        self.capacity = _frames(buffer_seconds)
+        per_decoder_mb = self.capacity / (1024 * 1024) + DECODER_OVERHEAD_MB
+        self.size = max(0, min(size, int(max_memory_mb // per_decoder_mb)))
+        self.max_kbps = max_kbps
+        self.decoders: Dict[str, Decoder] = {}
+        self._failed: Dict[str, float] = {}
+        self.stats = {"warm_starts": 0, "cold_starts": 0, "started": 0, "failed": 0}
+
+    async def take(self, stream_url: str) -> Optional[Decoder]:
+        decoder = self.decoders.pop(stream_url, None)
+        if decoder is not None and decoder.healthy(asyncio.get_running_loop().time()):
+            self.stats["warm_starts"] += 1
+            return decoder
+        if decoder is not None:
+            await decoder.stop()
+        self.stats["cold_starts"] += 1
+        return None
+
+    async def adopt(self, decoder: Decoder) -> None:
+        """Keep a decoder a channel just switched away from, if it is healthy and there is room."""
+        if (
+            self.size
+            and decoder.stream_url not in self.decoders
+            and len(self.decoders) < self.size
+            and decoder.healthy(asyncio.get_running_loop().time())
+        ):
+            decoder.set_paced(False, self.capacity)
+            self.decoders[decoder.stream_url] = decoder
+            return
+        await decoder.stop()
+
+    async def reconcile(self, candidates: list[tuple[str, Optional[int]]], active: set[str]) -> None:
+        now = asyncio.get_running_loop().time()
+        desired: list[str] = []
+        budget = self.max_kbps
+        for stream_url, kbps in candidates:
+            if len(desired) >= self.size:
+                break
+            if not stream_url or stream_url in active or stream_url in desired:
+                continue
+            if now - self._failed.get(stream_url, float("-inf")) < RESTART_MAX_DELAY:
+                continue
+            cost = kbps or DEFAULT_STATION_KBPS
+            if cost > budget:
+                continue
+            budget -= cost
+            desired.append(stream_url)
+        for stream_url, decoder in list(self.decoders.items()):
+            keep = stream_url in desired
+            if keep and (decoder.finished or decoder.stalled(now)):
+                self._failed[stream_url] = now
+                self.stats["failed"] += 1
+                desired.remove(stream_url)
+                keep = False
+            if not keep:
+                del self.decoders[stream_url]
+                await decoder.stop()
+        for stream_url in desired:
+            if stream_url in self.decoders:
+                continue
+            decoder = self.decoders[stream_url] = Decoder(stream_url, capacity=self.capacity)
+            try:
+                decoder.input_url = await self.resolver.resolve(stream_url)
+                await decoder.start()
+            except Exception as exc:
+                log.warning("Failed to start standby decoder for %s: %s", stream_url, exc)
+                self.decoders.pop(stream_url, None)
+                self._failed[stream_url] = now
+                continue
+            self.stats["started"] += 1
+        for stream_url in [url for url, failed_at in self._failed.items() if now - failed_at >= RESTART_MAX_DELAY]:
+            del self._failed[stream_url]
+
+    async def close(self) -> None:
+        decoders = list(self.decoders.values())
+        self.decoders.clear()
+        await asyncio.gather(*(decoder.stop() for decoder in decoders), return_exceptions=True)
+
+
 class ChannelRunner:
-    def __init__(self, assignment: Assignment, controller: ControllerClient) -> None:
+    """Keeps one channel's FIFO fed from an ffmpeg decoder.
+
+    The decoder's audio is copied into the FIFO. A decoder that produces no audio
+    within ``CONNECT_TIMEOUT`` of starting, or for ``STALL_TIMEOUT`` once playing, is
+    treated as stalled and killed. Every exit or stall is followed by a restart after an
+    exponential, jittered backoff that resets once a run stays healthy for
+    ``STABLE_AFTER`` seconds. While playing, decoding speed and buffer lead are
+    reported to the controller every ``STATUS_INTERVAL`` seconds. Station switches
+    start from a warm standby decoder when the pool has one.
+    """
+
+    def __init__(
+        self,
+        assignment: Assignment,
+        controller: ControllerClient,
+        pool: WarmPool,
+        resolver: StreamResolver,
+    ) -> None:
         self.assignment = assignment
         self.controller = controller
-        self.process: Optional[asyncio.subprocess.Process] = None
-        self.restart_delay = STARTUP_DELAY
-        self._monitor_task: Optional[asyncio.Task] = None
+        self.pool = pool
+        self.resolver = resolver
+        self.decoder: Optional[Decoder] = None
+        self.failures = 0
+        self.stats = {"restarts": 0, "stalls": 0}
+        self._stream_url: Optional[str] = None
+        self._fifo: Optional[FifoWriter] = None
+        self._handoff = False
+        self._supervisor: Optional[asyncio.Task] = None
+        self._status_tasks: set[asyncio.Task] = set()
+
+    @property
+    def stream_url(self) -> Optional[str]:
+        return self._stream_url
 
     async def update(self, assignment: Assignment) -> None:
         self.assignment = assignment
@@ -122,83 +690,195 @@ class ChannelRunner:
         if not assignment.playback_enabled:
             await self.stop(reason="playback disabled")
             return
-        if self.process and self.process.returncode is None:
+        if self._supervisor and not self._supervisor.done() and self._stream_url == assignment.stream_url:
             return
         await self.start()
 
     async def start(self) -> None:
-        await self.stop()
-        ensure_fifo(self.assignment.fifo_path)
-        cmd = [
-            FFMPEG_BIN,
-            "-nostdin",
-            "-y",
-            "-hide_banner",
-            "-loglevel",
-            os.getenv("FFMPEG_LOG_LEVEL", "warning"),
-            "-reconnect",
-            "1",
-            "-reconnect_streamed",
-            "1",
-            "-reconnect_delay_max",
-            "10",
-            "-i",
-            self.assignment.stream_url,
-            "-vn",
-            "-ac",
-            "2",
-            "-ar",
-            os.getenv("RADIO_OUTPUT_RATE", "48000"),
-            "-f",
-            "s16le",
-            "-acodec",
-            "pcm_s16le",
-            self.assignment.fifo_path,
-        ]
-        log.info("[%s] Starting ffmpeg -> %s", self.assignment.channel_id, self.assignment.fifo_path)
-        await self.controller.send_status(self.assignment.channel_id, "connecting", message="Tuning station")
+        # The decoder being replaced is offered to the warm pool, so switching back is instant.
+        self._handoff = True
+        await self._halt()
+        if self._fifo is not None and self._fifo.path != self.assignment.fifo_path:
+            self._fifo.close()
+            self._fifo = None
+        if self._fifo is None:
+            self._fifo = FifoWriter(self.assignment.fifo_path)
+        self.failures = 0
+        self._stream_url = self.assignment.stream_url
+        # Claimed before returning, so a pool reconcile cannot retire it first.
+        decoder = await self.pool.take(self._stream_url)
+        self._supervisor = asyncio.create_task(self._supervise(decoder))
+
+    async def _supervise(self, decoder: Optional[Decoder]) -> None:
+        channel_id = self.assignment.channel_id
+        while True:
+            try:
+                healthy_for, message = await self._run_once(decoder)
+            except Exception as exc:
+                # Keep supervising: an unexpected error is reported and retried like a failed run.
+                log.exception("[%s] Radio channel run failed", channel_id)
+                healthy_for, message = 0.0, f"Unexpected error: {exc}"
+                stale, self.decoder = self.decoder, None
+                if stale is not None:
+                    await stale.stop()
+            decoder = None
+            if healthy_for >= STABLE_AFTER:
+                self.failures = 0
+            self.failures += 1
+            delay = restart_backoff(self.failures)
+            log.warning("[%s] %s; restarting in %.1fs", channel_id, message, delay)
+            self._report("error", message=f"{message}; retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            self.stats["restarts"] += 1
+
+    async def _run_once(self, decoder: Optional[Decoder]) -> tuple[float, str]:
+        """Play until the decoder exits or stalls; returns how long it played and why it ended."""
+        channel_id = self.assignment.channel_id
+        warm = decoder is not None
+        # A warm decoder may have played in the pool for a while; only time on this channel counts.
+        handoff = asyncio.get_running_loop().time()
         try:
-            self.process = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
-        except FileNotFoundError as exc:
-            await self.controller.send_status(self.assignment.channel_id, "error", message=f"ffmpeg missing: {exc}")
-            log.error("ffmpeg binary not found: %s", exc)
-            await asyncio.sleep(self.restart_delay)
-            return
-        except Exception as exc:  # pragma: no cover - subprocess edge
-            await self.controller.send_status(self.assignment.channel_id, "error", message=str(exc))
-            log.error("Failed to start ffmpeg for %s: %s", self.assignment.channel_id, exc)
-            await asyncio.sleep(self.restart_delay)
-            return
-        self.restart_delay = STARTUP_DELAY
-        await self.controller.send_status(self.assignment.channel_id, "playing", message="Streaming radio")
-        self._monitor_task = asyncio.create_task(self._monitor_process())
-
-    async def _monitor_process(self) -> None:
-        assert self.process
-        returncode = await self.process.wait()
-        self.process = None
-        message = f"ffmpeg exited with code {returncode}"
-        if returncode == 0:
-            log.info("[%s] %s", self.assignment.channel_id, message)
-            await self.controller.send_status(self.assignment.channel_id, "idle", message=message)
+            self._fifo.open()
+        except OSError as exc:
+            if decoder is not None:
+                await decoder.stop()
+            return 0.0, f"Cannot open {self.assignment.fifo_path}: {exc}"
+        if decoder is None:
+            log.info("[%s] Starting ffmpeg -> %s", channel_id, self.assignment.fifo_path)
+            self._report("connecting", message="Tuning station")
+            source_url = self.resolver.pick(self._stream_url, self.assignment.fallback_url)
+            decoder = Decoder(
+                self._stream_url,
+                capacity=_frames(ACTIVE_BUFFER_SECONDS),
+                paced=True,
+                source_url=source_url,
+                input_url=await self.resolver.resolve(source_url),
+            )
+            try:
+                await decoder.start()
+            except FileNotFoundError as exc:
+                log.error("ffmpeg binary not found: %s", exc)
+                return 0.0, f"ffmpeg missing: {exc}"
+            except Exception as exc:  # pragma: no cover - subprocess edge
+                log.error("Failed to start ffmpeg for %s: %s", channel_id, exc)
+                return 0.0, str(exc)
         else:
-            log.warning("[%s] %s", self.assignment.channel_id, message)
-            await self.controller.send_status(self.assignment.channel_id, "error", message=message)
+            log.info("[%s] Switching to warm decoder -> %s", channel_id, self.assignment.fifo_path)
+            decoder.set_paced(True, _frames(ACTIVE_BUFFER_SECONDS))
+        self.decoder = decoder
+        copy_task = asyncio.create_task(self._copy(decoder))
+        try:
+            stalled = await self._watch(decoder, warm)
+        except asyncio.CancelledError:
+            copy_task.cancel()
+            await asyncio.gather(copy_task, return_exceptions=True)
+            self.decoder = None
+            if self._handoff:
+                await self.pool.adopt(decoder)
+            else:
+                await decoder.stop()
+            raise
+        copy_task.cancel()
+        await asyncio.gather(copy_task, return_exceptions=True)
+        self.decoder = None
+        message = await decoder.stop()
+        healthy_for = decoder.progress.healthy_for(handoff)
+        # Runs that end before they count as stable (see STABLE_AFTER) count against the URL.
+        self.resolver.report(decoder.source_url, healthy_for >= STABLE_AFTER)
+        if stalled:
+            self.stats["stalls"] += 1
+            message = stalled
+        return healthy_for, message
+
+    async def _copy(self, decoder: Decoder) -> None:
+        # Only whole frames are written; a trailing partial frame waits for the next read.
+        expected: Optional[int] = None
+        partial = b""
+        while True:
+            offset, data = await decoder.read()
+            if not data:
+                return
+            if offset != expected:
+                # Audio was dropped while the reader lagged; the buffer resumes on a frame boundary.
+                partial = b""
+            expected = offset + len(data)
+            data = partial + data
+            whole = len(data) - len(data) % FRAME_BYTES
+            partial = data[whole:]
+            if whole:
+                await self._fifo.write(data[:whole])
+
+    async def _watch(self, decoder: Decoder, warm: bool) -> Optional[str]:
+        """Poll the decoder; returns a reason if it stalled, None once it exits."""
+        loop = asyncio.get_running_loop()
+        next_report = 0.0
+        while not decoder.finished:
+            now = loop.time()
+            stalled = decoder.stalled(now)
+            if stalled:
+                return stalled
+            if decoder.progress.advanced_at is not None and now >= next_report:
+                next_report = now + STATUS_INTERVAL
+                fallback = decoder.source_url != decoder.stream_url
+                # ``bitrate`` is the station's encoded rate as listed by the directory; the
+                # decoded PCM rate is fixed by the output format and goes in the metadata.
+                self._report(
+                    "playing",
+                    message="Streaming radio",
+                    bitrate=None if fallback else self.assignment.bitrate,
+                    metadata={
+                        **decoder.progress.metadata(now),
+                        **self.stats,
+                        "warm_start": warm,
+                        "fallback": fallback,
+                    },
+                )
+            await asyncio.sleep(0.5)
+        return None
+
+    def _report(self, state: str, **kwargs) -> None:
+        # Sent in the background so a slow controller cannot hold up the audio copy.
+        task = asyncio.create_task(self.controller.send_status(self.assignment.channel_id, state, **kwargs))
+        self._status_tasks.add(task)
+        task.add_done_callback(self._status_tasks.discard)
+
+    async def _halt(self) -> None:
+        supervisor, self._supervisor = self._supervisor, None
+        self._stream_url = None
+        if supervisor:
+            supervisor.cancel()
+            await asyncio.gather(supervisor, return_exceptions=True)
 
     async def stop(self, *, reason: Optional[str] = None) -> None:
         if reason:
             log.info("[%s] Stopping: %s", self.assignment.channel_id, reason)
-        if self._monitor_task:
-            self._monitor_task.cancel()
-            self._monitor_task = None
-        if self.process and self.process.returncode is None:
-            self.process.terminate()
-            try:
-                await asyncio.wait_for(self.process.wait(), timeout=5)
-            except asyncio.TimeoutError:
-                self.process.kill()
-                await self.process.wait()
-        self.process = None
+        self._handoff = False
+        await self._halt()
+        if self._fifo is not None:
+            self._fifo.close()
+            self._fifo = None
+
+
+async def _collect_stderr(process: asyncio.subprocess.Process, lines: deque) -> None:
+    assert process.stderr
+    while True:
+        line = await process.stderr.readline()
+        if not line:
+            return
+        text = line.decode(errors="replace").strip()
+        if text:
+            lines.append(text)
+
+
+async def _terminate(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is not None:
+        return
+    process.terminate()
+    try:
+        await asyncio.wait_for(process.wait(), timeout=5)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
 
 
 class RadioManager:
@@ -206,9 +886,19 @@ class RadioManager:
         self.controller = controller
         self.runners: Dict[str, ChannelRunner] = {}
         self.version: Optional[int] = None
+        self.resolver = StreamResolver()
+        self.pool = WarmPool(
+            size=WARM_TUNERS,
+            buffer_seconds=WARM_BUFFER_SECONDS,
+            max_kbps=WARM_MAX_KBPS,
+            max_memory_mb=WARM_MAX_MEMORY_MB,
+            resolver=self.resolver,
+        )
+        # Stream URL -> bitrate of stations played recently, most recent last.
+        self.recent: OrderedDict[str, Optional[int]] = OrderedDict()
 
     async def sync(self) -> None:
-        assignments, version = await self.controller.fetch_assignments(self.version, POLL_INTERVAL)
+        assignments, version, standby = await self.controller.fetch_assignments(self.version, POLL_INTERVAL)
         if version is not None:
             self.version = version
         seen = set()
@@ -218,18 +908,29 @@ class RadioManager:
             seen.add(assignment.channel_id)
             runner = self.runners.get(assignment.channel_id)
             if not runner:
-                runner = ChannelRunner(assignment, self.controller)
+                runner = ChannelRunner(assignment, self.controller, self.pool, self.resolver)
                 self.runners[assignment.channel_id] = runner
             await runner.update(assignment)
+            if runner.stream_url:
+                self.recent[runner.stream_url] = assignment.bitrate
+                self.recent.move_to_end(runner.stream_url)
         # Stop channels that disappeared
         to_remove = [cid for cid in self.runners.keys() if cid not in seen]
         for cid in to_remove:
             await self.runners[cid].stop(reason="assignment removed")
             self.runners.pop(cid, None)
+        while len(self.recent) > 20:
+            self.recent.popitem(last=False)
+        if self.pool.size:
+            active = {runner.stream_url for runner in self.runners.values() if runner.stream_url}
+            candidates = [*reversed(self.recent.items()), *standby]
+            await self.pool.reconcile(candidates, active)
 
     async def shutdown(self) -> None:
         await asyncio.gather(*(runner.stop(reason="shutdown") for runner in self.runners.values()), return_exceptions=True)
         self.runners.clear()
+        await self.pool.close()
+        await self.resolver.close()
 
 
 def ensure_fifo(path: str) -> None:
@@ -124,7 +124,11 @@ def create_nodes_router(
     get_node_max_volume: Callable[[dict], int],
     send_browser_volume: Callable[[dict, int], Awaitable[None]],
     browser_ws: Callable[[], dict],
-    node_watchers: Callable[[], set],
+    add_node_watcher: Callable[[WebSocket, Optional[dict]], None],
+    remove_node_watcher: Callable[[WebSocket], None],
+    send_node_payload: Callable[[WebSocket, dict], None],
+    node_state_snapshot: Callable[[Optional[dict]], Awaitable[dict]],
+    node_state_resync: Callable[[Optional[dict], int], list[dict]],
     normalize_percent: Callable[..., int],
     normalize_stereo_mode: Callable[[Any], str],
     apply_volume_limit: Callable[[dict, int], int],
@@ -150,6 +154,8 @@ def create_nodes_router(
     node_terminal_max_duration: int,
     node_terminal_strict_host_key: bool,
     cancel_node_rediscovery: Callable[[Optional[str]], None],
+    rediscovery_status: Callable[[], dict],
+    persistence_status: Callable[[], dict],
     teardown_browser_node: Callable[..., Awaitable[None]],
     get_webrtc_relay: Callable[[], Any],
     # Sections helpers
@@ -171,6 +177,10 @@ def create_nodes_router(
     detect_discovery_networks: Callable[[], list[str]],
     hosts_for_networks: Callable[..., list[str]],
     stream_host_probes: Callable[[list[str]], AsyncIterator[dict]],
+    mdns_entries: Callable[[], list[dict]],
+    scan_open_ports: Callable[[list[str]], Awaitable[dict[str, set[int]]]],
+    cast_port: int,
+    cast_probe_hosts: Callable[[list[str]], Awaitable[list[dict]]],
     sonos_ssdp_discover: Callable[[], Awaitable[list[dict]]],
     cast_discover: Callable[[], Awaitable[list[dict]]],
     discovery_max_hosts: int,
@@ -768,6 +778,14 @@ def create_nodes_router(
         await broadcast_nodes()
         return {"ok": True, "sections": public_sections(), "nodes": public_nodes()}
 
+    @router.get("/api/nodes/rediscovery")
+    async def node_rediscovery_status(_: dict = Depends(require_admin)) -> dict:
+        return rediscovery_status()
+
+    @router.get("/api/nodes/persistence")
+    async def node_persistence_status(_: dict = Depends(require_admin)) -> dict:
+        return persistence_status()
+
     @router.get("/api/nodes/discover")
     async def discover_nodes() -> StreamingResponse:
         networks = detect_discovery_networks()
@@ -777,6 +795,12 @@ def create_nodes_router(
         if not hosts:
             raise HTTPException(status_code=503, detail="No hosts available for discovery")
 
+        # Agents that announce themselves over mDNS are answered from the index straight away;
+        # the HTTP scan remains the fallback for ESP32 nodes and older agents.
+        announced = mdns_entries()
+        announced_hosts = {item.get("host") for item in announced}
+        scan_hosts = [host for host in hosts if host not in announced_hosts]
+
         async def _event_stream() -> AsyncIterator[str]:
             found = 0
             limited = len(hosts) >= discovery_max_hosts
@@ -787,10 +811,14 @@ def create_nodes_router(
                         "networks": networks,
                         "host_count": len(hosts),
                         "limited": limited,
+                        "announced": len(announced),
                     }
                 )
                 + "\n"
             )
+            for item in announced:
+                found += 1
+                yield json.dumps({"type": "discovered", "data": item}) + "\n"
             sonos_task: Optional[asyncio.Task[list[dict]]] = None
             cast_task: Optional[asyncio.Task[list[dict]]] = None
             sonos_emitted = False
@@ -798,7 +826,13 @@ def create_nodes_router(
             try:
                 sonos_task = asyncio.create_task(sonos_ssdp_discover())
                 cast_task = asyncio.create_task(cast_discover())
-                async for result in stream_host_probes(hosts):
+                # One TCP connect pass over all hosts and device ports; the per-kind probes
+                # below reuse its cached result and only contact hosts with the port open.
+                open_ports = await scan_open_ports(scan_hosts)
+                yield json.dumps(
+                    {"type": "prescan", "responsive": sum(1 for ports in open_ports.values() if ports)}
+                ) + "\n"
+                async for result in stream_host_probes(scan_hosts):
                     found += 1
                     yield json.dumps({"type": "discovered", "data": result}) + "\n"
                     if sonos_task and not sonos_emitted and sonos_task.done():
@@ -838,6 +872,14 @@ def create_nodes_router(
                     for item in sonos_items or []:
                         found += 1
                         yield json.dumps({"type": "discovered", "data": item}) + "\n"
+                if not cast_emitted and not cast_items:
+                    # mDNS is often blocked in Docker bridge mode; fall back to pre-scanned hosts.
+                    cast_hosts = [host for host, ports in open_ports.items() if cast_port in ports]
+                    if cast_hosts:
+                        try:
+                            cast_items = await cast_probe_hosts(cast_hosts)
+                        except Exception:
+                            cast_items = []
                 if not cast_emitted:
                     for item in cast_items or []:
                         found += 1
@@ -981,17 +1023,28 @@ def create_nodes_router(
         user = await require_ws_user(ws)
         if not user:
             return
-        node_watchers_set = node_watchers()
-        node_watchers_set[ws] = user
         try:
-            await ws.send_json({"type": "nodes", "sections": public_sections(), "nodes": public_nodes_for_user(user)})
-            await ws.send_json({"type": "web_node_requests", "requests": pending_web_node_snapshots()})
+            await ws.send_json(await node_state_snapshot(user))
+            add_node_watcher(ws, user)
+            send_node_payload(ws, {"type": "web_node_requests", "requests": pending_web_node_snapshots()})
             while True:
-                await ws.receive_text()
+                raw = await ws.receive_text()
+                try:
+                    message = json.loads(raw)
+                except ValueError:
+                    continue
+                if not isinstance(message, dict) or message.get("type") != "resync":
+                    continue
+                try:
+                    revision = int(message.get("revision"))
+                except (TypeError, ValueError):
+                    revision = -1
+                for payload in node_state_resync(user, revision):
+                    send_node_payload(ws, payload)
         except Exception:
             pass
         finally:
-            node_watchers_set.pop(ws, None)
+            remove_node_watcher(ws)
 
     @router.websocket("/ws/terminal/{token}")
     async def terminal_ws(ws: WebSocket, token: str):
@@ -1,13 +1,17 @@
+import asyncio
 import json
 import logging
 import secrets
 import time
 from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel, Field
 
+from services.radio_browser_cache import RadioBrowserCache
+from services.radio_browser_mirrors import RadioBrowserMirrors
+from services.radio_station_index import RadioStationIndex
+
 
 log = logging.getLogger("roomcast")
 
@@ -16,6 +20,7 @@ class RadioStationSelectionPayload(BaseModel):
     station_id: str = Field(min_length=1, max_length=160)
     name: str = Field(min_length=1, max_length=200)
     stream_url: str = Field(min_length=1, max_length=500)
+    source_url: Optional[str] = Field(default=None, max_length=500)
     country: Optional[str] = Field(default=None, max_length=120)
     countrycode: Optional[str] = Field(default=None, max_length=4)
     bitrate: Optional[int] = Field(default=None, ge=0, le=1536)
@@ -44,6 +49,7 @@ class RadioFavoriteAddPayload(BaseModel):
     station_id: str = Field(min_length=1, max_length=160)
     name: str = Field(min_length=1, max_length=200)
     stream_url: str = Field(min_length=1, max_length=500)
+    source_url: Optional[str] = Field(default=None, max_length=500)
     country: Optional[str] = Field(default=None, max_length=120)
     countrycode: Optional[str] = Field(default=None, max_length=4)
     bitrate: Optional[int] = Field(default=None, ge=0, le=1536)
@@ -57,6 +63,7 @@ class RadioFavoriteAddPayload(BaseModel):
             station_id=payload.station_id,
             name=payload.name,
             stream_url=payload.stream_url,
+            source_url=payload.source_url,
             country=payload.country,
             countrycode=payload.countrycode,
             bitrate=payload.bitrate,
@@ -76,32 +83,11 @@ def _make_radio_cache_key(path: str, params: Optional[dict]) -> str:
     return f"{path}?{serialized}"
 
 
-def _radio_cache_get(cache: Dict[str, Tuple[float, Any]], key: str) -> Optional[Any]:
-    if not key:
-        return None
-    cached = cache.get(key)
-    if not cached:
-        return None
-    expires_at, payload = cached
-    if expires_at and expires_at < time.time():
-        cache.pop(key, None)
-        return None
-    return payload
-
-
-def _radio_cache_put(cache: Dict[str, Tuple[float, Any]], key: str, payload: Any, ttl: int) -> None:
-    if not key or ttl <= 0:
-        return
-    cache[key] = (time.time() + ttl, payload)
-
-
 async def _radio_browser_request(
     *,
-    cache: Dict[str, Tuple[float, Any]],
-    base_urls: List[str],
-    timeout: float,
+    cache: RadioBrowserCache,
+    mirrors: RadioBrowserMirrors,
     default_ttl: int,
-    user_agent: str,
     path: str,
     params: Optional[dict] = None,
     ttl: Optional[int] = None,
@@ -110,81 +96,23 @@ async def _radio_browser_request(
     resolved_path = path.lstrip("/")
     ttl_value = default_ttl if ttl is None else ttl
     key = cache_key or _make_radio_cache_key(resolved_path, params)
+
+    async def _fetch() -> Tuple[Any, int]:
+        return await mirrors.get(resolved_path, params)
+
     if ttl_value and key:
-        cached = _radio_cache_get(cache, key)
+        cached = cache.get(key)
         if cached is not None:
-            return cached
-    headers = {"User-Agent": user_agent}
-    base_urls = [entry.strip().rstrip("/") for entry in (base_urls or []) if entry and entry.strip()]
-    last_exc: Optional[BaseException] = None
-    all_timeouts = True
-    for base_url in base_urls:
-        url = f"{base_url}/{resolved_path}".rstrip("/")
-        try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.get(url, params=params, headers=headers)
-                response.raise_for_status()
-                payload = response.json()
-                break
-        except httpx.TimeoutException as exc:
-            last_exc = exc
-            log.warning("Radio Browser request timeout for %s via %s", resolved_path, base_url)
-            continue
-        except httpx.HTTPStatusError as exc:
-            all_timeouts = False
-            status_code = exc.response.status_code if exc.response else None
-            if status_code and (status_code >= 500 or status_code == 429):
-                last_exc = exc
-                log.warning(
-                    "Radio Browser server error for %s via %s (status=%s)",
-                    resolved_path,
-                    base_url,
-                    status_code,
-                )
-                continue
-            last_exc = exc
-            break
-        except httpx.RequestError as exc:
-            all_timeouts = False
-            last_exc = exc
-            log.warning("Radio Browser request failed for %s via %s: %s", resolved_path, base_url, exc)
-            continue
-    else:
-        payload = None
-
-    if payload is None:
-        if all_timeouts:
-            raise HTTPException(status_code=504, detail="Radio directory timeout")
-        raise HTTPException(status_code=502, detail="Radio directory unavailable") from last_exc
+            payload, fresh = cached
+            if not fresh:
+                cache.refresh(key, _fetch, ttl_value)
+            return payload
+    payload, size = await _fetch()
     if ttl_value and key:
-        _radio_cache_put(cache, key, payload, ttl_value)
+        cache.put(key, payload, ttl_value, size=size)
     return payload
 
 
-def _radio_browser_base_url_candidates(configured: str) -> List[str]:
-    configured_parts = [
-        part.strip().rstrip("/")
-        for part in (configured or "").split(",")
-        if part and part.strip()
-    ]
-    defaults = [
-        "https://all.api.radio-browser.info/json",
-        "https://de1.api.radio-browser.info/json",
-        "https://nl1.api.radio-browser.info/json",
-        "https://at1.api.radio-browser.info/json",
-        "https://fr1.api.radio-browser.info/json",
-    ]
-    seen: set[str] = set()
-    candidates: List[str] = []
-    for entry in [*configured_parts, *defaults]:
-        normalized = entry.strip().rstrip("/")
-        if not normalized or normalized in seen:
-            continue
-        seen.add(normalized)
-        candidates.append(normalized)
-    return candidates
-
-
 def _serialize_radio_station(item: Optional[dict]) -> dict:
     if not isinstance(item, dict):
         return {}
@@ -196,10 +124,13 @@ def _serialize_radio_station(item: Optional[dict]) -> dict:
     else:
         tags = []
     stream_url = (item.get("url_resolved") or item.get("url") or "").strip()
+    source_url = (item.get("url") or "").strip()
     return {
         "station_id": item.get("stationuuid") or item.get("id"),
         "name": item.get("name"),
         "stream_url": stream_url,
+        # The station's own URL, which the radio worker falls back to if ``stream_url`` fails.
+        "source_url": source_url if source_url and source_url != stream_url else None,
         "codec": item.get("codec"),
         "bitrate": item.get("bitrate"),
         "country": item.get("country"),
@@ -251,14 +182,21 @@ def create_radio_router(
     radio_assignment_default_wait: float,
     radio_assignment_max_wait: float,
     radio_worker_token: str,
-    radio_browser_base_url: str,
-    radio_browser_timeout: float,
     radio_browser_cache_ttl: int,
-    radio_browser_user_agent: str,
+    radio_browser_cache: RadioBrowserCache,
+    radio_browser_mirrors: RadioBrowserMirrors,
+    radio_station_index: RadioStationIndex,
 ) -> APIRouter:
     router = APIRouter()
-    radio_browser_cache: Dict[str, Tuple[float, Any]] = {}
-    radio_browser_base_urls = _radio_browser_base_url_candidates(radio_browser_base_url)
+    # Strong references so in-flight click reports are not garbage-collected.
+    click_tasks: set[asyncio.Task] = set()
+
+    async def _report_station_click(station_id: str) -> None:
+        # Radio Browser counts a click when a station's URL is looked up this way.
+        try:
+            await radio_browser_mirrors.get(f"url/{station_id}", hedge=False)
+        except Exception as exc:
+            log.debug("Radio Browser click report for %s failed: %s", station_id, exc)
 
     def _get_radio_favorites() -> List[dict]:
         providers_by_id = get_providers_by_id()
@@ -285,6 +223,7 @@ def create_radio_router(
                     "station_id": station_id,
                     "name": name,
                     "stream_url": stream_url,
+                    "source_url": entry.get("source_url"),
                     "country": entry.get("country"),
                     "countrycode": entry.get("countrycode"),
                     "bitrate": entry.get("bitrate"),
@@ -304,15 +243,17 @@ def create_radio_router(
             state.settings = {}
         state.settings["favorites"] = favorites
         save_providers_state()
+        # Favourites are the radio worker's standby candidates.
+        mark_radio_assignments_dirty()
 
     @router.get("/api/radio/genres")
     async def list_radio_genres(limit: int = Query(default=50, ge=1, le=400), _: None = Depends(require_radio_provider_dep)) -> dict:
+        if radio_station_index.ready:
+            return {"genres": radio_station_index.tags(limit)}
         data = await _radio_browser_request(
             cache=radio_browser_cache,
-            base_urls=radio_browser_base_urls,
-            timeout=radio_browser_timeout,
+            mirrors=radio_browser_mirrors,
             default_ttl=radio_browser_cache_ttl,
-            user_agent=radio_browser_user_agent,
             path="/tags",
             ttl=3600,
             cache_key="radio:tags",
@@ -334,12 +275,12 @@ def create_radio_router(
 
     @router.get("/api/radio/countries")
     async def list_radio_countries(limit: int = Query(default=250, ge=1, le=400), _: None = Depends(require_radio_provider_dep)) -> dict:
+        if radio_station_index.ready:
+            return {"countries": radio_station_index.countries(limit)}
         data = await _radio_browser_request(
             cache=radio_browser_cache,
-            base_urls=radio_browser_base_urls,
-            timeout=radio_browser_timeout,
+            mirrors=radio_browser_mirrors,
             default_ttl=radio_browser_cache_ttl,
-            user_agent=radio_browser_user_agent,
             path="/countries",
             ttl=3600,
             cache_key="radio:countries",
@@ -369,15 +310,15 @@ def create_radio_router(
         limit: int = Query(default=40, ge=1, le=200),
         _: None = Depends(require_radio_provider_dep),
     ) -> dict:
+        if radio_station_index.ready:
+            return {"stations": [_serialize_radio_station(item) for item in radio_station_index.top(metric, limit)]}
         normalized = "vote" if metric == "votes" else "click"
         path = f"/stations/top{normalized}/{limit}"
         cache_key = f"radio:top:{metric}:{limit}"
         data = await _radio_browser_request(
             cache=radio_browser_cache,
-            base_urls=radio_browser_base_urls,
-            timeout=radio_browser_timeout,
+            mirrors=radio_browser_mirrors,
             default_ttl=radio_browser_cache_ttl,
-            user_agent=radio_browser_user_agent,
             path=path,
             ttl=120,
             cache_key=cache_key,
@@ -410,12 +351,19 @@ def create_radio_router(
             has_filter = True
         if not has_filter:
             raise HTTPException(status_code=400, detail="Provide a query or filter")
+        if radio_station_index.ready:
+            data = radio_station_index.search(
+                name=query,
+                country=country,
+                countrycode=countrycode,
+                tag=tag,
+                limit=limit,
+            )
+            return {"stations": [_serialize_radio_station(item) for item in data]}
         data = await _radio_browser_request(
             cache=radio_browser_cache,
-            base_urls=radio_browser_base_urls,
-            timeout=radio_browser_timeout,
+            mirrors=radio_browser_mirrors,
             default_ttl=radio_browser_cache_ttl,
-            user_agent=radio_browser_user_agent,
             path="/stations/search",
             params=params,
             ttl=15,
@@ -423,6 +371,30 @@ def create_radio_router(
         stations = [_serialize_radio_station(item) for item in data]
         return {"stations": stations[:limit]}
 
+    @router.get("/api/radio/browser-cache")
+    async def radio_browser_cache_stats(_: dict = Depends(require_admin)) -> dict:
+        return radio_browser_cache.usage()
+
+    @router.get("/api/radio/browser-mirrors")
+    async def radio_browser_mirror_stats(_: dict = Depends(require_admin)) -> dict:
+        return radio_browser_mirrors.diagnostics()
+
+    @router.get("/api/radio/station-index")
+    async def radio_station_index_status(_: dict = Depends(require_admin)) -> dict:
+        return radio_station_index.status()
+
+    @router.post("/api/radio/station-index/sync")
+    async def radio_station_index_sync(
+        full: bool = Query(default=False),
+        _: dict = Depends(require_admin),
+        __: None = Depends(require_radio_provider_dep),
+    ) -> dict:
+        if not radio_station_index.enabled:
+            raise HTTPException(status_code=409, detail="Radio station index is disabled")
+        radio_station_index.open()
+        result = await radio_station_index.sync(full=full or not radio_station_index.ready)
+        return {"ok": True, **result}
+
     @router.get("/api/radio/favorites")
     async def list_radio_favorites(_: None = Depends(require_radio_provider_dep)) -> dict:
         return {"favorites": _get_radio_favorites()}
@@ -472,6 +444,9 @@ def create_radio_router(
         resolved = resolve_channel_id(channel_id)
         channel = get_radio_channel_or_404(resolved)
         apply_radio_station(channel, payload)
+        click_task = asyncio.create_task(_report_station_click(payload.station_id))
+        click_tasks.add(click_task)
+        click_task.add_done_callback(click_tasks.discard)
         save_channels()
         mark_radio_assignments_dirty()
         get_radio_runtime_status().pop(resolved, None)
@@ -573,8 +548,19 @@ def create_radio_router(
                 "station_id": state.get("station_id"),
                 "updated_at": state.get("updated_at"),
                 "playback_enabled": state.get("playback_enabled", True),
+                "bitrate": state.get("bitrate"),
+                "fallback_url": state.get("source_url"),
             })
-        return {"assignments": assignments, "version": version}
+        standby = [
+            {
+                "station_id": entry["station_id"],
+                "stream_url": entry["stream_url"],
+                "fallback_url": entry.get("source_url"),
+                "bitrate": entry.get("bitrate"),
+            }
+            for entry in _get_radio_favorites()
+        ]
+        return {"assignments": assignments, "version": version, "standby": standby}
 
     @router.post("/api/radio/worker/status/{channel_id}")
     async def radio_worker_status(channel_id: str, payload: RadioWorkerStatusPayload, request: Request) -> dict:
@@ -17,9 +17,9 @@ def create_snapcast_router(
     router = APIRouter()
 
     @router.get("/api/snapcast/status")
-    async def snapcast_status() -> dict:
+    async def snapcast_status(refresh: bool = False) -> dict:
         try:
-            status = await snapcast_client.status()
+            status = await snapcast_client.status(force=refresh)
             return status
         except Exception as exc:  # pragma: no cover - network paths
             log.exception("Failed to fetch snapcast status")
@@ -46,13 +46,17 @@ def create_snapcast_router(
 
         removed: list[str] = []
         failed: list[dict] = []
-        for client_id in disconnected_ids:
-            try:
-                await snapcast_client.delete_client(client_id)
+        try:
+            outcomes = await snapcast_client.delete_clients(disconnected_ids)
+        except Exception as exc:  # pragma: no cover - network paths
+            log.exception("Failed to delete snapcast clients")
+            raise HTTPException(status_code=502, detail=str(exc))
+        for client_id, outcome in outcomes.items():
+            if isinstance(outcome, Exception):
+                log.warning("Failed to delete snapcast client %s: %s", client_id, outcome)
+                failed.append({"id": client_id, "error": str(outcome)})
+            else:
                 removed.append(client_id)
-            except Exception as exc:  # pragma: no cover - network paths
-                log.warning("Failed to delete snapcast client %s: %s", client_id, exc)
-                failed.append({"id": client_id, "error": str(exc)})
 
         return {
             "ok": True,
@@ -74,13 +78,19 @@ def create_snapcast_router(
     async def snapcast_master_volume(payload: VolumePayload) -> dict:
         try:
             clients = await snapcast_client.list_clients()
+            outcomes = await snapcast_client.set_client_volumes({client["id"]: payload.percent for client in clients})
             updated: list[str] = []
-            for client in clients:
-                await snapcast_client.set_client_volume(client["id"], payload.percent)
-                updated.append(client["id"])
+            for client_id, outcome in outcomes.items():
+                if isinstance(outcome, Exception):
+                    raise outcome
+                updated.append(client_id)
             return {"ok": True, "updated": updated}
         except Exception as exc:  # pragma: no cover
             log.exception("Failed to set master volume")
             raise HTTPException(status_code=502, detail=str(exc))
 
+    @router.get("/api/snapcast/rpc-stats")
+    async def snapcast_rpc_stats(_: dict = Depends(require_admin)) -> dict:
+        return snapcast_client.stats()
+
     return router
@@ -2,11 +2,10 @@ import asyncio
 import json
 import logging
 import re
-from pathlib import Path
 from typing import Any, Awaitable, Callable, Optional
 
 import httpx
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, WebSocket
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
@@ -52,10 +51,13 @@ class PlaylistAddTracksPayload(BaseModel):
 
 def create_spotify_router(
     *,
+    require_admin: Callable[..., Any],
     require_spotify_provider_dep: Callable[[], None],
     resolve_channel_id: Callable[[Optional[str]], str],
     resolve_spotify_source_id: Callable[[Optional[str]], Optional[str]],
     read_spotify_config: Callable[[str], dict],
+    write_spotify_config_file: Callable[[str, dict], None],
+    update_spotify_config_file: Callable[[str, dict], None],
     roomcast_last_volume: Callable[[Optional[str]], int],
     set_roomcast_last_volume: Callable[[int, Optional[str]], int],
     get_spotify_source: Callable[[str], dict],
@@ -67,10 +69,18 @@ def create_spotify_router(
     load_token: Callable[[Optional[str]], Optional[dict]],
     spotify_request: Callable[..., Awaitable[Any]],
     find_roomcast_device: Callable[[dict, Optional[str]], Awaitable[Optional[dict]]],
-    preferred_roomcast_device_names: Callable[[Optional[str]], list[str]],
-    get_player_snapshot: Callable[[Optional[str]], Optional[dict]],
-    public_player_snapshot: Callable[[Optional[dict]], Optional[dict]],
-    set_player_snapshot: Callable[[str, dict], None],
+    catalog_get: Callable[..., Awaitable[Any]],
+    invalidate_catalog: Callable[..., None],
+    diagnostics: Callable[[], dict],
+    get_playlist_summary: Callable[[str, str, Optional[str]], Optional[dict]],
+    store_playlist_summary: Callable[[str, str, Optional[str], dict], None],
+    catalog_concurrency: int,
+    get_player_status: Callable[[str], Awaitable[dict]],
+    player_changed: Callable[[str], None],
+    require_ws_user: Callable[[WebSocket], Awaitable[Optional[dict]]],
+    add_player_watcher: Callable[[WebSocket, dict], None],
+    remove_player_watcher: Callable[[WebSocket], None],
+    watch_player: Callable[[WebSocket, Optional[str]], None],
     map_spotify_track_simple: Callable[[Any], Optional[dict]],
     map_spotify_search_bucket: Callable[[Any, Callable[[Any], Optional[dict]]], list[dict]],
     map_spotify_album: Callable[[Any], Optional[dict]],
@@ -104,17 +114,7 @@ def create_spotify_router(
     def _store_spotify_username(spotify_source_id: str, username: str) -> None:
         if not username:
             return
-        source = get_spotify_source(spotify_source_id)
-        cfg_path = Path(source["config_path"])
-        payload: dict = {}
-        if cfg_path.exists():
-            try:
-                payload = json.loads(cfg_path.read_text())
-            except json.JSONDecodeError:
-                payload = {}
-        payload["username"] = username
-        cfg_path.parent.mkdir(parents=True, exist_ok=True)
-        cfg_path.write_text(json.dumps(payload, indent=2))
+        update_spotify_config_file(spotify_source_id, {"username": username})
 
     def _with_query(path: str, params: Optional[dict] = None) -> str:
         if not params:
@@ -143,6 +143,47 @@ def create_spotify_router(
             return candidate if playlist_id_pattern.fullmatch(candidate) else None
         return raw if playlist_id_pattern.fullmatch(raw) else None
 
+    async def _catalog_request(
+        kind: str,
+        path: str,
+        token: dict,
+        channel_id: str,
+        *,
+        playlist_id: Optional[str] = None,
+    ):
+        """GET a catalog path through the response cache (see SpotifyCatalogCache)."""
+        source_id = resolve_spotify_source_id(channel_id) or channel_id
+
+        async def _fetch():
+            return await spotify_request("GET", path, token, channel_id)
+
+        async def _snapshot_id() -> Optional[str]:
+            probe_path = _with_query(f"/playlists/{playlist_id}", {"fields": "snapshot_id"})
+            resp = await spotify_request("GET", probe_path, token, channel_id)
+            if resp.status_code != 200:
+                return None
+            data = resp.json()
+            return data.get("snapshot_id") if isinstance(data, dict) else None
+
+        return await catalog_get(
+            source_id,
+            kind,
+            path,
+            _fetch,
+            playlist_id=playlist_id,
+            probe=_snapshot_id if playlist_id else None,
+        )
+
+    async def _gather_limited(calls: list[Callable[[], Awaitable[Any]]]) -> list[Any]:
+        """Run the calls concurrently, at most ``catalog_concurrency`` at a time, keeping order."""
+        semaphore = asyncio.Semaphore(max(1, catalog_concurrency))
+
+        async def _run(call: Callable[[], Awaitable[Any]]) -> Any:
+            async with semaphore:
+                return await call()
+
+        return await asyncio.gather(*(_run(call) for call in calls))
+
     async def _spotify_control(
         path: str,
         method: str = "POST",
@@ -200,6 +241,27 @@ def create_spotify_router(
         body: Optional[dict] = None,
         params: Optional[dict] = None,
         settle_delay: float = 0.6,
+    ) -> dict:
+        try:
+            return await _spotify_player_control(
+                path,
+                method,
+                channel_id=channel_id,
+                body=body,
+                params=params,
+                settle_delay=settle_delay,
+            )
+        finally:
+            player_changed(channel_id)
+
+    async def _spotify_player_control(
+        path: str,
+        method: str,
+        *,
+        channel_id: str,
+        body: Optional[dict],
+        params: Optional[dict],
+        settle_delay: float,
     ) -> dict:
         try:
             return await _spotify_control(path, method, body=body, params=params, channel_id=channel_id)
@@ -252,11 +314,8 @@ def create_spotify_router(
         spotify_source_id = resolve_spotify_source_id(target)
         if spotify_source_id is None:
             raise HTTPException(status_code=400, detail="Spotify source not configured")
-        source = get_spotify_source(spotify_source_id)
-        cfg_path = Path(source["config_path"])
         payload = cfg.model_dump(exclude={"roomcast_last_volume"})
-        cfg_path.parent.mkdir(parents=True, exist_ok=True)
-        cfg_path.write_text(json.dumps(payload, indent=2))
+        write_spotify_config_file(spotify_source_id, payload)
         if "roomcast_last_volume" in cfg.model_fields_set:
             set_roomcast_last_volume(cfg.roomcast_last_volume, spotify_source_id)
         else:
@@ -330,49 +389,48 @@ def create_spotify_router(
         delete_token(spotify_source_id)
         return {"ok": True}
 
+    @router.get("/api/spotify/diagnostics")
+    async def spotify_diagnostics(_: dict = Depends(require_admin)) -> dict:
+        return diagnostics()
+
     @router.get("/api/spotify/player/status")
     async def spotify_player_status(
         channel_id: Optional[str] = Query(default=None),
         _: None = Depends(require_spotify_provider_dep),
     ) -> dict:
         resolved = resolve_channel_id(channel_id)
-        token = ensure_spotify_token(resolved)
+        return await get_player_status(resolved)
+
+    @router.websocket("/ws/spotify/player")
+    async def spotify_player_ws(ws: WebSocket):
+        await ws.accept()
+        user = await require_ws_user(ws)
+        if not user:
+            return
         try:
-            resp = await spotify_request("GET", "/me/player", token, resolved)
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=503, detail=f"Spotify API request failed: {exc}") from exc
-        if resp.status_code == 204:
-            snapshot = public_player_snapshot(get_player_snapshot(resolved))
-            payload: dict = {"active": False}
-            if snapshot:
-                payload["snapshot"] = snapshot
-            return payload
-        if resp.status_code >= 400:
-            raise HTTPException(status_code=resp.status_code, detail=resp.text)
-        data = resp.json()
-        active = bool(data.get("device"))
-        device = data.get("device") or {}
-        preferred_names = [name.lower() for name in preferred_roomcast_device_names(resolved)]
-        device_name = (device.get("name") or "").strip().lower()
-        is_roomcast_device = bool(device_name) and device_name in preferred_names
-        payload = {
-            "active": active,
-            "is_playing": data.get("is_playing", False),
-            "progress_ms": data.get("progress_ms"),
-            "device": device,
-            "device_is_roomcast": is_roomcast_device,
-            "item": data.get("item", {}),
-            "shuffle_state": data.get("shuffle_state", False),
-            "repeat_state": data.get("repeat_state", "off"),
-            "context": data.get("context"),
-        }
-        if is_roomcast_device and data.get("item"):
-            set_player_snapshot(resolved, data)
-        if not active:
-            snapshot = public_player_snapshot(get_player_snapshot(resolved))
-            if snapshot:
-                payload["snapshot"] = snapshot
-        return payload
+            require_spotify_provider_dep()
+        except HTTPException:
+            await ws.close(code=1008)
+            return
+        add_player_watcher(ws, user)
+        try:
+            while True:
+                raw = await ws.receive_text()
+                try:
+                    message = json.loads(raw)
+                except ValueError:
+                    continue
+                if not isinstance(message, dict) or message.get("type") != "subscribe":
+                    continue
+                try:
+                    resolved = resolve_channel_id(message.get("channel_id")) if message.get("channel_id") else None
+                except HTTPException:
+                    resolved = None
+                watch_player(ws, resolved)
+        except Exception:
+            pass
+        finally:
+            remove_player_watcher(ws)
 
     @router.get("/api/spotify/player/queue")
     async def spotify_player_queue(
@@ -412,6 +470,7 @@ def create_spotify_router(
             )
         body = {"device_ids": [device["id"]], "play": payload.play}
         resp = await spotify_request("PUT", "/me/player", token, resolved, json=body)
+        player_changed(resolved)
         if resp.status_code >= 400:
             raise HTTPException(status_code=resp.status_code, detail=resp.text)
         remembered_volume = roomcast_last_volume(resolved)
@@ -449,7 +508,7 @@ def create_spotify_router(
             "limit": limit,
         }
         path = _with_query("/search", params)
-        resp = await spotify_request("GET", path, token, resolved)
+        resp = await _catalog_request("search", path, token, resolved)
         if resp.status_code >= 400:
             raise HTTPException(status_code=resp.status_code, detail=resp.text)
         data = resp.json()
@@ -473,7 +532,7 @@ def create_spotify_router(
         token = ensure_spotify_token(resolved)
         params = {"limit": min(limit, 50), "offset": max(0, offset)}
         path = _with_query("/me/playlists", params)
-        resp = await spotify_request("GET", path, token, resolved)
+        resp = await _catalog_request("playlists", path, token, resolved)
         if resp.status_code >= 400:
             raise HTTPException(status_code=resp.status_code, detail=resp.text)
         data = resp.json()
@@ -512,7 +571,7 @@ def create_spotify_router(
 
         history_params = {"limit": min(50, max(history_limit, limit))}
         history_path = _with_query("/me/player/recently-played", history_params)
-        history_resp = await spotify_request("GET", history_path, token, resolved)
+        history_resp = await _catalog_request("recent", history_path, token, resolved)
         if history_resp.status_code == 403:
             return {
                 "items": [],
@@ -546,21 +605,23 @@ def create_spotify_router(
             if len(ordered) >= limit:
                 break
 
-        items: list[dict] = []
-        for playlist_id, played_at in ordered:
-            fields = "id,name,description,uri,images,owner(display_name),tracks(total)"
+        fields = "id,name,description,uri,images,owner(display_name),tracks(total),snapshot_id"
+
+        async def _playlist_detail(playlist_id: str, played_at: Optional[str]) -> Optional[dict]:
             detail_path = _with_query(f"/playlists/{playlist_id}", {"fields": fields})
-            detail_resp = await spotify_request("GET", detail_path, token, resolved)
+            detail_resp = await _catalog_request("playlist", detail_path, token, resolved, playlist_id=playlist_id)
             if detail_resp.status_code >= 400:
-                continue
+                return None
             detail = detail_resp.json()
             playlist = map_spotify_playlist(detail) if isinstance(detail, dict) else None
-            if not playlist:
-                continue
-            if played_at:
+            if playlist and played_at:
                 playlist["recent_played_at"] = played_at
-            items.append(playlist)
+            return playlist
 
+        details = await _gather_limited(
+            [lambda pid=playlist_id, at=played_at: _playlist_detail(pid, at) for playlist_id, played_at in ordered]
+        )
+        items = [playlist for playlist in details if playlist]
         return {"items": items, "limit": limit, "scope_granted": True}
 
     @router.get("/api/spotify/playlists/{playlist_id}")
@@ -571,7 +632,7 @@ def create_spotify_router(
     ) -> dict:
         resolved = resolve_channel_id(channel_id)
         token = ensure_spotify_token(resolved)
-        resp = await spotify_request("GET", f"/playlists/{playlist_id}", token, resolved)
+        resp = await _catalog_request("playlist", f"/playlists/{playlist_id}", token, resolved, playlist_id=playlist_id)
         if resp.status_code >= 400:
             raise HTTPException(status_code=resp.status_code, detail=resp.text)
         data = resp.json()
@@ -592,7 +653,7 @@ def create_spotify_router(
         token = ensure_spotify_token(resolved)
         params = {"limit": min(limit, 100), "offset": max(0, offset)}
         path = _with_query(f"/playlists/{playlist_id}/tracks", params)
-        resp = await spotify_request("GET", path, token, resolved)
+        resp = await _catalog_request("tracks", path, token, resolved, playlist_id=playlist_id)
         if resp.status_code >= 400:
             raise HTTPException(status_code=resp.status_code, detail=resp.text)
         data = resp.json()
@@ -640,6 +701,11 @@ def create_spotify_router(
         if resp.status_code >= 400:
             raise HTTPException(status_code=resp.status_code, detail=resp.text)
         data = resp.json() if resp.text else {}
+        invalidate_catalog(
+            resolve_spotify_source_id(resolved) or resolved,
+            playlist_id=playlist_id,
+            snapshot_id=data.get("snapshot_id"),
+        )
         return {"ok": True, "snapshot_id": data.get("snapshot_id")}
 
     @router.get("/api/spotify/playlists/{playlist_id}/summary")
@@ -650,23 +716,45 @@ def create_spotify_router(
     ) -> dict:
         resolved = resolve_channel_id(channel_id)
         token = ensure_spotify_token(resolved)
-        total_duration = 0
-        total_tracks = None
-        offset = 0
+        source_id = resolve_spotify_source_id(resolved) or resolved
+        snapshot_path = _with_query(f"/playlists/{playlist_id}", {"fields": "snapshot_id"})
+        snapshot_resp = await _catalog_request("playlist", snapshot_path, token, resolved, playlist_id=playlist_id)
+        snapshot = snapshot_resp.json() if snapshot_resp.status_code == 200 else None
+        snapshot_id = snapshot.get("snapshot_id") if isinstance(snapshot, dict) else None
+        cached = get_playlist_summary(source_id, playlist_id, snapshot_id)
+        if cached is not None:
+            return cached
+
         limit = 100
-        while True:
-            params = {
-                "limit": limit,
-                "offset": offset,
-                "fields": "items(track(duration_ms,is_local)),total,next,offset,limit",
-            }
-            path = _with_query(f"/playlists/{playlist_id}/tracks", params)
-            resp = await spotify_request("GET", path, token, resolved)
+        fields = "items(track(duration_ms,is_local)),total,next,offset,limit"
+
+        async def _page(offset: int) -> dict:
+            path = _with_query(f"/playlists/{playlist_id}/tracks", {"limit": limit, "offset": offset, "fields": fields})
+            resp = await _catalog_request("tracks", path, token, resolved, playlist_id=playlist_id)
             if resp.status_code >= 400:
                 raise HTTPException(status_code=resp.status_code, detail=resp.text)
             data = resp.json()
-            items = data.get("items") or []
-            for item in items:
+            return data if isinstance(data, dict) else {}
+
+        # The first page tells us the total; the rest are fetched in parallel.
+        pages = [await _page(0)]
+        total_tracks = pages[0].get("total") if isinstance(pages[0].get("total"), int) else None
+        if pages[0].get("next"):
+            if total_tracks is not None:
+                offsets = range(limit, total_tracks, limit)
+                pages.extend(await _gather_limited([lambda offset=offset: _page(offset) for offset in offsets]))
+            else:
+                offset = limit
+                while True:
+                    page = await _page(offset)
+                    pages.append(page)
+                    if not page.get("next") or not page.get("items"):
+                        break
+                    offset += limit
+
+        total_duration = 0
+        for page in pages:
+            for item in page.get("items") or []:
                 track = item.get("track") if isinstance(item, dict) else None
                 if not isinstance(track, dict):
                     continue
@@ -675,22 +763,12 @@ def create_spotify_router(
                 duration = track.get("duration_ms")
                 if isinstance(duration, (int, float)):
                     total_duration += max(0, int(duration))
-            if isinstance(data.get("total"), int):
-                total_tracks = data.get("total")
-            next_url = data.get("next")
-            offset_value = data.get("offset", offset)
-            limit_value = data.get("limit", limit)
-            if not isinstance(limit_value, int) or limit_value <= 0:
-                break
-            offset = offset_value + limit_value
-            if not next_url:
-                break
-            if isinstance(total_tracks, int) and offset >= total_tracks:
-                break
-        return {
+        summary = {
             "tracks_total": total_tracks,
             "duration_ms_total": total_duration,
         }
+        store_playlist_summary(source_id, playlist_id, snapshot_id, summary)
+        return summary
 
     @router.post("/api/spotify/player/play")
     async def spotify_play(
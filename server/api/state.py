@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+
+def create_state_router(
+    *,
+    require_admin: Callable,
+    export_state: Callable[[], dict],
+    state_status: Callable[[], dict],
+    flush_state: Callable[[], Any],
+) -> APIRouter:
+    router = APIRouter()
+
+    @router.get("/api/state")
+    async def state_info(_: dict = Depends(require_admin)) -> dict:
+        return state_status()
+
+    @router.get("/api/state/export")
+    async def state_export(_: dict = Depends(require_admin)) -> JSONResponse:
+        await flush_state()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return JSONResponse(
+            {"exported_at": int(time.time()), **state_status(), "documents": export_state()},
+            headers={"Content-Disposition": f'attachment; filename="roomcast-state-{stamp}.json"'},
+        )
+
+    return router
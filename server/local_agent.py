@@ -30,6 +30,8 @@ def _agent_env() -> dict:
     env.setdefault("ROOMCAST_RESTART_COMMAND", "")
     env.setdefault("PLAYBACK_DEVICE", env.get("PLAYBACK_DEVICE", "hw:0,0"))
     env.setdefault("SNAPCLIENT_BIN", env.get("SNAPCLIENT_BIN", "snapclient"))
+    # The controller's own agent listens on loopback only; announcing it would mislead discovery.
+    env.setdefault("AGENT_MDNS_ENABLED", "0")
     return env
 
 
@@ -74,14 +74,18 @@ except Exception:  # pragma: no cover - optional dependency
 from api.streams import create_streams_router
 from api.audiobookshelf import create_audiobookshelf_router
 from api.health import create_health_router
+from api.state import create_state_router
 from api.playback import create_playback_router
 from api.ui import create_ui_router
 from services.snapcast_client import SnapcastClient, is_rpc_method_not_found_error
 from services import spotify_api
+from services.spotify_scheduler import PRIORITY_CONTROL
 from services.agent_client import AgentClient
 from services.agent_metadata import AgentMetadataService
 from services.channels import ChannelsService
-from services.nodes_store import NodesStore
+from services.nodes_store import NodesStore, NodesWriteBehind
+from services.state_store import JsonFileStore, SqliteStateStore
+from services.file_cache import JsonFileCache
 from services.node_registration import NodeRegistrationService
 from services.node_terminal import NodeTerminalService
 from services.node_discovery import NodeDiscoveryService
@@ -92,6 +96,13 @@ from services.snapcast_service import SnapcastService
 from services.web_node_approval import WebNodeApprovalService
 from services.auth_service import AuthService
 from services.node_broadcast import NodeBroadcastService
+from services.spotify_player import SpotifyPlayerPoller
+from services.spotify_catalog import SpotifyCatalogCache
+from services.radio_browser_cache import RadioBrowserCache
+from services.radio_browser_mirrors import RadioBrowserMirrors, radio_browser_base_url_candidates
+from services.radio_station_index import RadioStationIndex
+from services.node_projection import NodeProjectionCache, NodeRegistry
+from services.node_state import NodeStateTracker
 try:
     from services.sonos import SonosService
 except Exception:  # pragma: no cover - optional dependency
@@ -100,6 +111,10 @@ try:
     from services.cast import CastService
 except Exception:  # pragma: no cover - optional dependency
     CastService = None
+try:
+    from services.node_mdns import NodeMdnsIndex
+except Exception:  # pragma: no cover - optional dependency
+    NodeMdnsIndex = None
 from services.optional import NullCastService, NullProvider, NullSonosService
 from services.spotify_config import SpotifyConfigService
 
@@ -109,6 +124,7 @@ log = logging.getLogger("roomcast")
 
 SNAPSERVER_HOST = os.getenv("SNAPSERVER_HOST", "snapserver")
 SNAPSERVER_PORT = int(os.getenv("SNAPSERVER_PORT", "1780"))
+SNAPCAST_MIRROR_MAX_AGE = float(os.getenv("SNAPCAST_MIRROR_MAX_AGE", "60"))
 SNAPCLIENT_PORT = int(os.getenv("SNAPCLIENT_PORT", "1704"))
 CONFIG_PATH = Path(os.getenv("CONFIG_PATH", "/config/spotify.json"))
 CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -117,15 +133,27 @@ LIBRESPOT_STATUS_PATH = Path(os.getenv("STATUS_PATH", "/config/librespot-status.
 DISCOVERY_CIDR = os.getenv("DISCOVERY_CIDR", "").strip()
 DISCOVERY_MAX_HOSTS = int(os.getenv("DISCOVERY_MAX_HOSTS", "4096"))
 DISCOVERY_CONCURRENCY = int(os.getenv("DISCOVERY_CONCURRENCY", "25"))
+DISCOVERY_PRESCAN_TIMEOUT = float(os.getenv("DISCOVERY_PRESCAN_TIMEOUT", "0.5"))
+DISCOVERY_PRESCAN_CONCURRENCY = int(os.getenv("DISCOVERY_PRESCAN_CONCURRENCY", "256"))
+SONOS_HTTP_PORT = 1400
+CAST_PORT = 8009
+DISCOVERY_MDNS_ENABLED = os.getenv("DISCOVERY_MDNS_ENABLED", "1").lower() not in {"0", "false", "no"}
 AGENT_PORT = int(os.getenv("AGENT_PORT", "9700"))
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID", "")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET", "")
 SPOTIFY_REDIRECT_URI = os.getenv("SPOTIFY_REDIRECT_URI", "http://localhost:8000/api/spotify/callback")
 SPOTIFY_AUTH_BROKER_URL = os.getenv("SPOTIFY_AUTH_BROKER_URL", "").strip()
 SPOTIFY_TOKEN_PATH = Path(os.getenv("SPOTIFY_TOKEN_PATH", "/config/spotify-token.json"))
-SPOTIFY_REFRESH_CHECK_INTERVAL = int(os.getenv("SPOTIFY_REFRESH_CHECK_INTERVAL", "60"))
 SPOTIFY_REFRESH_LEEWAY = int(os.getenv("SPOTIFY_REFRESH_LEEWAY", "180"))
 SPOTIFY_REFRESH_FAILURE_BACKOFF = int(os.getenv("SPOTIFY_REFRESH_FAILURE_BACKOFF", "120"))
+SPOTIFY_HTTP_MAX_CONNECTIONS = int(os.getenv("SPOTIFY_HTTP_MAX_CONNECTIONS", "20"))
+SPOTIFY_RATE_LIMIT_PER_SECOND = float(os.getenv("SPOTIFY_RATE_LIMIT_PER_SECOND", "10"))
+SPOTIFY_RATE_LIMIT_BURST = int(os.getenv("SPOTIFY_RATE_LIMIT_BURST", "20"))
+SPOTIFY_MAX_CONCURRENCY_PER_SOURCE = int(os.getenv("SPOTIFY_MAX_CONCURRENCY_PER_SOURCE", "8"))
+SPOTIFY_MAX_RETRY_AFTER = float(os.getenv("SPOTIFY_MAX_RETRY_AFTER", "10"))
+SPOTIFY_CATALOG_CACHE_BYTES = int(os.getenv("SPOTIFY_CATALOG_CACHE_BYTES", str(16 * 1024 * 1024)))
+SPOTIFY_CATALOG_MAX_STALE = float(os.getenv("SPOTIFY_CATALOG_MAX_STALE", "3600"))
+SPOTIFY_CATALOG_CONCURRENCY = int(os.getenv("SPOTIFY_CATALOG_CONCURRENCY", "8"))
 NODES_PATH = Path(os.getenv("NODES_PATH", "/config/nodes.json"))
 WEBRTC_ENABLED = os.getenv("WEBRTC_ENABLED", "1").lower() not in {"0", "false", "no"}
 if WebAudioRelay is None:
@@ -144,11 +172,18 @@ TRANSIENT_NODE_FIELDS = {
     "sonos_stream_active",
     "sonos_stream_last_client",
 }
-AGENT_LATEST_VERSION = os.getenv("AGENT_LATEST_VERSION", "0.3.23").strip()
+AGENT_LATEST_VERSION = os.getenv("AGENT_LATEST_VERSION", "0.3.29").strip()
 NODE_RESTART_TIMEOUT = int(os.getenv("NODE_RESTART_TIMEOUT", "120"))
 NODE_RESTART_INTERVAL = int(os.getenv("NODE_RESTART_INTERVAL", "5"))
 NODE_HEALTH_INTERVAL = int(os.getenv("NODE_HEALTH_INTERVAL", "30"))
 NODE_REDISCOVERY_INTERVAL = int(os.getenv("NODE_REDISCOVERY_INTERVAL", "90"))
+NODES_SAVE_INTERVAL = float(os.getenv("NODES_SAVE_INTERVAL", "1.0"))
+NODE_BROADCAST_DEBOUNCE = float(os.getenv("NODE_BROADCAST_DEBOUNCE", "0.05"))
+NODE_BROADCAST_MAX_LATENCY = float(os.getenv("NODE_BROADCAST_MAX_LATENCY", "0.25"))
+NODE_BROADCAST_SEND_TIMEOUT = float(os.getenv("NODE_BROADCAST_SEND_TIMEOUT", "5"))
+NODE_BROADCAST_QUEUE_SIZE = int(os.getenv("NODE_BROADCAST_QUEUE_SIZE", "64"))
+SPOTIFY_PLAYER_POLL_INTERVAL = float(os.getenv("SPOTIFY_PLAYER_POLL_INTERVAL", "5"))
+SPOTIFY_PLAYER_IDLE_POLL_INTERVAL = float(os.getenv("SPOTIFY_PLAYER_IDLE_POLL_INTERVAL", "15"))
 LIBRESPOT_FALLBACK_NAME = os.getenv("LIBRESPOT_FALLBACK_NAME", "RoomCast").strip() or "RoomCast"
 SPOTIFY_SEARCH_TYPES = ("album", "track", "artist", "playlist")
 NODE_TERMINAL_ENABLED = os.getenv("NODE_TERMINAL_ENABLED", "1").lower() not in {"0", "false", "no"}
@@ -195,6 +230,23 @@ PRIMARY_CHANNEL_ID = os.getenv("PRIMARY_CHANNEL_ID", "ch1").strip() or "ch1"
 CHANNEL_ID_PREFIX = os.getenv("CHANNEL_ID_PREFIX", "ch").strip() or "ch"
 PLAYER_SNAPSHOT_PATH = Path(os.getenv("PLAYER_SNAPSHOT_PATH", "/config/player-snapshots.json"))
 PLAYER_SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+SPOTIFY_FILE_REVALIDATE_INTERVAL = float(os.getenv("SPOTIFY_FILE_REVALIDATE_INTERVAL", "1.0"))
+STATE_BACKEND = os.getenv("STATE_BACKEND", "json").strip().lower()
+STATE_DB_PATH = Path(os.getenv("STATE_DB_PATH", "/config/roomcast.db"))
+STATE_DOCUMENTS = {
+    NODES_PATH: "nodes",
+    CHANNELS_PATH: "channels",
+    SOURCES_PATH: "sources",
+    PROVIDERS_PATH: "providers",
+    USERS_PATH: "users",
+    PLAYER_SNAPSHOT_PATH: "player_snapshots",
+}
+if STATE_BACKEND == "sqlite":
+    state_store = SqliteStateStore(STATE_DB_PATH, STATE_DOCUMENTS)
+else:
+    if STATE_BACKEND != "json":
+        log.warning("Unknown STATE_BACKEND %r; using JSON files", STATE_BACKEND)
+    state_store = JsonFileStore(STATE_DOCUMENTS)
 RADIO_CHANNEL_SLOTS = [
     {
         "suffix": 3,
@@ -226,6 +278,15 @@ def radio_channel_slots_active() -> list[dict]:
 RADIO_BROWSER_BASE_URL = os.getenv("RADIO_BROWSER_BASE_URL", "https://de1.api.radio-browser.info/json").rstrip("/")
 RADIO_BROWSER_TIMEOUT = float(os.getenv("RADIO_BROWSER_TIMEOUT", "8"))
 RADIO_BROWSER_CACHE_TTL = int(os.getenv("RADIO_BROWSER_CACHE_TTL", "300"))
+RADIO_BROWSER_CACHE_PATH = Path(os.getenv("RADIO_BROWSER_CACHE_PATH", "/config/radio-browser-cache.json"))
+RADIO_BROWSER_CACHE_MAX_ENTRIES = int(os.getenv("RADIO_BROWSER_CACHE_MAX_ENTRIES", "500"))
+RADIO_BROWSER_CACHE_MAX_BYTES = int(os.getenv("RADIO_BROWSER_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+RADIO_BROWSER_CACHE_MAX_STALE = float(os.getenv("RADIO_BROWSER_CACHE_MAX_STALE", "86400"))
+RADIO_BROWSER_HEDGE_MAX_DELAY = float(os.getenv("RADIO_BROWSER_HEDGE_MAX_DELAY", "2"))
+RADIO_STATION_INDEX_ENABLED = os.getenv("RADIO_STATION_INDEX_ENABLED", "0").lower() in {"1", "true", "yes"}
+RADIO_STATION_INDEX_PATH = Path(os.getenv("RADIO_STATION_INDEX_PATH", "/config/radio-stations.db"))
+RADIO_STATION_INDEX_SYNC_INTERVAL = float(os.getenv("RADIO_STATION_INDEX_SYNC_INTERVAL", "3600"))
+RADIO_STATION_INDEX_FULL_SYNC_INTERVAL = float(os.getenv("RADIO_STATION_INDEX_FULL_SYNC_INTERVAL", "86400"))
 RADIO_BROWSER_USER_AGENT = os.getenv("RADIO_BROWSER_USER_AGENT", "RoomCast/Radio").strip() or "RoomCast/Radio"
 RADIO_WORKER_TOKEN = os.getenv("RADIO_WORKER_TOKEN", "").strip()
 RADIO_WORKER_PATH_PREFIX = "/api/radio/worker"
@@ -245,8 +306,13 @@ ABS_CHANNEL_SLOTS = [
 ]
 CHANNEL_IDLE_TIMEOUT = float(os.getenv("CHANNEL_IDLE_TIMEOUT", "600"))
 CHANNEL_IDLE_TIMEOUT = max(30.0, CHANNEL_IDLE_TIMEOUT)
-CHANNEL_IDLE_POLL_INTERVAL = float(os.getenv("CHANNEL_IDLE_POLL_INTERVAL", "15"))
-CHANNEL_IDLE_POLL_INTERVAL = max(1.0, min(CHANNEL_IDLE_POLL_INTERVAL, CHANNEL_IDLE_TIMEOUT))
+# Idle timers are driven by listener events; this is only a backstop re-check.
+# CHANNEL_IDLE_POLL_INTERVAL is the older name for the same setting.
+CHANNEL_IDLE_RESYNC_INTERVAL = float(
+    os.getenv("CHANNEL_IDLE_RESYNC_INTERVAL", os.getenv("CHANNEL_IDLE_POLL_INTERVAL", "120"))
+)
+CHANNEL_IDLE_RESYNC_INTERVAL = max(1.0, min(CHANNEL_IDLE_RESYNC_INTERVAL, CHANNEL_IDLE_TIMEOUT))
+CHANNEL_IDLE_SPOTIFY_CHECK_TTL = float(os.getenv("CHANNEL_IDLE_SPOTIFY_CHECK_TTL", "30"))
 WEB_NODE_APPROVAL_TIMEOUT = int(os.getenv("WEB_NODE_APPROVAL_TIMEOUT", "75"))
 WEB_NODE_APPROVAL_TIMEOUT = max(10, WEB_NODE_APPROVAL_TIMEOUT)
 
@@ -390,17 +456,17 @@ def load_providers_state() -> None:
     Existing installs infer providers if providers.json is absent.
     """
     global providers_by_id
-    if PROVIDERS_PATH.exists():
-        providers_by_id = _load_providers_file(PROVIDERS_PATH)
+    if state_store.exists(PROVIDERS_PATH):
+        providers_by_id = _load_providers_file(PROVIDERS_PATH, store=state_store)
         return
-    inferred = infer_providers(CHANNELS_PATH, SOURCES_PATH)
+    inferred = infer_providers(CHANNELS_PATH, SOURCES_PATH, store=state_store)
     providers_by_id = inferred
     if inferred:
-        _save_providers_file(PROVIDERS_PATH, inferred)
+        _save_providers_file(PROVIDERS_PATH, inferred, store=state_store)
 
 
 def save_providers_state() -> None:
-    _save_providers_file(PROVIDERS_PATH, providers_by_id)
+    _save_providers_file(PROVIDERS_PATH, providers_by_id, store=state_store)
 
 
 def is_provider_enabled(provider_id: str) -> bool:
@@ -511,11 +577,11 @@ def _normalize_channel_id(value: Optional[str], fallback: str) -> str:
 
 def _load_player_snapshots() -> None:
     global player_snapshots
-    if not PLAYER_SNAPSHOT_PATH.exists():
+    if not state_store.exists(PLAYER_SNAPSHOT_PATH):
         player_snapshots = {}
         return
     try:
-        data = json.loads(PLAYER_SNAPSHOT_PATH.read_text())
+        data = state_store.read(PLAYER_SNAPSHOT_PATH)
     except Exception as exc:  # pragma: no cover - filesystem edge
         log.warning("Failed to load player snapshots: %s", exc)
         player_snapshots = {}
@@ -528,7 +594,7 @@ def _load_player_snapshots() -> None:
 
 def _save_player_snapshots() -> None:
     try:
-        PLAYER_SNAPSHOT_PATH.write_text(json.dumps(player_snapshots, indent=2, sort_keys=True))
+        state_store.write(PLAYER_SNAPSHOT_PATH, player_snapshots, indent=2, sort_keys=True)
     except Exception as exc:  # pragma: no cover - filesystem edge
         log.warning("Failed to persist player snapshots: %s", exc)
 
@@ -693,6 +759,7 @@ def _default_radio_state() -> dict:
         "station_id": None,
         "station_name": None,
         "stream_url": None,
+        "source_url": None,
         "station_country": None,
         "station_countrycode": None,
         "station_favicon": None,
@@ -876,6 +943,7 @@ def _apply_radio_station(channel: dict, payload: Any) -> dict:
         "station_id": getattr(payload, "station_id", None),
         "station_name": getattr(payload, "name", None),
         "stream_url": getattr(payload, "stream_url", None),
+        "source_url": getattr(payload, "source_url", None),
         "station_country": getattr(payload, "country", None),
         "station_countrycode": getattr(payload, "countrycode", None),
         "station_favicon": getattr(payload, "favicon", None),
@@ -890,7 +958,7 @@ def _apply_radio_station(channel: dict, payload: Any) -> dict:
 
 
 def _write_channels_file(entries: list[dict]) -> None:
-    CHANNELS_PATH.write_text(json.dumps(entries, indent=2))
+    state_store.write(CHANNELS_PATH, entries, indent=2)
 
 
 def _ensure_channel_paths(entry: dict) -> None:
@@ -900,7 +968,7 @@ def _ensure_channel_paths(entry: dict) -> None:
 
 
 def _write_sources_file(entries: list[dict]) -> None:
-    SOURCES_PATH.write_text(json.dumps(entries, indent=2))
+    state_store.write(SOURCES_PATH, entries, indent=2)
 
 
 def _is_spotify_source_id(value: Optional[str]) -> bool:
@@ -1023,9 +1091,9 @@ def _build_provider_channels(existing: Dict[str, dict]) -> list[dict]:
 def load_sources() -> None:
     global sources_by_id
     entries: list[Any] = []
-    if SOURCES_PATH.exists():
+    if state_store.exists(SOURCES_PATH):
         try:
-            entries = json.loads(SOURCES_PATH.read_text()) or []
+            entries = state_store.read(SOURCES_PATH) or []
         except json.JSONDecodeError:
             log.warning("sources.json is invalid; regenerating defaults")
             entries = []
@@ -1114,9 +1182,9 @@ def resolve_channel_spotify_source_id(channel_id: Optional[str]) -> Optional[str
 def load_channels() -> None:
     global channels_by_id, channel_order
     existing_entries: list[Any] = []
-    if CHANNELS_PATH.exists():
+    if state_store.exists(CHANNELS_PATH):
         try:
-            existing_entries = json.loads(CHANNELS_PATH.read_text()) or []
+            existing_entries = state_store.read(CHANNELS_PATH) or []
         except json.JSONDecodeError:
             log.warning("channels.json is invalid; regenerating defaults")
             existing_entries = []
@@ -1138,6 +1206,7 @@ def save_channels() -> None:
     _resequence_channel_order()
     ordered = [channels_by_id[cid] for cid in channel_order if cid in channels_by_id]
     _write_channels_file(ordered)
+    channel_idle_service.notify()
 
 
 def _resequence_channel_order() -> None:
@@ -1276,7 +1345,7 @@ async def _apply_channel_routing(channel_id: str) -> None:
     save_nodes()
 
 
-snapcast = SnapcastClient(SNAPSERVER_HOST, SNAPSERVER_PORT)
+snapcast = SnapcastClient(SNAPSERVER_HOST, SNAPSERVER_PORT, mirror_max_age=SNAPCAST_MIRROR_MAX_AGE)
 snapcast_service = SnapcastService(
     snapcast_client=snapcast,
     normalize_percent=lambda *args, **kwargs: _normalize_percent(*args, **kwargs),
@@ -1306,6 +1375,7 @@ PUBLIC_API_PREFIXES = (
 
 auth_service = AuthService(
     users_path=USERS_PATH,
+    state_store=state_store,
     server_default_name=SERVER_DEFAULT_NAME,
     session_signer=SESSION_SIGNER,
     session_cookie_name=SESSION_COOKIE_NAME,
@@ -1335,13 +1405,12 @@ async def session_middleware(request: Request, call_next):
 
 
 
-nodes: Dict[str, dict] = {}
+nodes: Dict[str, dict] = NodeRegistry()
 sections: list[dict] = []
 browser_ws: Dict[str, WebSocket] = {}
 webrtc_relay: Optional[WebAudioRelay] = None
 DEFAULT_EQ_PRESET = "peq15"
 node_health_task: Optional[asyncio.Task] = None
-spotify_refresh_task: Optional[asyncio.Task] = None
 radio_runtime_status: Dict[str, dict] = {}
 radio_assignments_version = 1
 radio_assignment_waiters: set[asyncio.Future] = set()
@@ -1356,6 +1425,7 @@ ABS_ASSIGNMENT_DEFAULT_WAIT = float(os.getenv("AUDIOBOOKSHELF_ASSIGNMENT_WAIT",
 ABS_ASSIGNMENT_DEFAULT_WAIT = max(1.0, min(ABS_ASSIGNMENT_DEFAULT_WAIT, 30.0))
 ABS_ASSIGNMENT_MAX_WAIT = 30.0
 channel_idle_task: Optional[asyncio.Task] = None
+radio_station_index_task: Optional[asyncio.Task] = None
 
 
 sonos_connection_task: Optional[asyncio.Task] = None
@@ -1369,7 +1439,13 @@ node_terminal_service = NodeTerminalService(
 )
 
 
-node_broadcast_service = NodeBroadcastService()
+node_broadcast_service = NodeBroadcastService(
+    queue_size=NODE_BROADCAST_QUEUE_SIZE,
+    send_timeout=NODE_BROADCAST_SEND_TIMEOUT,
+    debounce=NODE_BROADCAST_DEBOUNCE,
+    max_latency=NODE_BROADCAST_MAX_LATENCY,
+)
+node_state_tracker = NodeStateTracker(node_visible=lambda node, user: _node_visible_to_user(node, user))
 
 
 node_discovery_service = NodeDiscoveryService(
@@ -1383,6 +1459,17 @@ node_discovery_service = NodeDiscoveryService(
     save_nodes=lambda: save_nodes(),
     refresh_agent_metadata=lambda node, persist=True: refresh_agent_metadata(node, persist=persist),
     broadcast_nodes=lambda: broadcast_nodes(),
+    lookup_mdns=lambda fingerprint: node_mdns_index.lookup(fingerprint) if node_mdns_index else None,
+    prescan_ports=(SONOS_HTTP_PORT, CAST_PORT),
+    prescan_timeout=DISCOVERY_PRESCAN_TIMEOUT,
+    prescan_concurrency=DISCOVERY_PRESCAN_CONCURRENCY,
+)
+
+
+node_mdns_index = (
+    NodeMdnsIndex(on_seen=node_discovery_service.notify_mdns_seen)
+    if NodeMdnsIndex is not None and DISCOVERY_MDNS_ENABLED
+    else None
 )
 
 
@@ -1426,6 +1513,7 @@ if SonosService:
         scan_http_timeout=SONOS_SCAN_HTTP_TIMEOUT,
         detect_discovery_networks=lambda: _detect_sonos_discovery_networks(node_discovery_service, ROOMCAST_PUBLIC_HOST),
         hosts_for_networks=lambda networks, limit: node_discovery_service.hosts_for_networks(networks, limit=limit),
+        filter_open_hosts=lambda hosts: node_discovery_service.hosts_with_open_port(hosts, SONOS_HTTP_PORT),
     )
     sonos_service.enabled = True
 else:
@@ -1466,7 +1554,7 @@ provider_runtime_service = ProviderRuntimeService(
     save_channels=save_channels,
     sources_by_id=sources_by_id,
     channels_by_id=channels_by_id,
-    sources_path=SOURCES_PATH,
+    sources_exist=lambda: state_store.exists(SOURCES_PATH),
     config_path=CONFIG_PATH,
     spotify_token_path=SPOTIFY_TOKEN_PATH,
     librespot_status_path=LIBRESPOT_STATUS_PATH,
@@ -1479,18 +1567,7 @@ provider_runtime_service = ProviderRuntimeService(
 async def _spotify_is_playing_elsewhere(channel_id: str) -> bool:
     try:
         token = _ensure_spotify_token(channel_id)
-        resp = await spotify_api.spotify_request(
-            "GET",
-            "/me/player",
-            token,
-            channel_id,
-            spotify_refresh_func=lambda token, identifier: spotify_api.spotify_refresh(
-                token,
-                identifier,
-                spotify_auth_broker_url=SPOTIFY_AUTH_BROKER_URL,
-                save_token=spotify_config.save_token,
-            ),
-        )
+        resp = await spotify_client.request("GET", "/me/player", token, channel_id)
     except HTTPException:
         return False
     if resp.status_code == 204:
@@ -1509,7 +1586,7 @@ async def _spotify_is_playing_elsewhere(channel_id: str) -> bool:
 
 
 channel_idle_service = ChannelIdleService(
-    channel_order=channel_order,
+    get_channel_order=lambda: channel_order,
     channels_by_id=channels_by_id,
     nodes=nodes,
     snapcast=snapcast,
@@ -1523,26 +1600,18 @@ channel_idle_service = ChannelIdleService(
         "PUT",
         channel_id=channel_id,
         ensure_spotify_token=lambda identifier=None: _ensure_spotify_token(identifier),
-        spotify_request_func=lambda method, path, token, identifier=None, **kwargs: spotify_api.spotify_request(
-            method,
-            path,
-            token,
-            identifier,
-            spotify_refresh_func=lambda token, identifier: spotify_api.spotify_refresh(
-                token,
-                identifier,
-                spotify_auth_broker_url=SPOTIFY_AUTH_BROKER_URL,
-                save_token=spotify_config.save_token,
-            ),
-            **kwargs,
+        spotify_request_func=lambda method, path, token, identifier=None, **kwargs: spotify_client.request(
+            method, path, token, identifier, **kwargs
         ),
     ),
     spotify_is_playing_elsewhere=_spotify_is_playing_elsewhere,
     parse_spotify_error=lambda detail: spotify_api.parse_spotify_error(detail),
     idle_timeout=CHANNEL_IDLE_TIMEOUT,
-    poll_interval=CHANNEL_IDLE_POLL_INTERVAL,
+    resync_interval=CHANNEL_IDLE_RESYNC_INTERVAL,
+    spotify_check_ttl=CHANNEL_IDLE_SPOTIFY_CHECK_TTL,
     logger=log,
 )
+snapcast.mirror.add_listener(lambda _method: channel_idle_service.notify())
 
 
 def public_sections() -> list[dict]:
@@ -1703,7 +1772,7 @@ channels_service = ChannelsService(
 )
 
 
-def public_node(node: dict) -> dict:
+def _project_public_node(node: dict) -> dict:
     data = {k: v for k, v in node.items() if k not in SENSITIVE_NODE_FIELDS}
     data["paired"] = bool(node.get("agent_secret"))
     if node.get("type") in {"browser", "sonos", "cast"}:
@@ -1756,48 +1825,28 @@ def _node_visible_to_user(node: dict, user: Optional[dict]) -> bool:
     return user.get("id") == owner_id or user.get("role") == "admin"
 
 
-def public_nodes() -> list[dict]:
-    section_rank = {section.get("id"): idx for idx, section in enumerate(sections) if section.get("id")}
+node_projection_cache = NodeProjectionCache(
+    registry=nodes,
+    project=_project_public_node,
+    external_key=lambda node: (
+        node_health_service.is_restarting(node.get("id")),
+        resolve_node_channel_id(node),
+        AGENT_LATEST_VERSION,
+    ),
+    section_ids=lambda: [section.get("id") for section in sections if section.get("id")],
+)
 
-    def _node_key(entry: dict) -> tuple:
-        sid = entry.get("section_id")
-        # Unsectioned nodes should appear before user-defined sections.
-        if not sid:
-            rank = -1
-        else:
-            rank = section_rank.get(sid, 10**9)
-        order = entry.get("section_order")
-        try:
-            order_val = int(order)
-        except (TypeError, ValueError):
-            order_val = 10**9
-        name_val = (entry.get("name") or "").lower()
-        return (rank, order_val, name_val)
 
-    ordered = sorted(nodes.values(), key=_node_key)
-    return [public_node(node) for node in ordered]
+def public_node(node: dict) -> dict:
+    return node_projection_cache.public_node(node)
 
 
-def public_nodes_for_user(user: Optional[dict]) -> list[dict]:
-    section_rank = {section.get("id"): idx for idx, section in enumerate(sections) if section.get("id")}
+def public_nodes() -> list[dict]:
+    return node_projection_cache.public_nodes()
 
-    def _node_key(entry: dict) -> tuple:
-        sid = entry.get("section_id")
-        if not sid:
-            rank = -1
-        else:
-            rank = section_rank.get(sid, 10**9)
-        order = entry.get("section_order")
-        try:
-            order_val = int(order)
-        except (TypeError, ValueError):
-            order_val = 10**9
-        name_val = (entry.get("name") or "").lower()
-        return (rank, order_val, name_val)
 
-    ordered = sorted(nodes.values(), key=_node_key)
-    visible = [node for node in ordered if _node_visible_to_user(node, user)]
-    return [public_node(node) for node in visible]
+def public_nodes_for_user(user: Optional[dict]) -> list[dict]:
+    return node_projection_cache.public_nodes(lambda node: _node_visible_to_user(node, user))
 
 
 def _normalize_percent(value, *, default: int) -> int:
@@ -1889,6 +1938,8 @@ def _delete_spotify_tokens() -> None:
     for source_id, source in list(sources_by_id.items()):
         if not source or source.get("kind") != "spotify":
             continue
+        spotify_client.cancel_refresh(source_id)
+        spotify_catalog.invalidate(source_id)
         try:
             spotify_config.delete_token(source_id)
         except HTTPException:
@@ -1901,12 +1952,24 @@ def _delete_spotify_tokens() -> None:
 
 
 def _delete_spotify_token(source_id: str) -> None:
+    spotify_client.cancel_refresh(source_id)
+    spotify_catalog.invalidate(source_id)
     try:
         spotify_config.delete_token(source_id)
     except HTTPException:
         pass
 
 
+app.include_router(
+    create_state_router(
+        require_admin=require_admin,
+        export_state=lambda: state_store.export(),
+        state_status=lambda: state_store.stats(),
+        flush_state=lambda: nodes_write_behind.flush(),
+    )
+)
+
+
 app.include_router(
     create_providers_router(
         available_providers=AVAILABLE_PROVIDERS,
@@ -1952,8 +2015,12 @@ def _browser_ws() -> dict:
     return browser_ws
 
 
-def _node_watchers() -> dict:
-    return node_broadcast_service.watchers()
+def _add_node_watcher(ws: WebSocket, user: Optional[dict]) -> None:
+    node_broadcast_service.add_watcher(ws, user)
+
+
+def _remove_node_watcher(ws: WebSocket) -> None:
+    node_broadcast_service.remove_watcher(ws)
 
 
 def _pending_web_node_requests() -> Dict[str, dict]:
@@ -1992,7 +2059,11 @@ app.include_router(
         get_node_max_volume=lambda node: _get_node_max_volume(node),
         send_browser_volume=lambda node, percent: _send_browser_volume(node, percent),
         browser_ws=_browser_ws,
-        node_watchers=_node_watchers,
+        add_node_watcher=_add_node_watcher,
+        remove_node_watcher=_remove_node_watcher,
+        send_node_payload=node_broadcast_service.send,
+        node_state_snapshot=lambda user: node_state_snapshot(user),
+        node_state_resync=lambda user, revision: node_state_resync(user, revision),
         normalize_percent=lambda value, default=75: _normalize_percent(value, default=default),
         normalize_stereo_mode=lambda mode: _normalize_stereo_mode(mode),
         apply_volume_limit=lambda node, percent: _apply_volume_limit(node, percent),
@@ -2018,6 +2089,8 @@ app.include_router(
         node_terminal_max_duration=NODE_TERMINAL_MAX_DURATION,
         node_terminal_strict_host_key=NODE_TERMINAL_STRICT_HOST_KEY,
         cancel_node_rediscovery=node_discovery_service.cancel_node_rediscovery,
+        rediscovery_status=node_discovery_service.rediscovery_status,
+        persistence_status=lambda: nodes_write_behind.stats(),
         teardown_browser_node=lambda *args, **kwargs: teardown_browser_node(*args, **kwargs),
         get_webrtc_relay=_webrtc_relay,
         normalize_section_name=_normalize_section_name,
@@ -2036,6 +2109,10 @@ app.include_router(
         detect_discovery_networks=node_discovery_service.detect_discovery_networks,
         hosts_for_networks=lambda networks, limit=DISCOVERY_MAX_HOSTS: node_discovery_service.hosts_for_networks(networks, limit=limit),
         stream_host_probes=node_discovery_service.stream_host_probes,
+        mdns_entries=lambda: node_mdns_index.entries() if node_mdns_index else [],
+        scan_open_ports=node_discovery_service.scan_open_ports,
+        cast_port=CAST_PORT,
+        cast_probe_hosts=lambda hosts: cast_service.probe_hosts(hosts),
         sonos_ssdp_discover=lambda: sonos_service.ssdp_discover(),
         cast_discover=lambda: cast_service.discover(),
         discovery_max_hosts=DISCOVERY_MAX_HOSTS,
@@ -2125,18 +2202,8 @@ app.include_router(
             method,
             channel_id=channel_id,
             ensure_spotify_token=lambda identifier=None: _ensure_spotify_token(identifier),
-            spotify_request_func=lambda method, path, token, identifier=None, **kwargs: spotify_api.spotify_request(
-                method,
-                path,
-                token,
-                identifier,
-                spotify_refresh_func=lambda token, identifier: spotify_api.spotify_refresh(
-                    token,
-                    identifier,
-                    spotify_auth_broker_url=SPOTIFY_AUTH_BROKER_URL,
-                    save_token=spotify_config.save_token,
-                ),
-                **kwargs,
+            spotify_request_func=lambda method, path, token, identifier=None, **kwargs: spotify_client.request(
+                method, path, token, identifier, **kwargs
             ),
         ),
         parse_spotify_error=lambda detail: spotify_api.parse_spotify_error(detail),
@@ -2148,37 +2215,46 @@ app.include_router(create_ui_router(STATIC_DIR))
 
 app.include_router(
     create_spotify_router(
+        require_admin=require_admin,
         require_spotify_provider_dep=lambda: require_spotify_provider(),
         resolve_channel_id=lambda channel_id: resolve_channel_id(channel_id),
         resolve_spotify_source_id=lambda identifier: _resolve_spotify_source_id(identifier),
         read_spotify_config=lambda identifier: spotify_config.read_spotify_config(identifier),
+        write_spotify_config_file=lambda source_id, payload: spotify_config.write_config_file(source_id, payload),
+        update_spotify_config_file=lambda source_id, updates: spotify_config.update_config_file(source_id, updates),
         roomcast_last_volume=lambda identifier=None: spotify_config.roomcast_last_volume(identifier),
         set_roomcast_last_volume=lambda percent, identifier=None: spotify_config.set_roomcast_last_volume(percent, identifier),
         get_spotify_source=lambda source_id: get_spotify_source(source_id),
         spotify_auth_broker_url=SPOTIFY_AUTH_BROKER_URL,
         public_base_url=ROOMCAST_PUBLIC_BASE_URL,
-        save_token=lambda token, source_id: spotify_config.save_token(token, source_id),
-        delete_token=lambda source_id: spotify_config.delete_token(source_id),
+        save_token=lambda token, source_id: _save_spotify_token(token, source_id),
+        delete_token=lambda source_id: _remove_spotify_token(source_id),
         ensure_spotify_token=lambda identifier=None: _ensure_spotify_token(identifier),
         load_token=lambda channel_id=None: spotify_config.load_token(channel_id),
-        spotify_request=lambda method, path, token, identifier=None, **kwargs: spotify_api.spotify_request(
-            method,
-            path,
-            token,
-            identifier,
-            spotify_refresh_func=lambda token, identifier: spotify_api.spotify_refresh(
-                token,
-                identifier,
-                spotify_auth_broker_url=SPOTIFY_AUTH_BROKER_URL,
-                save_token=spotify_config.save_token,
-            ),
-            **kwargs,
+        spotify_request=lambda method, path, token, identifier=None, **kwargs: spotify_client.request(
+            method, path, token, identifier, **kwargs
         ),
         find_roomcast_device=lambda token, channel_id=None: _find_roomcast_device(token, channel_id),
-        preferred_roomcast_device_names=lambda channel_id=None: _preferred_roomcast_device_names(channel_id),
-        get_player_snapshot=lambda channel_id=None: _get_player_snapshot(channel_id),
-        public_player_snapshot=lambda snapshot: _public_player_snapshot(snapshot),
-        set_player_snapshot=lambda channel_id, status: _set_player_snapshot(channel_id, status),
+        catalog_get=lambda source_id, kind, path, fetch, **kwargs: spotify_catalog.get(source_id, kind, path, fetch, **kwargs),
+        invalidate_catalog=lambda source_id, **kwargs: spotify_catalog.invalidate(source_id, **kwargs),
+        diagnostics=lambda: {
+            "api": spotify_client.diagnostics(),
+            "catalog": spotify_catalog.usage(),
+            "player_watchers": spotify_player_poller.watchers(),
+        },
+        get_playlist_summary=lambda source_id, playlist_id, snapshot_id: spotify_catalog.playlist_summary(
+            source_id, playlist_id, snapshot_id
+        ),
+        store_playlist_summary=lambda source_id, playlist_id, snapshot_id, summary: spotify_catalog.store_playlist_summary(
+            source_id, playlist_id, snapshot_id, summary
+        ),
+        catalog_concurrency=SPOTIFY_CATALOG_CONCURRENCY,
+        get_player_status=lambda channel_id: spotify_player_poller.status(channel_id),
+        player_changed=lambda channel_id: spotify_player_poller.changed(channel_id),
+        require_ws_user=_require_ws_user,
+        add_player_watcher=lambda ws, user: spotify_player_broadcast.add_watcher(ws, user),
+        remove_player_watcher=lambda ws: _remove_spotify_player_watcher(ws),
+        watch_player=lambda ws, channel_id: spotify_player_poller.watch(ws, channel_id),
         map_spotify_track_simple=lambda item: _map_spotify_track_simple(item),
         map_spotify_search_bucket=lambda bucket, mapper: _map_spotify_search_bucket(bucket, mapper),
         map_spotify_album=lambda item: _map_spotify_album(item),
@@ -2192,6 +2268,26 @@ app.include_router(
     )
 )
 
+radio_browser_cache = RadioBrowserCache(
+    path=RADIO_BROWSER_CACHE_PATH,
+    max_entries=RADIO_BROWSER_CACHE_MAX_ENTRIES,
+    max_bytes=RADIO_BROWSER_CACHE_MAX_BYTES,
+    max_stale=RADIO_BROWSER_CACHE_MAX_STALE,
+)
+radio_browser_mirrors = RadioBrowserMirrors(
+    base_urls=radio_browser_base_url_candidates(RADIO_BROWSER_BASE_URL),
+    timeout=RADIO_BROWSER_TIMEOUT,
+    user_agent=RADIO_BROWSER_USER_AGENT,
+    hedge_max_delay=RADIO_BROWSER_HEDGE_MAX_DELAY,
+)
+radio_station_index = RadioStationIndex(
+    db_path=RADIO_STATION_INDEX_PATH,
+    fetch=radio_browser_mirrors.get,
+    enabled=lambda: RADIO_STATION_INDEX_ENABLED and is_provider_enabled("radio"),
+    sync_interval=RADIO_STATION_INDEX_SYNC_INTERVAL,
+    full_sync_interval=RADIO_STATION_INDEX_FULL_SYNC_INTERVAL,
+)
+
 app.include_router(
     create_radio_router(
         require_admin=require_admin,
@@ -2220,10 +2316,10 @@ app.include_router(
         radio_assignment_default_wait=RADIO_ASSIGNMENT_DEFAULT_WAIT,
         radio_assignment_max_wait=RADIO_ASSIGNMENT_MAX_WAIT,
         radio_worker_token=RADIO_WORKER_TOKEN,
-        radio_browser_base_url=RADIO_BROWSER_BASE_URL,
-        radio_browser_timeout=RADIO_BROWSER_TIMEOUT,
         radio_browser_cache_ttl=RADIO_BROWSER_CACHE_TTL,
-        radio_browser_user_agent=RADIO_BROWSER_USER_AGENT,
+        radio_browser_cache=radio_browser_cache,
+        radio_browser_mirrors=radio_browser_mirrors,
+        radio_station_index=radio_station_index,
     )
 )
 
@@ -2309,7 +2405,7 @@ async def _send_browser_volume(node: dict, requested_percent: int) -> None:
 def _cast_find_node_by_ip(ip: Optional[str]) -> Optional[dict]:
     if not ip:
         return None
-    for node in nodes.values():
+    for node in nodes.find(host=ip):
         if node.get("type") != "cast":
             continue
         if cast_service.ip_from_url(node.get("url")) == ip:
@@ -2320,7 +2416,7 @@ def _cast_find_node_by_ip(ip: Optional[str]) -> Optional[dict]:
 def _cast_client_allows_stream(channel_id: str, client_ip: Optional[str]) -> bool:
     if not client_ip:
         return False
-    for node in nodes.values():
+    for node in nodes.find(host=client_ip):
         if node.get("type") != "cast":
             continue
         if resolve_node_channel_id(node) != channel_id:
@@ -2369,7 +2465,45 @@ spotify_config = SpotifyConfigService(
     spotify_client_id_default=SPOTIFY_CLIENT_ID,
     spotify_client_secret_default=SPOTIFY_CLIENT_SECRET,
     spotify_redirect_uri_default=SPOTIFY_REDIRECT_URI,
+    file_cache=JsonFileCache(revalidate_interval=SPOTIFY_FILE_REVALIDATE_INTERVAL),
 )
+spotify_client = spotify_api.SpotifyApiClient(
+    auth_broker_url=SPOTIFY_AUTH_BROKER_URL,
+    save_token=spotify_config.save_token,
+    load_token=spotify_config.load_token,
+    resolve_source_id=_resolve_spotify_source_id,
+    seconds_until_expiry=spotify_config.token_seconds_until_expiry,
+    refresh_leeway=SPOTIFY_REFRESH_LEEWAY,
+    failure_backoff=SPOTIFY_REFRESH_FAILURE_BACKOFF,
+    max_connections=SPOTIFY_HTTP_MAX_CONNECTIONS,
+    rate_limit=SPOTIFY_RATE_LIMIT_PER_SECOND,
+    rate_burst=SPOTIFY_RATE_LIMIT_BURST,
+    max_concurrency_per_source=SPOTIFY_MAX_CONCURRENCY_PER_SOURCE,
+    max_retry_after=SPOTIFY_MAX_RETRY_AFTER,
+)
+spotify_catalog = SpotifyCatalogCache(
+    max_bytes=SPOTIFY_CATALOG_CACHE_BYTES,
+    max_stale=SPOTIFY_CATALOG_MAX_STALE,
+)
+
+
+def _save_spotify_token(token: dict, source_id: Optional[str]) -> None:
+    spotify_config.save_token(token, source_id)
+    resolved = _resolve_spotify_source_id(source_id)
+    if resolved:
+        # A newly authorized token supersedes anything remembered about the old one.
+        spotify_client.cancel_refresh(resolved)
+        spotify_client.schedule_refresh(resolved, token)
+        # The new authorization may belong to a different Spotify account.
+        spotify_catalog.invalidate(resolved)
+
+
+def _remove_spotify_token(source_id: Optional[str]) -> None:
+    spotify_config.delete_token(source_id)
+    resolved = _resolve_spotify_source_id(source_id)
+    if resolved:
+        spotify_client.cancel_refresh(resolved)
+        spotify_catalog.invalidate(resolved)
 
 
 def _ensure_spotify_token(identifier: Optional[str] = None) -> dict:
@@ -2379,6 +2513,31 @@ def _ensure_spotify_token(identifier: Optional[str] = None) -> dict:
     return token
 
 
+# Player-state watchers get their own fan-out so a slow tab cannot hold up node updates.
+spotify_player_broadcast = NodeBroadcastService(
+    queue_size=NODE_BROADCAST_QUEUE_SIZE,
+    send_timeout=NODE_BROADCAST_SEND_TIMEOUT,
+)
+spotify_player_poller = SpotifyPlayerPoller(
+    ensure_spotify_token=lambda identifier=None: _ensure_spotify_token(identifier),
+    spotify_request=lambda method, path, token, identifier=None, **kwargs: spotify_client.request(
+        method, path, token, identifier, **kwargs
+    ),
+    preferred_roomcast_device_names=lambda channel_id=None: _preferred_roomcast_device_names(channel_id),
+    get_player_snapshot=lambda channel_id=None: _get_player_snapshot(channel_id),
+    public_player_snapshot=lambda snapshot: _public_player_snapshot(snapshot),
+    set_player_snapshot=lambda channel_id, status: _set_player_snapshot(channel_id, status),
+    send=spotify_player_broadcast.send,
+    playing_interval=SPOTIFY_PLAYER_POLL_INTERVAL,
+    paused_interval=SPOTIFY_PLAYER_IDLE_POLL_INTERVAL,
+)
+
+
+def _remove_spotify_player_watcher(ws: WebSocket) -> None:
+    spotify_player_poller.unwatch(ws)
+    spotify_player_broadcast.remove_watcher(ws)
+
+
 def _preferred_roomcast_device_names(channel_id: Optional[str] = None) -> List[str]:
     cfg = spotify_config.read_spotify_config(channel_id)
     candidates = [
@@ -2400,18 +2559,8 @@ def _preferred_roomcast_device_names(channel_id: Optional[str] = None) -> List[s
 
 
 async def _find_roomcast_device(token: dict, channel_id: Optional[str] = None) -> Optional[dict]:
-    resp = await spotify_api.spotify_request(
-        "GET",
-        "/me/player/devices",
-        token,
-        channel_id,
-        spotify_refresh_func=lambda token, identifier: spotify_api.spotify_refresh(
-            token,
-            identifier,
-            spotify_auth_broker_url=SPOTIFY_AUTH_BROKER_URL,
-            save_token=spotify_config.save_token,
-        ),
-    )
+    # Part of a playback transfer, so it queues with control calls rather than player reads.
+    resp = await spotify_client.request("GET", "/me/player/devices", token, channel_id, priority=PRIORITY_CONTROL)
     if resp.status_code >= 400:
         raise HTTPException(status_code=resp.status_code, detail=resp.text)
     data = resp.json()
@@ -2555,23 +2704,35 @@ def _map_spotify_search_bucket(payload: Optional[dict], mapper: Callable[[dict],
 
 
 async def broadcast_nodes() -> None:
-    watchers = node_broadcast_service.watchers()
-    if not watchers:
+    # Node online/channel changes can add or remove hardware listeners.
+    channel_idle_service.notify()
+    if not node_broadcast_service.watchers():
         return
-    dead: list[WebSocket] = []
-    for ws, user in list(watchers.items()):
-        try:
-            await ws.send_json(
-                {
-                    "type": "nodes",
-                    "sections": public_sections(),
-                    "nodes": public_nodes_for_user(user),
-                }
-            )
-        except Exception:
-            dead.append(ws)
-    for ws in dead:
-        watchers.pop(ws, None)
+    node_broadcast_service.schedule("nodes", _publish_nodes)
+
+
+def _publish_nodes() -> None:
+    if not node_broadcast_service.watchers():
+        return
+    patch = node_state_tracker.update(public_sections(), public_nodes())
+    if patch is None:
+        return
+    node_broadcast_service.broadcast_by_visibility(lambda user: node_state_tracker.patch_for_user(patch, user))
+
+
+async def node_state_snapshot(user: Optional[dict]) -> dict:
+    # Publish any pending change to existing watchers first so every client shares one revision line.
+    node_broadcast_service.flush("nodes")
+    _publish_nodes()
+    node_state_tracker.update(public_sections(), public_nodes())
+    return node_state_tracker.snapshot_for_user(user)
+
+
+def node_state_resync(user: Optional[dict], revision: int) -> list[dict]:
+    patches = node_state_tracker.patches_since(revision)
+    if patches is None:
+        return [node_state_tracker.snapshot_for_user(user)]
+    return [node_state_tracker.patch_for_user(patch, user) for patch in patches]
 
 
 def _normalize_node_url(raw: str) -> str:
@@ -2762,6 +2923,7 @@ async def _handle_webrtc_session_closed(node_id: str) -> None:
 
 nodes_store = NodesStore(
     nodes_path=NODES_PATH,
+    state_store=state_store,
     transient_node_fields=TRANSIENT_NODE_FIELDS,
     normalize_section_name=_normalize_section_name,
     normalize_node_url=_normalize_node_url,
@@ -2774,12 +2936,21 @@ nodes_store = NodesStore(
 
 
 def load_nodes() -> None:
-    global nodes, sections
-    nodes, sections = nodes_store.load()
+    global sections
+    loaded, sections = nodes_store.load()
+    # Services hold a reference to the registry, so refill it rather than rebinding.
+    nodes.replace(loaded)
+
+
+nodes_write_behind = NodesWriteBehind(
+    store=nodes_store,
+    get_state=lambda: (nodes, sections),
+    interval=NODES_SAVE_INTERVAL,
+)
 
 
 def save_nodes() -> None:
-    nodes_store.save(nodes=nodes, sections=sections)
+    nodes_write_behind.mark_dirty()
 
 
 node_registration_service = NodeRegistrationService(
@@ -2805,41 +2976,16 @@ node_registration_service = NodeRegistrationService(
 load_nodes()
 
 
-async def _spotify_refresh_loop() -> None:
-    while True:
-        try:
-            await asyncio.sleep(max(SPOTIFY_REFRESH_CHECK_INTERVAL, 5))
-            for source_id, source in list(sources_by_id.items()):
-                if not source or source.get("kind") != "spotify":
-                    continue
-                token = spotify_config.load_token(source_id)
-                if not token or "refresh_token" not in token:
-                    continue
-                seconds_left = spotify_config.token_seconds_until_expiry(token)
-                if seconds_left is None:
-                    seconds_left = -1
-                if seconds_left > SPOTIFY_REFRESH_LEEWAY:
-                    continue
-                try:
-                    await spotify_api.spotify_refresh(
-                        token,
-                        source_id,
-                        spotify_auth_broker_url=SPOTIFY_AUTH_BROKER_URL,
-                        save_token=spotify_config.save_token,
-                    )
-                except HTTPException as exc:
-                    log.warning("Background Spotify refresh failed for %s: %s", source_id, exc.detail)
-                    await asyncio.sleep(SPOTIFY_REFRESH_FAILURE_BACKOFF)
-        except asyncio.CancelledError:
-            break
-        except Exception:  # pragma: no cover - defensive
-            log.exception("Spotify refresh loop crashed")
-            await asyncio.sleep(SPOTIFY_REFRESH_FAILURE_BACKOFF)
+def _schedule_spotify_refreshes() -> None:
+    for source_id, source in list(sources_by_id.items()):
+        if source and source.get("kind") == "spotify":
+            spotify_client.schedule_refresh(source_id)
 
 
 @app.on_event("startup")
 async def _startup_events() -> None:
-    global webrtc_relay, node_health_task, spotify_refresh_task, channel_idle_task, sonos_connection_task
+    global webrtc_relay, node_health_task, channel_idle_task, sonos_connection_task, radio_station_index_task
+    radio_browser_cache.load()
     # Providers are modular: by default no provider runtimes should run.
     # If a provider is installed+enabled, reconcile its runtime containers here.
     try:
@@ -2865,27 +3011,36 @@ async def _startup_events() -> None:
             sample_rate=WEBRTC_SAMPLE_RATE,
             assign_stream=snapcast_service.assign_webrtc_stream,
             on_session_closed=_handle_webrtc_session_closed,
+            on_listeners_changed=lambda _channel_id: channel_idle_service.notify(),
         )
         await webrtc_relay.start()
     if node_health_task is None:
         node_health_task = asyncio.create_task(node_health_service.health_loop())
-    if spotify_refresh_task is None:
-        spotify_refresh_task = asyncio.create_task(_spotify_refresh_loop())
+    _schedule_spotify_refreshes()
     if channel_idle_task is None:
         log.info(
-            "Channel idle monitor enabled (timeout=%.0fs, poll=%.1fs)",
+            "Channel idle monitor enabled (timeout=%.0fs, resync=%.1fs)",
             CHANNEL_IDLE_TIMEOUT,
-            CHANNEL_IDLE_POLL_INTERVAL,
+            CHANNEL_IDLE_RESYNC_INTERVAL,
         )
         channel_idle_task = asyncio.create_task(channel_idle_service.loop())
 
     if sonos_connection_task is None and getattr(sonos_service, "enabled", False):
         sonos_connection_task = asyncio.create_task(sonos_service.connection_loop())
 
+    if radio_station_index_task is None and RADIO_STATION_INDEX_ENABLED:
+        radio_station_index_task = asyncio.create_task(radio_station_index.loop())
+
+    if node_mdns_index is not None:
+        try:
+            await node_mdns_index.start()
+        except Exception as exc:  # pragma: no cover - network edge
+            log.warning("mDNS listener unavailable; discovery will scan over HTTP: %s", exc)
+
 
 @app.on_event("shutdown")
 async def _shutdown_events() -> None:
-    global node_health_task, spotify_refresh_task, channel_idle_task, sonos_connection_task
+    global node_health_task, channel_idle_task, sonos_connection_task, radio_station_index_task
     if webrtc_relay:
         await webrtc_relay.stop()
     if node_health_task:
@@ -2895,13 +3050,7 @@ async def _shutdown_events() -> None:
         except asyncio.CancelledError:
             pass
         node_health_task = None
-    if spotify_refresh_task:
-        spotify_refresh_task.cancel()
-        try:
-            await spotify_refresh_task
-        except asyncio.CancelledError:
-            pass
-        spotify_refresh_task = None
+    await spotify_client.close()
     if channel_idle_task:
         channel_idle_task.cancel()
         try:
@@ -2916,6 +3065,24 @@ async def _shutdown_events() -> None:
         except asyncio.CancelledError:
             pass
         sonos_connection_task = None
+    if node_mdns_index is not None:
+        await node_mdns_index.stop()
+    await node_broadcast_service.close()
+    await spotify_player_poller.close()
+    await spotify_player_broadcast.close()
+    await radio_browser_cache.close()
+    if radio_station_index_task:
+        radio_station_index_task.cancel()
+        try:
+            await radio_station_index_task
+        except asyncio.CancelledError:
+            pass
+        radio_station_index_task = None
+    radio_station_index.close()
+    await radio_browser_mirrors.close()
+    await nodes_write_behind.flush()
+    state_store.close()
+    await snapcast.close()
     await stop_local_agent()
 
 
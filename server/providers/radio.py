@@ -6,6 +6,19 @@ from typing import Dict
 
 from .docker_runtime import DockerUnavailable, detect_docker_context, ensure_container_absent, ensure_container_running
 
+# Worker tuning set on the controller is passed through to the worker container.
+WORKER_PASSTHROUGH_ENV = (
+    "RADIO_CONNECT_TIMEOUT",
+    "RADIO_STALL_TIMEOUT",
+    "RADIO_RESTART_DELAY",
+    "RADIO_RESTART_MAX_DELAY",
+    "RADIO_WARM_TUNERS",
+    "RADIO_WARM_BUFFER_SECONDS",
+    "RADIO_WARM_MAX_KBPS",
+    "RADIO_WARM_MAX_MEMORY_MB",
+    "RADIO_RESOLVE_TTL",
+    "RADIO_RESOLVE_TIMEOUT",
+)
 
 def reconcile_runtime(
     *,
@@ -33,6 +46,7 @@ def reconcile_runtime(
         "RADIO_WORKER_TOKEN": radio_worker_token,
         "RADIO_ASSIGNMENT_INTERVAL": str(int(assignment_interval)),
     }
+    env.update({key: os.environ[key] for key in WORKER_PASSTHROUGH_ENV if os.environ.get(key)})
 
     ensure_container_running(
         name="roomcast-provider-radio-worker",
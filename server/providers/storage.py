@@ -34,11 +34,19 @@ def _normalize_provider_id(value: Any) -> Optional[str]:
     return raw.split(":", 1)[0] or None
 
 
-def load_providers(path: Path) -> Dict[str, ProviderState]:
-    if not path.exists():
+def _exists(path: Path, store: Any) -> bool:
+    return store.exists(path) if store is not None else path.exists()
+
+
+def _read(path: Path, store: Any) -> Any:
+    return store.read(path) if store is not None else json.loads(path.read_text())
+
+
+def load_providers(path: Path, *, store: Any = None) -> Dict[str, ProviderState]:
+    if not _exists(path, store):
         return {}
     try:
-        data = json.loads(path.read_text())
+        data = _read(path, store)
     except json.JSONDecodeError:
         log.warning("providers.json is invalid; ignoring")
         return {}
@@ -63,17 +71,22 @@ def load_providers(path: Path) -> Dict[str, ProviderState]:
     return result
 
 
-def save_providers(path: Path, providers: Dict[str, ProviderState]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+def save_providers(path: Path, providers: Dict[str, ProviderState], *, store: Any = None) -> None:
     ordered: List[dict] = []
     for pid in sorted(providers.keys()):
         ordered.append(providers[pid].to_json())
+    if store is not None:
+        store.write(path, ordered, indent=2)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(json.dumps(ordered, indent=2))
 
 
 def infer_providers(
     channels_path: Path,
     sources_path: Path,
+    *,
+    store: Any = None,
 ) -> Dict[str, ProviderState]:
     """Infer providers for backwards compatibility.
 
@@ -84,17 +97,17 @@ def infer_providers(
 
     inferred: Dict[str, ProviderState] = {}
 
-    if sources_path.exists():
+    if _exists(sources_path, store):
         try:
-            data = json.loads(sources_path.read_text())
+            data = _read(sources_path, store)
         except json.JSONDecodeError:
             data = []
         if isinstance(data, list) and any(isinstance(item, dict) and str(item.get("kind") or "").lower() == "spotify" for item in data):
             inferred["spotify"] = ProviderState(id="spotify", enabled=True, settings={"instances": 1})
 
-    if channels_path.exists():
+    if _exists(channels_path, store):
         try:
-            data = json.loads(channels_path.read_text())
+            data = _read(channels_path, store)
         except json.JSONDecodeError:
             data = []
         if isinstance(data, list) and any(isinstance(item, dict) and str(item.get("source") or "").lower() == "radio" for item in data):
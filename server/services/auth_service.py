@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-import json
 import time
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 import bcrypt
 from fastapi import HTTPException, WebSocket
@@ -17,6 +16,7 @@ class AuthService:
         self,
         *,
         users_path: Path,
+        state_store: Any,
         server_default_name: str,
         session_signer: URLSafeTimedSerializer,
         session_cookie_name: str,
@@ -25,6 +25,7 @@ class AuthService:
         session_max_age: int,
     ) -> None:
         self._users_path = users_path
+        self._state_store = state_store
         self._server_default_name = server_default_name
         self._session_signer = session_signer
         self._session_cookie_name = session_cookie_name
@@ -42,9 +43,9 @@ class AuthService:
         return self._auth_state
 
     def load(self) -> None:
-        if self._users_path.exists():
+        if self._state_store.exists(self._users_path):
             try:
-                data = json.loads(self._users_path.read_text())
+                data = self._state_store.read(self._users_path)
             except Exception:
                 data = {}
         else:
@@ -85,7 +86,7 @@ class AuthService:
             "server_name": self._auth_state.get("server_name", self._server_default_name),
             "users": list(self._users_by_id.values()),
         }
-        self._users_path.write_text(json.dumps(data, indent=2, sort_keys=True))
+        self._state_store.write(self._users_path, data, indent=2, sort_keys=True)
 
     def is_initialized(self) -> bool:
         return bool(self._users_by_id)
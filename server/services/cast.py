@@ -93,6 +93,38 @@ class CastService:
 
         return await asyncio.to_thread(_discover_sync)
 
+    async def probe_hosts(self, ips: list[str], *, port: int = 8009) -> list[dict]:
+        """Identify Cast devices at known addresses (e.g. from a TCP pre-scan) without mDNS."""
+
+        def _probe_sync(ip: str) -> Optional[dict]:
+            cast = None
+            try:
+                cast = pychromecast.get_chromecast_from_host((ip, port, None, None, None), tries=1, timeout=3)
+                cast.wait(timeout=3)
+                info = cast.cast_info
+                name = (info.friendly_name or cast.name or ip).strip()
+                return {
+                    "host": name,
+                    "url": f"cast://{ip}",
+                    "fingerprint": str(cast.uuid) if cast.uuid else None,
+                    "kind": "cast",
+                    "model": info.model_name,
+                    "manufacturer": info.manufacturer,
+                    "ip": ip,
+                }
+            except Exception as exc:
+                log.debug("No Cast device answered at %s: %s", ip, exc)
+                return None
+            finally:
+                if cast is not None:
+                    try:
+                        cast.disconnect()
+                    except Exception:
+                        pass
+
+        results = await asyncio.gather(*(asyncio.to_thread(_probe_sync, ip) for ip in ips))
+        return [item for item in results if item]
+
     async def fetch_device(self, ip: str) -> Optional[CastDevice]:
         if not ip:
             return None
@@ -9,10 +9,18 @@ from fastapi import HTTPException
 
 
 class ChannelIdleService:
+    """Stops channels that have had no listeners for ``idle_timeout`` seconds.
+
+    Listener counts come from the snapserver mirror, the WebRTC relay and node state, and
+    are re-read when any of them signals a change through ``notify``. Each idle channel
+    gets its own timer; the Spotify "playing elsewhere" check runs only when that timer
+    fires, and its answer is cached for ``spotify_check_ttl`` seconds.
+    """
+
     def __init__(
         self,
         *,
-        channel_order: list[str],
+        get_channel_order: Callable[[], list[str]],
         channels_by_id: dict[str, dict],
         nodes: dict,
         snapcast: Any,
@@ -25,10 +33,12 @@ class ChannelIdleService:
         spotify_is_playing_elsewhere: Callable[[str], Awaitable[bool]],
         parse_spotify_error: Callable[[object], dict],
         idle_timeout: float,
-        poll_interval: float,
+        resync_interval: float,
         logger: Any,
+        spotify_check_ttl: float = 30.0,
+        settle_delay: float = 0.5,
     ) -> None:
-        self._channel_order = channel_order
+        self._get_channel_order = get_channel_order
         self._channels_by_id = channels_by_id
         self._nodes = nodes
         self._snapcast = snapcast
@@ -41,9 +51,14 @@ class ChannelIdleService:
         self._spotify_is_playing_elsewhere = spotify_is_playing_elsewhere
         self._parse_spotify_error = parse_spotify_error
         self._idle_timeout = float(idle_timeout)
-        self._poll_interval = float(poll_interval)
+        self._resync_interval = max(1.0, float(resync_interval))
+        self._spotify_check_ttl = max(0.0, float(spotify_check_ttl))
+        self._settle_delay = max(0.0, float(settle_delay))
         self._log = logger
         self._state: dict[str, dict] = {}
+        self._spotify_checks: dict[str, tuple[float, bool]] = {}
+        self._expiries: set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
 
     def _channel_should_monitor(self, channel: dict) -> bool:
         if not channel.get("enabled", True):
@@ -59,7 +74,7 @@ class ChannelIdleService:
     def _channel_has_active_hardware_listeners(self, channel_id: str) -> bool:
         if not channel_id:
             return False
-        for node in self._nodes.values():
+        for node in self._nodes.find(channel_id=channel_id):
             if node.get("type") == "browser":
                 continue
             if node.get("channel_id") != channel_id:
@@ -70,9 +85,10 @@ class ChannelIdleService:
 
     async def _collect_channel_listener_counts(self) -> tuple[dict[str, int], bool]:
         """Return (per-channel listeners, has_any_data)."""
-        counts: dict[str, int] = {cid: 0 for cid in self._channel_order}
+        channel_order = self._get_channel_order()
+        counts: dict[str, int] = {cid: 0 for cid in channel_order}
         stream_to_channel: dict[str, str] = {}
-        for cid in self._channel_order:
+        for cid in channel_order:
             channel = self._channels_by_id.get(cid)
             if not channel:
                 continue
@@ -162,56 +178,128 @@ class ChannelIdleService:
             self._log.exception("Auto-stop failed for Spotify channel %s", cid)
             return False
 
+    def notify(self) -> None:
+        """Request a re-evaluation after a listener, stream or channel change."""
+        self._wake.set()
+
+    def _arm(self, cid: str, state: dict, delay: float) -> None:
+        timer = state.get("timer")
+        if timer is not None:
+            timer.cancel()
+        state["timer"] = asyncio.get_running_loop().call_later(max(0.0, delay), self._fire, cid)
+
+    def _disarm(self, state: Optional[dict]) -> None:
+        timer = state.pop("timer", None) if state else None
+        if timer is not None:
+            timer.cancel()
+
+    def _fire(self, cid: str) -> None:
+        state = self._state.get(cid)
+        if state is not None:
+            state.pop("timer", None)
+        task = asyncio.create_task(self._expire(cid))
+        self._expiries.add(task)
+        task.add_done_callback(self._expiries.discard)
+
+    def _listeners(self, cid: str, counts: dict[str, int]) -> int:
+        listeners = counts.get(cid, 0)
+        if listeners <= 0 and self._channel_has_active_hardware_listeners(cid):
+            listeners = 1
+        return listeners
+
+    async def _spotify_active(self, cid: str) -> bool:
+        """``_spotify_is_playing_elsewhere``, cached for ``spotify_check_ttl`` seconds."""
+        now = time.monotonic()
+        cached = self._spotify_checks.get(cid)
+        if cached and now - cached[0] < self._spotify_check_ttl:
+            return cached[1]
+        try:
+            playing = bool(await self._spotify_is_playing_elsewhere(cid))
+        except Exception:
+            self._log.exception("Channel idle monitor: failed to check Spotify playback for %s", cid)
+            return False
+        self._spotify_checks[cid] = (now, playing)
+        return playing
+
     async def evaluate_once(self) -> None:
+        """Update per-channel idle timers from the current listener counts."""
         counts, has_data = await self._collect_channel_listener_counts()
         if not has_data:
             return
         now = time.time()
         tracked: set[str] = set()
-        for cid in self._channel_order:
+        for cid in self._get_channel_order():
             channel = self._channels_by_id.get(cid)
-            if not channel:
-                self._state.pop(cid, None)
-                continue
-            if not self._channel_should_monitor(channel):
-                self._state.pop(cid, None)
+            if not channel or not self._channel_should_monitor(channel):
                 continue
             tracked.add(cid)
-            listeners = counts.get(cid, 0)
-            if listeners <= 0 and self._channel_has_active_hardware_listeners(cid):
-                listeners = 1
-            source = (channel.get("source") or "spotify").lower()
-            if listeners <= 0 and source == "spotify":
-                try:
-                    if await self._spotify_is_playing_elsewhere(cid):
-                        listeners = 1
-                except Exception:
-                    self._log.exception("Channel idle monitor: failed to check Spotify playback for %s", cid)
             state = self._state.setdefault(cid, {"idle_since": None, "stopped": False})
-            if listeners > 0:
+            if self._listeners(cid, counts) > 0:
+                self._disarm(state)
                 state["idle_since"] = None
                 state["stopped"] = False
                 state["last_active"] = now
                 continue
             if state.get("idle_since") is None:
                 state["idle_since"] = now
-            idle_for = now - (state.get("idle_since") or now)
-            if idle_for < self._idle_timeout or state.get("stopped"):
+            if state.get("stopped") or state.get("timer") is not None:
                 continue
-            stopped = await self._stop_channel_due_to_idle(channel)
-            if stopped:
-                state["stopped"] = True
+            self._arm(cid, state, state["idle_since"] + self._idle_timeout - now)
         for cid in list(self._state.keys()):
             if cid not in tracked:
-                self._state.pop(cid, None)
+                self._disarm(self._state.pop(cid, None))
+                self._spotify_checks.pop(cid, None)
+
+    async def _expire(self, cid: str) -> None:
+        """Idle timer callback: confirm the channel is still idle, then stop it."""
+        try:
+            state = self._state.get(cid)
+            channel = self._channels_by_id.get(cid)
+            if state is None or state.get("stopped") or not channel or not self._channel_should_monitor(channel):
+                return
+            counts, has_data = await self._collect_channel_listener_counts()
+            if not has_data:
+                # Re-armed by the next successful evaluation.
+                return
+            now = time.time()
+            if self._listeners(cid, counts) > 0:
+                state["idle_since"] = None
+                state["last_active"] = now
+                return
+            idle_since = state.get("idle_since") or now
+            if now - idle_since < self._idle_timeout:
+                self._arm(cid, state, idle_since + self._idle_timeout - now)
+                return
+            source = (channel.get("source") or "spotify").lower()
+            if source == "spotify" and await self._spotify_active(cid):
+                # Playing on another device counts as a listener; check again a full timeout later.
+                state["idle_since"] = now
+                state["last_active"] = now
+                self._arm(cid, state, self._idle_timeout)
+                return
+            if await self._stop_channel_due_to_idle(channel):
+                state["stopped"] = True
+        except Exception:
+            self._log.exception("Channel idle monitor: idle timer for %s failed", cid)
 
     async def loop(self) -> None:
+        """Re-evaluate on ``notify`` (coalescing bursts) and every ``resync_interval`` as a backstop."""
         try:
             while True:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self._resync_interval)
+                    await asyncio.sleep(self._settle_delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
                 try:
                     await self.evaluate_once()
                 except Exception:
                     self._log.exception("Channel idle monitor iteration failed")
-                await asyncio.sleep(self._poll_interval)
         except asyncio.CancelledError:
             pass
+        finally:
+            for state in self._state.values():
+                self._disarm(state)
+            for task in list(self._expiries):
+                task.cancel()
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import copy
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from services.state_store import write_json_atomic
+
+
+@dataclass
+class _Entry:
+    signature: Optional[tuple]
+    checked_at: float
+    value: Any = None
+    error: Optional[ValueError] = None
+
+
+class JsonFileCache:
+    """Parsed JSON files keyed by path, revalidated by (mtime, size, inode).
+
+    A path is stat'ed at most once per ``revalidate_interval`` and only re-read when its
+    signature changed, so repeated reads of an unchanged file cost no disk I/O. Missing
+    files and invalid JSON are cached the same way. ``write`` and ``delete`` update the
+    cache directly (write-through).
+    """
+
+    def __init__(self, *, revalidate_interval: float = 1.0) -> None:
+        self._revalidate_interval = max(0.0, float(revalidate_interval))
+        self._entries: dict[Path, _Entry] = {}
+        self.stats = {"hits": 0, "stats": 0, "loads": 0, "writes": 0}
+
+    def exists(self, path: Path) -> bool:
+        return self._entry(Path(path)).signature is not None
+
+    def read(self, path: Path) -> Any:
+        """Return a private copy of the parsed file.
+
+        Raises FileNotFoundError when the file is missing and json.JSONDecodeError when
+        it does not parse, like ``json.loads(path.read_text())``.
+        """
+        path = Path(path)
+        entry = self._entry(path)
+        if entry.signature is None:
+            raise FileNotFoundError(str(path))
+        if entry.error is not None:
+            raise entry.error
+        return copy.deepcopy(entry.value)
+
+    def write(self, path: Path, data: Any, *, indent: Optional[int] = 2) -> None:
+        path = Path(path)
+        write_json_atomic(path, data, indent=indent)
+        self.stats["writes"] += 1
+        self._entries[path] = _Entry(self._signature(path), time.monotonic(), copy.deepcopy(data))
+
+    def delete(self, path: Path) -> None:
+        path = Path(path)
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        self._entries[path] = _Entry(None, time.monotonic())
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(Path(path), None)
+
+    def _entry(self, path: Path) -> _Entry:
+        now = time.monotonic()
+        entry = self._entries.get(path)
+        if entry is not None and now - entry.checked_at < self._revalidate_interval:
+            self.stats["hits"] += 1
+            return entry
+        signature = self._signature(path)
+        if entry is not None and entry.signature == signature:
+            entry.checked_at = now
+            self.stats["hits"] += 1
+            return entry
+        entry = _Entry(signature, now)
+        if signature is not None:
+            self.stats["loads"] += 1
+            try:
+                entry.value = json.loads(path.read_text())
+            except FileNotFoundError:
+                entry.signature = None
+            except ValueError as exc:
+                entry.error = exc
+        self._entries[path] = entry
+        return entry
+
+    def _signature(self, path: Path) -> Optional[tuple]:
+        self.stats["stats"] += 1
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
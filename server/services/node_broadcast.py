@@ -1,25 +1,183 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
 from dataclasses import dataclass, field
+from typing import Callable, Hashable, Optional
 
 from fastapi import WebSocket
 
 
+log = logging.getLogger("roomcast")
+
+
+def _encode(payload: dict) -> str:
+    # Same encoding as WebSocket.send_json, done once per payload instead of once per socket.
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def visibility_class(user: Optional[dict]) -> Hashable:
+    """Watchers in the same class are shown the same node list."""
+    if not user:
+        return None
+    if user.get("role") == "admin":
+        return "admin"
+    return ("user", user.get("id"))
+
+
+class _Outbox:
+    """Bounded per-socket queue drained by a dedicated writer task."""
+
+    def __init__(self, ws: WebSocket, size: int) -> None:
+        self.ws = ws
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max(1, size))
+        self.task: Optional[asyncio.Task] = None
+
+
 @dataclass
 class NodeBroadcastService:
+    """Fan-out for ``/ws/nodes`` watchers.
+
+    Payloads are serialized once and queued per socket; each socket has its own writer
+    so a slow client only delays itself. A socket whose queue overflows or whose send
+    times out is dropped and closed, and will resync from a snapshot on reconnect.
+    ``schedule`` coalesces bursts of the same publish into one call, waiting at most
+    ``max_latency`` after the first request.
+    """
+
+    queue_size: int = 64
+    send_timeout: float = 5.0
+    debounce: float = 0.05
+    max_latency: float = 0.25
+
     _watchers: dict[WebSocket, dict] = field(default_factory=dict)
+    _outboxes: dict[WebSocket, _Outbox] = field(default_factory=dict)
+    _scheduled: dict[str, tuple[float, asyncio.TimerHandle, Callable[[], None]]] = field(default_factory=dict)
+    _stats: dict[str, int] = field(
+        default_factory=lambda: {"published": 0, "coalesced": 0, "sent": 0, "dropped_watchers": 0}
+    )
 
     def watchers(self) -> dict[WebSocket, dict]:
         return self._watchers
 
+    def add_watcher(self, ws: WebSocket, user: Optional[dict]) -> None:
+        self._watchers[ws] = user or {}
+        if ws not in self._outboxes:
+            outbox = _Outbox(ws, self.queue_size)
+            outbox.task = asyncio.create_task(self._writer(outbox))
+            self._outboxes[ws] = outbox
+
+    def remove_watcher(self, ws: WebSocket) -> None:
+        self._watchers.pop(ws, None)
+        outbox = self._outboxes.pop(ws, None)
+        if outbox and outbox.task and not outbox.task.done():
+            outbox.task.cancel()
+
+    def send(self, ws: WebSocket, payload: dict) -> None:
+        """Queue a payload for one watcher, keeping order with broadcasts."""
+        self._enqueue(ws, _encode(payload))
+
     async def broadcast(self, payload: dict) -> None:
         if not self._watchers:
             return
-        dead: list[WebSocket] = []
+        text = _encode(payload)
         for ws in list(self._watchers):
+            self._enqueue(ws, text)
+
+    def broadcast_by_visibility(self, render: Callable[[Optional[dict]], dict]) -> None:
+        """Render and encode once per visibility class, then queue for every watcher in it."""
+        encoded: dict[Hashable, str] = {}
+        for ws, user in list(self._watchers.items()):
+            key = visibility_class(user)
+            text = encoded.get(key)
+            if text is None:
+                text = encoded[key] = _encode(render(user))
+            self._enqueue(ws, text)
+
+    def schedule(self, key: str, publish: Callable[[], None]) -> None:
+        """Debounce ``publish`` under ``key``; it runs once the burst settles or ``max_latency`` passes."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        pending = self._scheduled.get(key)
+        if pending:
+            first, handle, _ = pending
+            handle.cancel()
+            self._stats["coalesced"] += 1
+        else:
+            first = now
+        delay = max(0.0, min(self.debounce, first + self.max_latency - now))
+        handle = loop.call_later(delay, self._run_scheduled, key)
+        self._scheduled[key] = (first, handle, publish)
+
+    def flush(self, key: str) -> None:
+        """Run a pending scheduled publish right away."""
+        pending = self._scheduled.get(key)
+        if pending:
+            pending[1].cancel()
+            self._run_scheduled(key)
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "watchers": len(self._watchers),
+            "queued": sum(outbox.queue.qsize() for outbox in self._outboxes.values()),
+        }
+
+    async def close(self) -> None:
+        for handle in [entry[1] for entry in self._scheduled.values()]:
+            handle.cancel()
+        self._scheduled.clear()
+        tasks = [outbox.task for outbox in self._outboxes.values() if outbox.task]
+        self._outboxes.clear()
+        self._watchers.clear()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _run_scheduled(self, key: str) -> None:
+        pending = self._scheduled.pop(key, None)
+        if not pending:
+            return
+        self._stats["published"] += 1
+        try:
+            pending[2]()
+        except Exception:
+            log.exception("Broadcast publish %s failed", key)
+
+    def _enqueue(self, ws: WebSocket, text: str) -> None:
+        outbox = self._outboxes.get(ws)
+        if outbox is None:
+            return
+        try:
+            outbox.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            log.info("Dropping node watcher: outbound queue full")
+            self._drop(outbox)
+
+    async def _writer(self, outbox: _Outbox) -> None:
+        while True:
+            text = await outbox.queue.get()
             try:
-                await ws.send_json(payload)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self._watchers.pop(ws, None)
+                await asyncio.wait_for(outbox.ws.send_text(text), timeout=self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                log.debug("Dropping node watcher after failed send: %s", exc)
+                self._drop(outbox)
+                return
+            self._stats["sent"] += 1
+
+    def _drop(self, outbox: _Outbox) -> None:
+        if self._outboxes.get(outbox.ws) is not outbox:
+            return
+        self._stats["dropped_watchers"] += 1
+        self.remove_watcher(outbox.ws)
+        asyncio.create_task(self._close_socket(outbox.ws))
+
+    async def _close_socket(self, ws: WebSocket) -> None:
+        try:
+            await asyncio.wait_for(ws.close(code=1013), timeout=self.send_timeout)
+        except Exception:
+            pass
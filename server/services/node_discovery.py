@@ -4,8 +4,11 @@ import asyncio
 import ipaddress
 import logging
 import subprocess
+import time
 from dataclasses import dataclass, field
-from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional
+from urllib.parse import urlparse
 
 import httpx
 
@@ -27,14 +30,29 @@ class NodeDiscoveryService:
     refresh_agent_metadata: Callable[[dict], Awaitable[tuple[bool, bool]]]
     broadcast_nodes: Callable[[], Awaitable[None]]
 
-    _rediscovery_tasks: dict[str, asyncio.Task] = field(default_factory=dict)
+    rediscovery_neighbour_window: int = 16
+    prescan_ports: tuple[int, ...] = (1400, 8009)
+    prescan_timeout: float = 0.5
+    prescan_concurrency: int = 256
+    prescan_cache_ttl: float = 30.0
+    lookup_mdns: Optional[Callable[[str], Optional[dict]]] = None
+
+    # node_id -> {"fingerprint", "last_host", "mac"} for offline agents we are looking for.
+    _rediscovery_wanted: dict[str, dict] = field(default_factory=dict)
+    _rediscovery_task: Optional[asyncio.Task] = None
+    _rediscovery_wakeup: Optional[asyncio.Event] = None
+    _rediscovery_last_sweep: Optional[dict] = None
+    _rediscovery_sweeps: int = 0
+    # host -> (scanned_at, ports checked, ports open); lets one TCP pass serve agents, Sonos and Cast.
+    _port_cache: dict[str, tuple[float, frozenset, frozenset]] = field(default_factory=dict)
 
     def cancel_node_rediscovery(self, node_id: Optional[str]) -> None:
         if not node_id:
             return
-        task = self._rediscovery_tasks.pop(node_id, None)
-        if task:
-            task.cancel()
+        self._rediscovery_wanted.pop(node_id, None)
+        if not self._rediscovery_wanted and self._rediscovery_task:
+            self._rediscovery_task.cancel()
+            self._rediscovery_task = None
 
     def schedule_node_rediscovery(self, node: dict) -> None:
         if not node or node.get("type") != "agent":
@@ -43,15 +61,38 @@ class NodeDiscoveryService:
         fingerprint = node.get("fingerprint")
         if not node_id or not fingerprint:
             return
-        if node_id in self._rediscovery_tasks:
+        if node_id in self._rediscovery_wanted:
             return
+        # The MAC is filled in by the first sweep, which reads the neighbour table off the loop.
+        self._rediscovery_wanted[node_id] = {
+            "fingerprint": fingerprint,
+            "last_host": _host_from_url(node.get("url")),
+            "mac": None,
+        }
         log.info("Scheduling rediscovery for node %s (fingerprint %s)", node_id, str(fingerprint)[:8])
-        self._rediscovery_tasks[node_id] = asyncio.create_task(self._rediscover_node(node_id, fingerprint))
+        if self._rediscovery_wakeup is None:
+            self._rediscovery_wakeup = asyncio.Event()
+        if self._rediscovery_task is None or self._rediscovery_task.done():
+            self._rediscovery_task = asyncio.create_task(self._rediscovery_loop())
+
+    def rediscovery_status(self) -> dict:
+        return {
+            "pending": [
+                {"node_id": node_id, "fingerprint": str(entry["fingerprint"])[:8], "last_host": entry.get("last_host")}
+                for node_id, entry in self._rediscovery_wanted.items()
+            ],
+            "running": bool(self._rediscovery_task and not self._rediscovery_task.done()),
+            "sweeps": self._rediscovery_sweeps,
+            "last_sweep": self._rediscovery_last_sweep,
+        }
 
-    async def probe_host(self, host: str) -> Optional[dict]:
+    async def probe_host(self, host: str, *, client: Optional[httpx.AsyncClient] = None) -> Optional[dict]:
         url = f"http://{host}:{self.agent_port}"
         try:
-            async with httpx.AsyncClient(timeout=2) as client:
+            if client is None:
+                async with httpx.AsyncClient(timeout=2) as own_client:
+                    resp = await own_client.get(f"{url}/health")
+            else:
                 resp = await client.get(f"{url}/health")
             if resp.status_code != 200:
                 return None
@@ -69,6 +110,73 @@ class NodeDiscoveryService:
         except Exception:
             return None
 
+    async def _port_open(self, host: str, port: int) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=self.prescan_timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+        return True
+
+    async def scan_open_ports(self, hosts: list[str], ports: Optional[list[int]] = None) -> dict[str, set[int]]:
+        """TCP connect pre-scan: return the subset of ``ports`` accepting connections per host.
+
+        With no ``ports`` every device kind (agent, Sonos, Cast) is checked in one pass; results
+        are cached briefly so the per-kind probes that follow do not reconnect.
+        """
+        wanted = frozenset(ports or (self.agent_port, *self.prescan_ports))
+        now = time.monotonic()
+        results: dict[str, set[int]] = {}
+        pending: list[str] = []
+        for host in dict.fromkeys(hosts):
+            cached = self._port_cache.get(host)
+            if cached and now - cached[0] < self.prescan_cache_ttl and wanted <= cached[1]:
+                results[host] = set(cached[2] & wanted)
+            else:
+                pending.append(host)
+        if not pending:
+            return results
+        scan_ports = sorted(wanted)
+        sem = asyncio.Semaphore(max(1, int(self.prescan_concurrency)))
+
+        async def _check(host: str, port: int) -> tuple[str, int, bool]:
+            async with sem:
+                return host, port, await self._port_open(host, port)
+
+        started = time.monotonic()
+        checks = await asyncio.gather(*(_check(host, port) for host in pending for port in scan_ports))
+        open_ports: dict[str, set[int]] = {host: set() for host in pending}
+        for host, port, is_open in checks:
+            if is_open:
+                open_ports[host].add(port)
+        scanned_at = time.monotonic()
+        for host, found in open_ports.items():
+            checked, still_open = wanted, frozenset(found)
+            cached = self._port_cache.get(host)
+            if cached and scanned_at - cached[0] < self.prescan_cache_ttl:
+                checked = cached[1] | wanted
+                still_open = (cached[2] - wanted) | still_open
+            self._port_cache[host] = (scanned_at, checked, still_open)
+            results[host] = found
+        for host in [h for h, entry in self._port_cache.items() if scanned_at - entry[0] >= self.prescan_cache_ttl]:
+            self._port_cache.pop(host, None)
+        log.debug(
+            "Port pre-scan: %s hosts x %s ports in %.1fs, %s responsive",
+            len(pending),
+            len(scan_ports),
+            scanned_at - started,
+            sum(1 for found in open_ports.values() if found),
+        )
+        return results
+
+    async def hosts_with_open_port(self, hosts: list[str], port: int) -> list[str]:
+        open_ports = await self.scan_open_ports(hosts, [port])
+        return [host for host in hosts if port in open_ports.get(host, ())]
+
     def _configured_discovery_networks(self) -> list[str]:
         configured: list[str] = []
         raw_value = (self.discovery_cidr or "").strip()
@@ -140,63 +248,207 @@ class NodeDiscoveryService:
         return hosts
 
     async def stream_host_probes(self, hosts: list[str]) -> AsyncIterator[dict]:
+        if not hosts:
+            return
+        # Most addresses are dead; only hosts with the agent port open get an HTTP probe.
+        hosts = await self.hosts_with_open_port(hosts, self.agent_port)
         if not hosts:
             return
         sem = asyncio.Semaphore(max(1, int(self.discovery_concurrency)))
         tasks: list[asyncio.Task] = []
 
-        async def _runner(target: str) -> Optional[dict]:
-            async with sem:
-                return await self.probe_host(target)
+        async with httpx.AsyncClient(timeout=2) as client:
+
+            async def _runner(target: str) -> Optional[dict]:
+                async with sem:
+                    return await self.probe_host(target, client=client)
 
-        for host in hosts:
-            tasks.append(asyncio.create_task(_runner(host)))
+            for host in hosts:
+                tasks.append(asyncio.create_task(_runner(host)))
 
+            try:
+                for task in asyncio.as_completed(tasks):
+                    result = await task
+                    if result:
+                        yield result
+            finally:
+                for task in tasks:
+                    task.cancel()
+                if tasks:
+                    await asyncio.gather(*tasks, return_exceptions=True)
+
+    def neighbour_table(self) -> dict[str, str]:
+        """Return IPv4 -> MAC entries from the kernel neighbour (ARP) table."""
+        table: dict[str, str] = {}
         try:
-            for task in asyncio.as_completed(tasks):
-                result = await task
-                if result:
-                    yield result
-        finally:
-            for task in tasks:
-                task.cancel()
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+            output = subprocess.check_output(["ip", "-4", "neigh", "show"], text=True, timeout=2)
+        except Exception:
+            output = ""
+        for line in output.splitlines():
+            parts = line.split()
+            if not parts or "lladdr" not in parts or parts[-1] in {"FAILED", "INCOMPLETE"}:
+                continue
+            table[parts[0]] = parts[parts.index("lladdr") + 1].lower()
+        if table:
+            return table
+        try:
+            lines = Path("/proc/net/arp").read_text().splitlines()[1:]
+        except OSError:
+            return table
+        for line in lines:
+            parts = line.split()
+            if len(parts) >= 4 and parts[3] != "00:00:00:00:00:00":
+                table[parts[0]] = parts[3].lower()
+        return table
 
-    async def _find_node_by_fingerprint(self, fingerprint: str) -> Optional[dict]:
-        if not fingerprint:
-            return None
+    def _rediscovery_phases(
+        self, wanted: dict[str, dict], neighbours: dict[str, str]
+    ) -> Iterator[tuple[str, list[str]]]:
+        """Yield candidate hosts, cheapest and most likely first; later phases are only built if needed."""
+        if self.lookup_mdns is not None:
+            announced = [self.lookup_mdns(str(entry["fingerprint"])) for entry in wanted.values()]
+            yield "mdns", [item["host"] for item in announced if item and item.get("host")]
+        by_mac: dict[str, list[str]] = {}
+        for ip, mac in neighbours.items():
+            by_mac.setdefault(mac, []).append(ip)
+        last_known: list[str] = []
+        moved: list[str] = []
+        nearby: list[str] = []
+        window = max(0, int(self.rediscovery_neighbour_window))
+        for entry in wanted.values():
+            host = entry.get("last_host")
+            if host:
+                last_known.append(host)
+            mac = entry.get("mac")
+            if mac:
+                # Same MAC under a new address: the DHCP lease moved.
+                moved.extend(by_mac.get(mac, []))
+            try:
+                addr = ipaddress.IPv4Address(host) if host else None
+            except ValueError:
+                addr = None
+            if addr is not None and window:
+                for offset in range(1, window + 1):
+                    for candidate in (int(addr) + offset, int(addr) - offset):
+                        try:
+                            nearby.append(str(ipaddress.IPv4Address(candidate)))
+                        except ValueError:
+                            continue
+        yield "last_known", last_known + moved
+        yield "neighbours", list(neighbours)
+        yield "nearby", nearby
         networks = self.detect_discovery_networks()
-        if not networks:
-            return None
-        hosts = self.hosts_for_networks(networks)
-        if not hosts:
-            return None
-        async for result in self.stream_host_probes(hosts):
-            if result.get("fingerprint") == fingerprint:
-                return result
-        return None
+        yield "full", self.hosts_for_networks(networks) if networks else []
+
+    def notify_mdns_seen(self, entry: dict) -> None:
+        """Wake the rediscovery loop when a node we are looking for announces itself."""
+        fingerprint = entry.get("fingerprint")
+        if not fingerprint or self._rediscovery_wakeup is None:
+            return
+        if any(item.get("fingerprint") == fingerprint for item in self._rediscovery_wanted.values()):
+            self._rediscovery_wakeup.set()
+
+    async def _rediscovery_sweep(self) -> dict[str, dict]:
+        """Probe likely addresses first, then the full range, until every wanted fingerprint is found."""
+        wanted = dict(self._rediscovery_wanted)
+        remaining = {str(entry["fingerprint"]): node_id for node_id, entry in wanted.items()}
+        found: dict[str, dict] = {}
+        probed: set[str] = set()
+        phase_probes: dict[str, int] = {}
+        started = time.monotonic()
+        # `ip neigh` is a subprocess; keep it off the event loop.
+        neighbours = await asyncio.to_thread(self.neighbour_table)
+        for entry in wanted.values():
+            host = entry.get("last_host")
+            if not entry.get("mac") and host in neighbours:
+                entry["mac"] = neighbours[host]
+        for phase, candidates in self._rediscovery_phases(wanted, neighbours):
+            if not remaining:
+                break
+            hosts = [host for host in dict.fromkeys(candidates) if host not in probed]
+            probed.update(hosts)
+            for host in hosts:
+                # A node coming back must not be hidden by a cached "port closed".
+                self._port_cache.pop(host, None)
+            phase_probes[phase] = len(hosts)
+            probes = self.stream_host_probes(hosts)
+            try:
+                async for result in probes:
+                    node_id = remaining.pop(str(result.get("fingerprint") or ""), None)
+                    if node_id:
+                        found[node_id] = {**result, "phase": phase}
+                        if not remaining:
+                            break
+            finally:
+                await probes.aclose()
+        self._rediscovery_sweeps += 1
+        self._rediscovery_last_sweep = {
+            "finished_at": time.time(),
+            "duration_ms": int((time.monotonic() - started) * 1000),
+            "wanted": len(wanted),
+            "found": len(found),
+            "probes": len(probed),
+            "phase_probes": phase_probes,
+        }
+        log.info(
+            "Rediscovery sweep: found %s/%s nodes with %s probes in %sms %s",
+            len(found),
+            len(wanted),
+            len(probed),
+            self._rediscovery_last_sweep["duration_ms"],
+            phase_probes,
+        )
+        return found
+
+    def _prune_rediscovery(self) -> None:
+        nodes = self.get_nodes()
+        for node_id in list(self._rediscovery_wanted):
+            node = nodes.get(node_id)
+            if not node or node.get("online"):
+                self._rediscovery_wanted.pop(node_id, None)
 
-    async def _rediscover_node(self, node_id: str, fingerprint: str) -> None:
+    async def _rediscovery_loop(self) -> None:
+        interval = max(10, int(self.node_rediscovery_interval))
         try:
-            interval = max(10, int(self.node_rediscovery_interval))
             while True:
-                node = self.get_nodes().get(node_id)
-                if not node or node.get("online"):
+                self._prune_rediscovery()
+                if not self._rediscovery_wanted:
                     return
-                match = await self._find_node_by_fingerprint(fingerprint)
-                if match and match.get("url"):
-                    new_url = self.normalize_node_url(match["url"])
-                    if new_url:
-                        node["url"] = new_url
-                        self.save_nodes()
-                        reachable, _ = await self.refresh_agent_metadata(node)
-                        if reachable:
-                            log.info("Node %s rediscovered at %s", node_id, new_url)
-                            await self.broadcast_nodes()
-                            return
-                await asyncio.sleep(interval)
+                found = await self._rediscovery_sweep()
+                changed = False
+                for node_id, match in found.items():
+                    node = self.get_nodes().get(node_id)
+                    new_url = self.normalize_node_url(match["url"]) if match.get("url") else None
+                    if not node or not new_url:
+                        continue
+                    node["url"] = new_url
+                    self.save_nodes()
+                    reachable, _ = await self.refresh_agent_metadata(node)
+                    if reachable:
+                        log.info("Node %s rediscovered at %s (%s)", node_id, new_url, match.get("phase"))
+                        self._rediscovery_wanted.pop(node_id, None)
+                        changed = True
+                if changed:
+                    await self.broadcast_nodes()
+                if not self._rediscovery_wanted:
+                    return
+                assert self._rediscovery_wakeup is not None
+                self._rediscovery_wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._rediscovery_wakeup.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
         except asyncio.CancelledError:
             pass
         finally:
-            self._rediscovery_tasks.pop(node_id, None)
+            if self._rediscovery_task is asyncio.current_task():
+                self._rediscovery_task = None
+
+
+def _host_from_url(url: Any) -> Optional[str]:
+    if not isinstance(url, str) or not url:
+        return None
+    try:
+        return urlparse(url if "://" in url else f"http://{url}").hostname
+    except ValueError:
+        return None
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from zeroconf import IPVersion, ServiceStateChange, Zeroconf
+from zeroconf.asyncio import AsyncServiceBrowser, AsyncServiceInfo, AsyncZeroconf
+
+
+log = logging.getLogger("roomcast")
+
+ROOMCAST_SERVICE_TYPE = "_roomcast._tcp.local."
+
+
+class NodeMdnsIndex:
+    """Passive listener for ``_roomcast._tcp`` announcements.
+
+    Keeps a fingerprint -> address index that discovery and rediscovery can
+    answer from without probing the network.
+    """
+
+    def __init__(
+        self,
+        *,
+        service_type: str = ROOMCAST_SERVICE_TYPE,
+        interfaces: Optional[list[str]] = None,
+        resolve_timeout_ms: int = 3000,
+        on_seen: Optional[Callable[[dict], None]] = None,
+    ) -> None:
+        self._service_type = service_type
+        self._interfaces = interfaces
+        self._resolve_timeout_ms = resolve_timeout_ms
+        self._on_seen = on_seen
+        self._zeroconf: Optional[AsyncZeroconf] = None
+        self._browser: Optional[AsyncServiceBrowser] = None
+        self._entries: dict[str, dict] = {}
+        self._names: dict[str, str] = {}
+        self._pending: set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._browser is not None
+
+    async def start(self) -> None:
+        if self._browser is not None:
+            return
+        kwargs: dict = {"ip_version": IPVersion.V4Only}
+        if self._interfaces:
+            kwargs["interfaces"] = self._interfaces
+        self._zeroconf = AsyncZeroconf(**kwargs)
+        self._browser = AsyncServiceBrowser(
+            self._zeroconf.zeroconf,
+            [self._service_type],
+            handlers=[self._on_service_state_change],
+        )
+        log.info("Listening for %s announcements", self._service_type)
+
+    async def stop(self) -> None:
+        browser, self._browser = self._browser, None
+        zc, self._zeroconf = self._zeroconf, None
+        for task in list(self._pending):
+            task.cancel()
+        if browser is not None:
+            await browser.async_cancel()
+        if zc is not None:
+            await zc.async_close()
+
+    def lookup(self, fingerprint: Optional[str]) -> Optional[dict]:
+        if not fingerprint:
+            return None
+        entry = self._entries.get(str(fingerprint))
+        return dict(entry) if entry else None
+
+    def entries(self) -> list[dict]:
+        return [dict(entry) for entry in self._entries.values()]
+
+    def _on_service_state_change(
+        self,
+        zeroconf: Zeroconf,
+        service_type: str,
+        name: str,
+        state_change: ServiceStateChange,
+    ) -> None:
+        if state_change is ServiceStateChange.Removed:
+            fingerprint = self._names.pop(name, None)
+            if fingerprint:
+                self._entries.pop(fingerprint, None)
+            return
+        task = asyncio.ensure_future(self._resolve(service_type, name))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _resolve(self, service_type: str, name: str) -> None:
+        if self._zeroconf is None:
+            return
+        info = AsyncServiceInfo(service_type, name)
+        try:
+            if not await info.async_request(self._zeroconf.zeroconf, self._resolve_timeout_ms):
+                return
+        except Exception as exc:  # pragma: no cover - network edge
+            log.debug("mDNS resolve failed for %s: %s", name, exc)
+            return
+        properties = {
+            (key.decode(errors="ignore") if isinstance(key, bytes) else str(key)): (
+                value.decode(errors="ignore") if isinstance(value, bytes) else value
+            )
+            for key, value in (info.properties or {}).items()
+        }
+        fingerprint = (properties.get("fingerprint") or "").strip()
+        addresses = info.parsed_addresses(IPVersion.V4Only)
+        if not fingerprint or not addresses or not info.port:
+            return
+        host = addresses[0]
+        entry = {
+            "host": host,
+            "url": f"http://{host}:{info.port}",
+            "healthy": True,
+            "version": properties.get("version"),
+            "fingerprint": fingerprint,
+            "paired": properties.get("paired") == "1",
+            "source": "mdns",
+            "seen_at": time.time(),
+        }
+        previous = self._names.get(name)
+        if previous and previous != fingerprint:
+            self._entries.pop(previous, None)
+        self._names[name] = fingerprint
+        self._entries[fingerprint] = entry
+        if self._on_seen:
+            try:
+                self._on_seen(dict(entry))
+            except Exception:  # pragma: no cover - defensive
+                log.exception("mDNS listener callback failed")
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import copy
+from typing import Any, Callable, Hashable, Iterable, Optional
+from urllib.parse import urlparse
+
+
+ORDER_FIELDS = frozenset({"section_id", "section_order", "name"})
+INDEX_FIELDS = frozenset({"url", "fingerprint", "channel_id"})
+
+
+def node_host(node: dict) -> Optional[str]:
+    url = node.get("url")
+    if not isinstance(url, str) or not url:
+        return None
+    try:
+        host = urlparse(url).hostname
+    except ValueError:
+        return None
+    return host.lower() if host else None
+
+
+class TrackedNode(dict):
+    """Node dict that counts its own top-level mutations.
+
+    ``revision`` increases on every write so projections derived from the node can be
+    cached until it changes. Writes to ordering fields also notify the owning registry.
+    """
+
+    revision: int = 0
+    _registry: Optional["NodeRegistry"] = None
+
+    def _touch(self, keys: Iterable[Any] = ()) -> None:
+        self.revision += 1
+        registry = self._registry
+        if registry is None:
+            return
+        if not keys or any(key in ORDER_FIELDS for key in keys):
+            registry.order_revision += 1
+        if not keys or any(key in INDEX_FIELDS for key in keys):
+            registry.index_revision += 1
+
+    def __copy__(self) -> dict:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict) -> dict:
+        # Copies are plain snapshots; they must not report mutations to the registry.
+        return copy.deepcopy(dict(self), memo)
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self._touch((key,))
+
+    def __delitem__(self, key) -> None:
+        super().__delitem__(key)
+        self._touch((key,))
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, key, *default):
+        present = key in self
+        value = super().pop(key, *default)
+        if present:
+            self._touch((key,))
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._touch((item[0],))
+        return item
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def update(self, *args, **kwargs) -> None:
+        changes = dict(*args, **kwargs)
+        super().update(changes)
+        if changes:
+            self._touch(changes.keys())
+
+    def clear(self) -> None:
+        super().clear()
+        self._touch()
+
+
+class NodeRegistry(dict):
+    """``node_id -> node`` mapping that stores nodes as :class:`TrackedNode`.
+
+    ``order_revision`` changes whenever membership or an ordering field changes, which is
+    all the projection cache needs to know to keep its sorted index. ``find`` answers
+    lookups by host, fingerprint or channel from indexes rebuilt only after membership
+    or an indexed field changes.
+    """
+
+    order_revision: int = 0
+    index_revision: int = 0
+    _indexes: Optional[dict[str, dict[str, list[str]]]] = None
+    _indexed_at: int = -1
+
+    def find(
+        self,
+        *,
+        host: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        channel_id: Optional[str] = None,
+    ) -> list[TrackedNode]:
+        """Nodes matching every given criterion (host is the URL hostname, case-insensitive)."""
+        criteria = [
+            ("host", host.strip().lower() if isinstance(host, str) else None),
+            ("fingerprint", fingerprint),
+            ("channel_id", channel_id),
+        ]
+        criteria = [(field, value) for field, value in criteria if value]
+        if not criteria:
+            return []
+        indexes = self._current_indexes()
+        matches: Optional[list[str]] = None
+        for field, value in criteria:
+            keys = indexes[field].get(value, [])
+            matches = keys if matches is None else [key for key in matches if key in keys]
+        return [self[key] for key in matches or [] if key in self]
+
+    def _current_indexes(self) -> dict[str, dict[str, list[str]]]:
+        stamp = self.index_revision + self.order_revision
+        if self._indexes is None or self._indexed_at != stamp:
+            indexes: dict[str, dict[str, list[str]]] = {"host": {}, "fingerprint": {}, "channel_id": {}}
+            for key, node in self.items():
+                for field, value in (
+                    ("host", node_host(node)),
+                    ("fingerprint", node.get("fingerprint")),
+                    ("channel_id", node.get("channel_id")),
+                ):
+                    if isinstance(value, str) and value:
+                        indexes[field].setdefault(value, []).append(key)
+            self._indexes = indexes
+            self._indexed_at = stamp
+        return self._indexes
+
+    def _adopt(self, node: dict) -> TrackedNode:
+        if not isinstance(node, TrackedNode):
+            node = TrackedNode(node)
+        node._registry = self
+        return node
+
+    def __setitem__(self, key, node) -> None:
+        super().__setitem__(key, self._adopt(node))
+        self.order_revision += 1
+
+    def __delitem__(self, key) -> None:
+        super().__delitem__(key)
+        self.order_revision += 1
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, key, *default):
+        present = key in self
+        value = super().pop(key, *default)
+        if present:
+            self.order_revision += 1
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self.order_revision += 1
+        return item
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs) -> None:
+        for key, node in dict(*args, **kwargs).items():
+            self[key] = node
+
+    def clear(self) -> None:
+        super().clear()
+        self.order_revision += 1
+
+    def replace(self, entries: dict) -> None:
+        """Swap in a freshly loaded node set while keeping this object's identity."""
+        self.clear()
+        self.update(entries)
+
+
+class NodeProjectionCache:
+    """Memoized ``public_node`` projections and node ordering.
+
+    A node is only re-projected when its revision or its ``external_key`` (state kept
+    outside the node dict, such as restart tracking) changes, and the sorted index is
+    only rebuilt when membership, an ordering field or the section layout changes.
+    """
+
+    def __init__(
+        self,
+        *,
+        registry: NodeRegistry,
+        project: Callable[[dict], dict],
+        external_key: Callable[[dict], Hashable],
+        section_ids: Callable[[], list[str]],
+    ) -> None:
+        self._registry = registry
+        self._project = project
+        self._external_key = external_key
+        self._section_ids = section_ids
+        self._projections: dict[str, tuple[int, Hashable, dict]] = {}
+        self._order: list[str] = []
+        self._order_key: Optional[tuple] = None
+        self.stats = {"hits": 0, "misses": 0, "reorders": 0}
+
+    def public_node(self, node: dict) -> dict:
+        node_id = node.get("id")
+        if not isinstance(node, TrackedNode) or not node_id or self._registry.get(node_id) is not node:
+            # Nodes that are not (or no longer) registered are projected without caching.
+            return self._project(node)
+        external = self._external_key(node)
+        cached = self._projections.get(node_id)
+        if cached and cached[0] == node.revision and cached[1] == external:
+            self.stats["hits"] += 1
+            return cached[2]
+        self.stats["misses"] += 1
+        data = self._project(node)
+        self._projections[node_id] = (node.revision, external, data)
+        return data
+
+    def ordered_nodes(self) -> list[dict]:
+        section_ids = tuple(self._section_ids())
+        key = (self._registry.order_revision, section_ids)
+        if key != self._order_key:
+            self._reorder(section_ids)
+            self._order_key = key
+        return [self._registry[key] for key in self._order]
+
+    def public_nodes(self, visible: Optional[Callable[[dict], bool]] = None) -> list[dict]:
+        return [self.public_node(node) for node in self.ordered_nodes() if visible is None or visible(node)]
+
+    def _reorder(self, section_ids: tuple) -> None:
+        self.stats["reorders"] += 1
+        section_rank = {sid: idx for idx, sid in enumerate(section_ids)}
+
+        def _node_key(entry: dict) -> tuple:
+            sid = entry.get("section_id")
+            # Unsectioned nodes should appear before user-defined sections.
+            if not sid:
+                rank = -1
+            else:
+                rank = section_rank.get(sid, 10**9)
+            order = entry.get("section_order")
+            try:
+                order_val = int(order)
+            except (TypeError, ValueError):
+                order_val = 10**9
+            name_val = (entry.get("name") or "").lower()
+            return (rank, order_val, name_val)
+
+        self._order = [key for key, _ in sorted(self._registry.items(), key=lambda item: _node_key(item[1]))]
+        for node_id in list(self._projections):
+            if node_id not in self._registry:
+                self._projections.pop(node_id, None)
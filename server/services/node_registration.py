@@ -68,7 +68,7 @@ class NodeRegistrationService:
             node.pop("offline_since", None)
             return node
         if fingerprint:
-            for existing in nodes.values():
+            for existing in nodes.find(fingerprint=fingerprint):
                 if existing.get("fingerprint") == fingerprint:
                     existing["url"] = normalized
                     existing["last_seen"] = now
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import copy
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+NodeVisible = Callable[[dict, Optional[dict]], bool]
+
+
+@dataclass
+class NodeStateTracker:
+    """Versioned view of the public node list.
+
+    Each call to ``update`` diffs a fresh projection against the previous one; when
+    anything changed the global revision is bumped and a patch with only the changed
+    nodes and fields is recorded, so watchers can be sent deltas and resync from a
+    revision without a full snapshot.
+    """
+
+    node_visible: NodeVisible
+    history_size: int = 128
+
+    revision: int = 0
+    _nodes: dict[str, dict] = field(default_factory=dict)
+    _order: list[str] = field(default_factory=list)
+    _sections: list[dict] = field(default_factory=list)
+    _history: deque = field(default_factory=deque)
+
+    def update(self, sections: list[dict], ordered_nodes: list[dict]) -> Optional[dict]:
+        changes: list[dict] = []
+        current: dict[str, dict] = {}
+        order: list[str] = []
+        for node in ordered_nodes:
+            node_id = node.get("id")
+            if not node_id:
+                continue
+            order.append(node_id)
+            previous = self._nodes.get(node_id)
+            if previous is not None and node == previous:
+                # Memoized projections share nested values with the live node, so identity
+                # says nothing about in-place edits; one C-level comparison does.
+                current[node_id] = previous
+                continue
+            if previous is None:
+                # Projections share nested values with live node dicts; keep our own copy to diff against.
+                current[node_id] = copy.deepcopy(node)
+                changes.append({"id": node_id, "node": current[node_id]})
+                continue
+            fields = {key: value for key, value in node.items() if previous.get(key, _MISSING) != value}
+            unset = [key for key in previous if key not in node]
+            if not fields and not unset:
+                current[node_id] = previous
+            else:
+                current[node_id] = copy.deepcopy(node)
+                fields = copy.deepcopy(fields)
+                change: dict = {"id": node_id, "fields": fields}
+                if unset:
+                    change["unset"] = unset
+                # Visibility depends on ownership; keep it on every change so watchers can filter.
+                change["owner_id"] = node.get("owner_id")
+                changes.append(change)
+        removed = [node_id for node_id in self._nodes if node_id not in current]
+        order_changed = order != self._order
+        sections_changed = sections != self._sections
+        if not changes and not removed and not order_changed and not sections_changed:
+            self._nodes = current
+            return None
+
+        self.revision += 1
+        patch: dict = {"type": "nodes_patch", "revision": self.revision, "base": self.revision - 1, "changes": changes}
+        if removed:
+            patch["removed"] = removed
+        if order_changed:
+            patch["order"] = order
+        if sections_changed:
+            patch["sections"] = copy.deepcopy(sections)
+        self._nodes = current
+        self._order = order
+        self._sections = copy.deepcopy(sections)
+        self._history.append(patch)
+        while len(self._history) > max(1, self.history_size):
+            self._history.popleft()
+        return patch
+
+    def snapshot_for_user(self, user: Optional[dict]) -> dict:
+        return {
+            "type": "nodes",
+            "revision": self.revision,
+            "sections": self._sections,
+            "nodes": [self._nodes[node_id] for node_id in self._order if self.node_visible(self._nodes[node_id], user)],
+        }
+
+    def patch_for_user(self, patch: dict, user: Optional[dict]) -> dict:
+        filtered = dict(patch)
+        changes: list[dict] = []
+        hidden: list[str] = []
+        for change in patch["changes"]:
+            if self.node_visible(change.get("node") or change, user):
+                changes.append(change)
+            else:
+                # Covers nodes handed to another owner; clients drop ids they do not know.
+                hidden.append(change["id"])
+        filtered["changes"] = changes
+        if hidden:
+            filtered["removed"] = list(patch.get("removed") or []) + hidden
+        if "order" in patch:
+            filtered["order"] = [
+                node_id
+                for node_id in patch["order"]
+                if node_id in self._nodes and self.node_visible(self._nodes[node_id], user)
+            ]
+        return filtered
+
+    def patches_since(self, revision: int) -> Optional[list[dict]]:
+        """Return the patches after ``revision``, or None when a full snapshot is required."""
+        if revision == self.revision:
+            return []
+        if revision > self.revision or not self._history:
+            return None
+        if self._history[0]["base"] > revision:
+            return None
+        return [patch for patch in self._history if patch["revision"] > revision]
+
+
+_MISSING = object()
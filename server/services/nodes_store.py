@@ -1,17 +1,22 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import logging
 import time
 import uuid
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional
 
 
+log = logging.getLogger("roomcast")
+
+
 class NodesStore:
     def __init__(
         self,
         *,
         nodes_path: Path,
+        state_store: Any,
         transient_node_fields: set[str],
         normalize_section_name: Callable[[Any], str],
         normalize_node_url: Callable[[str], str],
@@ -22,6 +27,7 @@ class NodesStore:
         find_section: Callable[[Optional[str]], Optional[dict]],
     ) -> None:
         self._nodes_path = nodes_path
+        self._state_store = state_store
         self._transient_node_fields = transient_node_fields
         self._normalize_section_name = normalize_section_name
         self._normalize_node_url = normalize_node_url
@@ -32,11 +38,11 @@ class NodesStore:
         self._find_section = find_section
 
     def load(self) -> tuple[dict, list]:
-        if not self._nodes_path.exists():
+        if not self._state_store.exists(self._nodes_path):
             return {}, []
 
         try:
-            raw = json.loads(self._nodes_path.read_text())
+            raw = self._state_store.read(self._nodes_path)
             if isinstance(raw, dict):
                 data = raw.get("nodes") or []
                 section_data = raw.get("sections") or []
@@ -150,6 +156,14 @@ class NodesStore:
             return {}, []
 
     def save(self, *, nodes: dict, sections: list) -> None:
+        self.write(self.serialize(nodes=nodes, sections=sections))
+
+    def serialize(self, *, nodes: dict, sections: list) -> dict:
+        """Build the stored document from shallow copies of the current state.
+
+        Cheap enough to run on the event loop; the result no longer aliases the live node
+        dicts' top level, so it can be encoded and written from another thread.
+        """
         section_rank = {section.get("id"): idx for idx, section in enumerate(sections) if section.get("id")}
 
         def _node_key(entry: dict) -> tuple:
@@ -184,5 +198,120 @@ class NodesStore:
                     "updated_at": section.get("updated_at") or int(time.time()),
                 }
             )
+        return {"sections": serialized_sections, "nodes": serialized_nodes}
+
+    def write(self, document: dict) -> None:
+        self._state_store.write(self._nodes_path, document, indent=2)
+
+
+class NodesWriteBehind:
+    """Coalesces ``save_nodes`` calls into at most one node-state write per interval.
+
+    ``mark_dirty`` only flags the state; a timer snapshots it on the loop and hands the
+    encode and write to a worker thread. Without a running loop (startup, scripts)
+    the write happens inline.
+    """
+
+    def __init__(
+        self,
+        *,
+        store: NodesStore,
+        get_state: Callable[[], tuple[dict, list]],
+        interval: float = 1.0,
+    ) -> None:
+        self._store = store
+        self._get_state = get_state
+        self._interval = max(0.0, float(interval))
+        self._dirty = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._stats = {
+            "marks": 0,
+            "coalesced": 0,
+            "writes": 0,
+            "errors": 0,
+            "last_write_at": None,
+            "last_write_ms": None,
+            "max_write_ms": 0.0,
+            "total_write_ms": 0.0,
+        }
+
+    def mark_dirty(self) -> None:
+        self._stats["marks"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._dirty = False
+            self._write_sync()
+            return
+        if self._dirty:
+            self._stats["coalesced"] += 1
+        self._dirty = True
+        if self._timer is None and (self._flush_task is None or self._flush_task.done()):
+            self._timer = loop.call_later(self._interval, self._start_flush)
+
+    async def flush(self) -> None:
+        """Write pending changes now and wait for any in-flight write."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        task = self._flush_task
+        if task is not None and not task.done():
+            await asyncio.shield(task)
+        if self._dirty:
+            await self._flush()
+
+    def stats(self) -> dict:
+        writes = self._stats["writes"]
+        return {
+            **{key: value for key, value in self._stats.items() if key != "total_write_ms"},
+            "pending": self._dirty,
+            "avg_write_ms": round(self._stats["total_write_ms"] / writes, 3) if writes else None,
+            "interval": self._interval,
+        }
+
+    def _start_flush(self) -> None:
+        self._timer = None
+        self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        async with self._write_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            nodes, sections = self._get_state()
+            document = self._store.serialize(nodes=nodes, sections=sections)
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(self._store.write, document)
+            except Exception:
+                self._stats["errors"] += 1
+                self._dirty = True
+                log.exception("Failed to persist nodes")
+            else:
+                self._record_write(started)
+        if self._dirty and self._timer is None:
+            # Changes arrived while writing (or the write failed): schedule the next round.
+            self._timer = asyncio.get_running_loop().call_later(self._interval, self._start_flush)
+
+    def _write_sync(self) -> None:
+        nodes, sections = self._get_state()
+        started = time.perf_counter()
+        try:
+            self._store.save(nodes=nodes, sections=sections)
+        except Exception:
+            self._stats["errors"] += 1
+            log.exception("Failed to persist nodes")
+            return
+        self._record_write(started)
 
-        self._nodes_path.write_text(json.dumps({"sections": serialized_sections, "nodes": serialized_nodes}, indent=2))
+    def _record_write(self, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._stats["writes"] += 1
+        self._stats["last_write_at"] = time.time()
+        self._stats["last_write_ms"] = round(elapsed_ms, 3)
+        self._stats["max_write_ms"] = round(max(self._stats["max_write_ms"], elapsed_ms), 3)
+        self._stats["total_write_ms"] += elapsed_ms
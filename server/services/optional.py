@@ -107,6 +107,9 @@ class NullCastService:
     async def discover(self, *args: Any, **kwargs: Any) -> list[dict]:
         return []
 
+    async def probe_hosts(self, *args: Any, **kwargs: Any) -> list[dict]:
+        return []
+
     async def fetch_device(self, *args: Any, **kwargs: Any) -> Optional[dict]:
         self._raise()
 
@@ -23,7 +23,7 @@ class ProviderRuntimeService:
         save_channels: Callable[[], None],
         sources_by_id: Dict[str, dict],
         channels_by_id: Dict[str, dict],
-        sources_path: Path,
+        sources_exist: Callable[[], bool],
         config_path: Path,
         spotify_token_path: Path,
         librespot_status_path: Path,
@@ -40,7 +40,7 @@ class ProviderRuntimeService:
         self._save_channels = save_channels
         self._sources_by_id = sources_by_id
         self._channels_by_id = channels_by_id
-        self._sources_path = sources_path
+        self._sources_exist = sources_exist
         self._config_path = config_path
         self._spotify_token_path = spotify_token_path
         self._librespot_status_path = librespot_status_path
@@ -143,7 +143,7 @@ class ProviderRuntimeService:
         # Remove spotify sources and detach channels.
         self._sources_by_id.pop("spotify:a", None)
         self._sources_by_id.pop("spotify:b", None)
-        if self._sources_path.exists():
+        if self._sources_exist():
             self._save_sources()
 
         for channel in self._channels_by_id.values():
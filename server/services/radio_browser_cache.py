@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from services.state_store import write_json_atomic
+
+
+log = logging.getLogger("roomcast")
+
+_SNAPSHOT_VERSION = 1
+
+
+@dataclass
+class _Entry:
+    payload: Any
+    size: int
+    fetched_at: float
+    ttl: float
+
+
+class RadioBrowserCache:
+    """Bounded LRU of Radio Browser responses with stale-while-revalidate.
+
+    Entries are limited by count and by encoded size. Within its TTL an entry is served
+    as is; for ``max_stale`` seconds after that it is still served while ``refresh``
+    fetches a replacement in the background (one refresh per key at a time). The cache
+    is snapshotted to ``path`` shortly after it changes and reloaded on startup, so the
+    first directory loads after a restart do not wait on the upstream.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: Optional[Path] = None,
+        max_entries: int = 500,
+        max_bytes: int = 8 * 1024 * 1024,
+        max_stale: float = 86400.0,
+        save_delay: float = 30.0,
+    ) -> None:
+        self._path = Path(path) if path else None
+        self._max_entries = max(1, int(max_entries))
+        self._max_bytes = max(0, int(max_bytes))
+        self._max_stale = max(0.0, float(max_stale))
+        self._save_delay = max(0.0, float(save_delay))
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self._save_timer: Optional[asyncio.TimerHandle] = None
+        self._saving: Optional[asyncio.Task] = None
+        self._dirty = False
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "evictions": 0,
+            "saves": 0,
+            "loaded": 0,
+        }
+
+    def get(self, key: str) -> Optional[tuple[Any, bool]]:
+        """``(payload, fresh)`` for ``key``, or None when missing or too stale to serve."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        age = time.time() - entry.fetched_at
+        if age < entry.ttl:
+            self.stats["hits"] += 1
+            self._entries.move_to_end(key)
+            return entry.payload, True
+        if age < entry.ttl + self._max_stale:
+            self.stats["stale_hits"] += 1
+            self._entries.move_to_end(key)
+            return entry.payload, False
+        self._remove(key)
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, payload: Any, ttl: float, *, size: Optional[int] = None) -> None:
+        if not key or ttl <= 0:
+            return
+        if size is None:
+            size = len(json.dumps(payload, separators=(",", ":")))
+        self._remove(key)
+        if size > self._max_bytes:
+            return
+        self._entries[key] = _Entry(payload, size, time.time(), float(ttl))
+        self._bytes += size
+        while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.stats["evictions"] += 1
+        self._mark_dirty()
+
+    def refresh(self, key: str, fetch: Callable[[], Awaitable[tuple[Any, int]]], ttl: float) -> None:
+        """Refetch ``key`` in the background unless a refresh is already running."""
+        task = self._refreshing.get(key)
+        if task is not None and not task.done():
+            return
+        self._refreshing[key] = asyncio.create_task(self._refresh(key, fetch, ttl))
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[tuple[Any, int]]], ttl: float) -> None:
+        self.stats["refreshes"] += 1
+        try:
+            payload, size = await fetch()
+        except Exception as exc:
+            # The stale entry keeps being served; the next read tries again.
+            self.stats["refresh_errors"] += 1
+            log.debug("Radio Browser background refresh of %s failed: %s", key, exc)
+        else:
+            self.put(key, payload, ttl, size=size)
+        finally:
+            self._refreshing.pop(key, None)
+
+    def usage(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self._max_entries,
+            "max_bytes": self._max_bytes,
+            **self.stats,
+        }
+
+    def load(self) -> None:
+        """Restore the last snapshot, dropping entries that are too old to serve."""
+        if self._path is None or not self._path.exists():
+            return
+        try:
+            data = json.loads(self._path.read_text())
+        except (OSError, ValueError) as exc:
+            log.warning("Ignoring unreadable Radio Browser cache snapshot %s: %s", self._path, exc)
+            return
+        if not isinstance(data, dict) or data.get("version") != _SNAPSHOT_VERSION:
+            return
+        now = time.time()
+        for item in data.get("entries") or []:
+            try:
+                key, payload, fetched_at, ttl = item["key"], item["payload"], float(item["fetched_at"]), float(item["ttl"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if now - fetched_at >= ttl + self._max_stale:
+                continue
+            size = len(json.dumps(payload, separators=(",", ":")))
+            if size > self._max_bytes:
+                continue
+            self._entries[key] = _Entry(payload, size, fetched_at, ttl)
+            self._bytes += size
+            self.stats["loaded"] += 1
+        while self._entries and (len(self._entries) > self._max_entries or self._bytes > self._max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+
+    async def flush(self) -> None:
+        """Write the snapshot now if anything changed since the last one."""
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
+        saving = self._saving
+        if saving is not None and not saving.done() and saving is not asyncio.current_task():
+            await saving
+        if not self._dirty or self._path is None:
+            return
+        self._dirty = False
+        # Oldest first, so a reload restores the same LRU order.
+        snapshot = {
+            "version": _SNAPSHOT_VERSION,
+            "entries": [
+                {"key": key, "payload": entry.payload, "fetched_at": entry.fetched_at, "ttl": entry.ttl}
+                for key, entry in self._entries.items()
+            ],
+        }
+        try:
+            await asyncio.to_thread(write_json_atomic, self._path, snapshot, indent=None)
+        except OSError as exc:
+            self._dirty = True
+            log.warning("Failed to save Radio Browser cache snapshot %s: %s", self._path, exc)
+            return
+        self.stats["saves"] += 1
+
+    async def close(self) -> None:
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await self.flush()
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if self._path is None or self._save_timer is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._save_timer = loop.call_later(self._save_delay, self._save_soon)
+
+    def _save_soon(self) -> None:
+        self._save_timer = None
+        self._saving = asyncio.create_task(self.flush())
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException
+
+
+log = logging.getLogger("roomcast")
+
+DEFAULT_RADIO_BROWSER_MIRRORS = (
+    "https://all.api.radio-browser.info/json",
+    "https://de1.api.radio-browser.info/json",
+    "https://nl1.api.radio-browser.info/json",
+    "https://at1.api.radio-browser.info/json",
+    "https://fr1.api.radio-browser.info/json",
+)
+
+
+def radio_browser_base_url_candidates(configured: str) -> List[str]:
+    configured_parts = [
+        part.strip().rstrip("/")
+        for part in (configured or "").split(",")
+        if part and part.strip()
+    ]
+    seen: set[str] = set()
+    candidates: List[str] = []
+    for entry in [*configured_parts, *DEFAULT_RADIO_BROWSER_MIRRORS]:
+        normalized = entry.strip().rstrip("/")
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        candidates.append(normalized)
+    return candidates
+
+
+@dataclass
+class _Mirror:
+    base_url: str
+    order: int
+    latencies: deque = field(default_factory=lambda: deque(maxlen=50))
+    latency_avg: Optional[float] = None
+    measured_at: float = 0.0
+    error_rate: float = 0.0
+    failures: int = 0
+    down_until: float = 0.0
+    requests: int = 0
+    wins: int = 0
+    errors: int = 0
+
+
+class RadioBrowserMirrors:
+    """Latency-ranked, hedged access to the Radio Browser mirrors over one pooled client.
+
+    Each mirror keeps a rolling latency average and error rate. A request goes to the
+    best-scoring healthy mirror; if it has not answered after that mirror's p95 latency
+    (clamped to ``hedge_min_delay``..``hedge_max_delay``) a duplicate goes to the next
+    one, and whichever answers first wins. A hedge loser is charged the time it had
+    taken so far when that exceeds its average. Failures fail over immediately, and a mirror that keeps failing is
+    benched for a growing cooldown, trying it only as a last resort. Mirrors not
+    measured for ``remeasure_after`` seconds rank first once so they get re-measured.
+    """
+
+    _ALPHA = 0.3
+
+    def __init__(
+        self,
+        *,
+        base_urls: List[str],
+        timeout: float,
+        user_agent: str,
+        hedge_min_delay: float = 0.15,
+        hedge_default_delay: float = 1.0,
+        hedge_max_delay: float = 2.0,
+        max_connections: int = 10,
+        remeasure_after: float = 600.0,
+    ) -> None:
+        self._mirrors = [_Mirror(url, index) for index, url in enumerate(base_urls)]
+        self._timeout = timeout
+        self._headers = {"User-Agent": user_agent}
+        self._hedge_min_delay = max(0.0, float(hedge_min_delay))
+        self._hedge_default_delay = max(self._hedge_min_delay, float(hedge_default_delay))
+        self._hedge_max_delay = max(self._hedge_default_delay, float(hedge_max_delay))
+        self._remeasure_after = max(0.0, float(remeasure_after))
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._client: Optional[httpx.AsyncClient] = None
+        self.stats = {"requests": 0, "hedges": 0, "backup_wins": 0, "failovers": 0}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self._timeout, limits=self._limits, headers=self._headers)
+        return self._client
+
+    def ranked(self) -> List[_Mirror]:
+        now = time.monotonic()
+        healthy = [mirror for mirror in self._mirrors if mirror.down_until <= now]
+        benched = sorted((mirror for mirror in self._mirrors if mirror.down_until > now), key=lambda m: m.down_until)
+        return sorted(healthy, key=self._score) + benched
+
+    async def get(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        *,
+        timeout: Optional[float] = None,
+        hedge: bool = True,
+    ) -> Tuple[Any, int]:
+        """GET ``path`` from the mirrors; returns the JSON payload and its size in bytes.
+
+        Bulk downloads pass ``hedge=False`` (a duplicate would double the transfer) and
+        their own ``timeout``; they still fail over but do not count towards latency.
+        """
+        candidates = self.ranked()
+        if not candidates:
+            raise HTTPException(status_code=502, detail="Radio directory unavailable")
+        self.stats["requests"] += 1
+        loop = asyncio.get_running_loop()
+        pending: dict[asyncio.Task, _Mirror] = {}
+        launched = 0
+        last_exc: Optional[BaseException] = None
+        all_timeouts = True
+
+        def _launch() -> float:
+            nonlocal launched
+            mirror = candidates[launched]
+            launched += 1
+            pending[asyncio.create_task(self._attempt(mirror, path, params, timeout, measure=hedge))] = mirror
+            return loop.time() + self._hedge_delay(mirror)
+
+        hedge_at = _launch()
+        try:
+            while pending:
+                wait = None
+                if hedge and len(pending) == 1 and launched < len(candidates):
+                    wait = max(0.0, hedge_at - loop.time())
+                done, _ = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.stats["hedges"] += 1
+                    hedge_at = _launch()
+                    continue
+                for task in done:
+                    mirror = pending.pop(task)
+                    exc = task.exception()
+                    if exc is None:
+                        mirror.wins += 1
+                        if mirror is not candidates[0]:
+                            self.stats["backup_wins"] += 1
+                        return task.result()
+                    if isinstance(exc, httpx.TimeoutException):
+                        last_exc = exc
+                        continue
+                    all_timeouts = False
+                    last_exc = exc
+                    if isinstance(exc, httpx.HTTPStatusError) and not self._retryable(exc):
+                        raise HTTPException(status_code=502, detail="Radio directory unavailable") from exc
+                if not pending and launched < len(candidates):
+                    self.stats["failovers"] += 1
+                    hedge_at = _launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        if all_timeouts:
+            raise HTTPException(status_code=504, detail="Radio directory timeout")
+        raise HTTPException(status_code=502, detail="Radio directory unavailable") from last_exc
+
+    def diagnostics(self) -> dict:
+        now = time.monotonic()
+        return {
+            **self.stats,
+            "mirrors": [
+                {
+                    "base_url": mirror.base_url,
+                    "latency_avg_ms": round(mirror.latency_avg * 1000, 1) if mirror.latency_avg is not None else None,
+                    "latency_p95_ms": round(p95 * 1000, 1) if (p95 := self._p95(mirror)) is not None else None,
+                    "error_rate": round(mirror.error_rate, 3),
+                    "benched_for": round(max(0.0, mirror.down_until - now), 1),
+                    "requests": mirror.requests,
+                    "wins": mirror.wins,
+                    "errors": mirror.errors,
+                }
+                for mirror in self.ranked()
+            ],
+        }
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _attempt(
+        self,
+        mirror: _Mirror,
+        path: str,
+        params: Optional[dict],
+        timeout: Optional[float] = None,
+        *,
+        measure: bool = True,
+    ) -> Tuple[Any, int]:
+        url = f"{mirror.base_url}/{path}".rstrip("/")
+        mirror.requests += 1
+        started = time.monotonic()
+        try:
+            if timeout is None:
+                response = await self.http.get(url, params=params)
+            else:
+                response = await self.http.get(url, params=params, timeout=timeout)
+            response.raise_for_status()
+            payload = response.json()
+        except asyncio.CancelledError:
+            # Lost a hedge race: the elapsed time is only a lower bound, so it is informative
+            # only when it already exceeds the estimate; otherwise it would pull it down.
+            elapsed = time.monotonic() - started
+            if measure and mirror.latency_avg is not None and elapsed > mirror.latency_avg:
+                self._record_latency(mirror, elapsed)
+            raise
+        except httpx.TimeoutException:
+            log.warning("Radio Browser request timeout for %s via %s", path, mirror.base_url)
+            self._record_failure(mirror)
+            raise
+        except httpx.HTTPStatusError as exc:
+            status_code = exc.response.status_code if exc.response else None
+            if self._retryable(exc):
+                log.warning(
+                    "Radio Browser server error for %s via %s (status=%s)",
+                    path,
+                    mirror.base_url,
+                    status_code,
+                )
+                self._record_failure(mirror)
+            else:
+                self._record_success(mirror, time.monotonic() - started if measure else None)
+            raise
+        except (httpx.RequestError, ValueError) as exc:
+            log.warning("Radio Browser request failed for %s via %s: %s", path, mirror.base_url, exc)
+            self._record_failure(mirror)
+            raise
+        self._record_success(mirror, time.monotonic() - started if measure else None)
+        return payload, len(response.content)
+
+    @staticmethod
+    def _retryable(exc: httpx.HTTPStatusError) -> bool:
+        status_code = exc.response.status_code if exc.response else None
+        return bool(status_code and (status_code >= 500 or status_code == 429))
+
+    def _score(self, mirror: _Mirror) -> tuple:
+        if mirror.latency_avg is None or time.monotonic() - mirror.measured_at > self._remeasure_after:
+            # Unmeasured (or long unmeasured) mirrors go first, in configured order.
+            return (0.0, mirror.order)
+        return (mirror.latency_avg * (1.0 + 4.0 * mirror.error_rate), mirror.order)
+
+    def _p95(self, mirror: _Mirror) -> Optional[float]:
+        if len(mirror.latencies) < 5:
+            return None
+        ordered = sorted(mirror.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _hedge_delay(self, mirror: _Mirror) -> float:
+        p95 = self._p95(mirror)
+        delay = self._hedge_default_delay if p95 is None else p95
+        return min(self._hedge_max_delay, max(self._hedge_min_delay, delay))
+
+    def _record_latency(self, mirror: _Mirror, elapsed: float) -> None:
+        mirror.latencies.append(elapsed)
+        mirror.latency_avg = elapsed if mirror.latency_avg is None else (
+            self._ALPHA * elapsed + (1 - self._ALPHA) * mirror.latency_avg
+        )
+        mirror.measured_at = time.monotonic()
+
+    def _record_success(self, mirror: _Mirror, elapsed: Optional[float]) -> None:
+        if elapsed is not None:
+            self._record_latency(mirror, elapsed)
+        mirror.error_rate *= 1 - self._ALPHA
+        mirror.failures = 0
+        mirror.down_until = 0.0
+
+    def _record_failure(self, mirror: _Mirror) -> None:
+        mirror.errors += 1
+        mirror.error_rate = self._ALPHA + (1 - self._ALPHA) * mirror.error_rate
+        mirror.failures += 1
+        if mirror.failures >= 2:
+            cooldown = min(300.0, 15.0 * 2 ** (mirror.failures - 2))
+            mirror.down_until = time.monotonic() + cooldown
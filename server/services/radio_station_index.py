@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+
+log = logging.getLogger("roomcast")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stations (
+    stationuuid TEXT PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    url_resolved TEXT NOT NULL DEFAULT '',
+    homepage TEXT NOT NULL DEFAULT '',
+    favicon TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '',
+    country TEXT NOT NULL DEFAULT '',
+    countrycode TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL DEFAULT '',
+    language TEXT NOT NULL DEFAULT '',
+    codec TEXT NOT NULL DEFAULT '',
+    bitrate INTEGER NOT NULL DEFAULT 0,
+    votes INTEGER NOT NULL DEFAULT 0,
+    clickcount INTEGER NOT NULL DEFAULT 0,
+    lastcheckok INTEGER NOT NULL DEFAULT 0,
+    lastchangetime TEXT NOT NULL DEFAULT '',
+    generation INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS stations_votes ON stations (votes DESC);
+CREATE INDEX IF NOT EXISTS stations_clicks ON stations (clickcount DESC);
+CREATE INDEX IF NOT EXISTS stations_name ON stations (name COLLATE NOCASE);
+CREATE VIRTUAL TABLE IF NOT EXISTS stations_fts USING fts5(
+    name, tags, content='stations', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS stations_ai AFTER INSERT ON stations BEGIN
+    INSERT INTO stations_fts (rowid, name, tags) VALUES (new.rowid, new.name, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS stations_ad AFTER DELETE ON stations BEGIN
+    INSERT INTO stations_fts (stations_fts, rowid, name, tags) VALUES ('delete', old.rowid, old.name, old.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS stations_au AFTER UPDATE OF name, tags ON stations BEGIN
+    INSERT INTO stations_fts (stations_fts, rowid, name, tags) VALUES ('delete', old.rowid, old.name, old.tags);
+    INSERT INTO stations_fts (rowid, name, tags) VALUES (new.rowid, new.name, new.tags);
+END;
+CREATE TABLE IF NOT EXISTS station_tags (name TEXT PRIMARY KEY, stationcount INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS station_countries (name TEXT PRIMARY KEY, iso_3166_1 TEXT, stationcount INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_COLUMNS = (
+    "stationuuid",
+    "name",
+    "url",
+    "url_resolved",
+    "homepage",
+    "favicon",
+    "tags",
+    "country",
+    "countrycode",
+    "state",
+    "language",
+    "codec",
+    "bitrate",
+    "votes",
+    "clickcount",
+    "lastcheckok",
+    "lastchangetime",
+)
+_INTEGER_COLUMNS = frozenset({"bitrate", "votes", "clickcount", "lastcheckok"})
+_SELECT = ", ".join(f"s.{column}" for column in _COLUMNS)
+
+Fetch = Callable[..., Awaitable[Tuple[Any, int]]]
+
+
+def _station_row(item: dict) -> Optional[tuple]:
+    uuid = str(item.get("stationuuid") or "").strip()
+    if not uuid:
+        return None
+    values: list[Any] = []
+    for column in _COLUMNS:
+        if column == "lastchangetime":
+            values.append(str(item.get("lastchangetime_iso8601") or item.get("lastchangetime") or ""))
+        elif column in _INTEGER_COLUMNS:
+            try:
+                values.append(int(item.get(column) or 0))
+            except (TypeError, ValueError):
+                values.append(0)
+        else:
+            value = item.get(column)
+            values.append(str(value).strip() if value is not None else "")
+    return tuple(values)
+
+
+def _like(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class RadioStationIndex:
+    """Local SQLite/FTS5 copy of the Radio Browser station directory.
+
+    ``loop`` keeps it in sync: a full download every ``full_sync_interval`` (which also
+    drops stations that disappeared upstream) paged in name order with overlapping
+    pages, so stations changing or being deleted mid-download cannot shift one past
+    the next page, and, in between, incremental syncs that
+    page through stations newest-change first and stop at the last change already
+    seen. Once a full sync has completed, searches, tag and country lists and top lists
+    are answered locally in the same shape the Radio Browser API returns, so they stay
+    fast and keep working while the upstream directory is down.
+    """
+
+    # Rows re-read at the start of each full-sync page; covers that many upstream deletions.
+    _FULL_SYNC_OVERLAP = 100
+
+    def __init__(
+        self,
+        *,
+        db_path: Path,
+        fetch: Fetch,
+        enabled: Callable[[], bool],
+        sync_interval: float = 3600.0,
+        full_sync_interval: float = 86400.0,
+        page_size: int = 5000,
+        page_timeout: float = 60.0,
+    ) -> None:
+        self._db_path = Path(db_path)
+        self._fetch = fetch
+        self._enabled = enabled
+        self._sync_interval = max(60.0, float(sync_interval))
+        self._full_sync_interval = max(self._sync_interval, float(full_sync_interval))
+        self._page_size = max(2 * self._FULL_SYNC_OVERLAP, int(page_size))
+        self._page_timeout = page_timeout
+        self._lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._ready = False
+        self._sync_task: Optional[asyncio.Task] = None
+        self.stats = {"syncs": 0, "full_syncs": 0, "sync_errors": 0, "upserted": 0, "removed": 0, "queries": 0}
+
+    @property
+    def ready(self) -> bool:
+        """True once a full sync has completed; until then callers use the remote API."""
+        return self._ready and self._enabled()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled()
+
+    def open(self) -> None:
+        if self._writer is not None:
+            return
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer = sqlite3.connect(str(self._db_path), check_same_thread=False, isolation_level=None)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        self._writer.execute("PRAGMA synchronous=NORMAL")
+        self._writer.executescript(_SCHEMA)
+        # Reads get their own connection so they are not held up by a sync's write batch.
+        self._reader = sqlite3.connect(str(self._db_path), check_same_thread=False)
+        self._reader.row_factory = sqlite3.Row
+        self._ready = bool(self._meta("last_full_sync")) and self._count() > 0
+
+    def close(self) -> None:
+        for conn in (self._reader, self._writer):
+            if conn is not None:
+                conn.close()
+        self._reader = self._writer = None
+        self._ready = False
+
+    async def loop(self) -> None:
+        while True:
+            delay = self._sync_interval
+            if self._enabled():
+                try:
+                    self.open()
+                    delay = await self._sync_due()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    self.stats["sync_errors"] += 1
+                    log.warning("Radio station index sync failed: %s", getattr(exc, "detail", exc))
+            await asyncio.sleep(delay)
+
+    async def sync(self, *, full: bool = False) -> dict:
+        """Run one sync now (joining one already in progress)."""
+        task = self._sync_task
+        if task is None or task.done():
+            task = self._sync_task = asyncio.create_task(self._sync(full))
+        return await asyncio.shield(task)
+
+    def status(self) -> dict:
+        return {
+            "ready": self._ready,
+            "stations": self._count() if self._reader is not None else 0,
+            "last_sync": self._meta("last_sync"),
+            "last_full_sync": self._meta("last_full_sync"),
+            "last_change": self._meta("last_change"),
+            **self.stats,
+        }
+
+    def search(
+        self,
+        *,
+        name: Optional[str] = None,
+        country: Optional[str] = None,
+        countrycode: Optional[str] = None,
+        tag: Optional[str] = None,
+        limit: int = 50,
+        hidebroken: bool = True,
+    ) -> List[dict]:
+        """Like ``/stations/search``: substring filters, name prefix-word matching, ordered by name."""
+        clauses: list[str] = []
+        params: list[Any] = []
+        if name:
+            tokens = re.findall(r"\w+", name.lower())
+            if tokens:
+                clauses.append("s.rowid IN (SELECT rowid FROM stations_fts WHERE stations_fts MATCH ?)")
+                params.append("name : (" + " ".join(f'"{token}"*' for token in tokens) + ")")
+            else:
+                clauses.append("s.name LIKE ? ESCAPE '\\'")
+                params.append(_like(name))
+        if country:
+            clauses.append("s.country LIKE ? ESCAPE '\\'")
+            params.append(_like(country))
+        if countrycode:
+            clauses.append("s.countrycode = ? COLLATE NOCASE")
+            params.append(countrycode)
+        if tag:
+            clauses.append("s.tags LIKE ? ESCAPE '\\'")
+            params.append(_like(tag))
+        if hidebroken:
+            clauses.append("s.lastcheckok = 1")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = f"SELECT {_SELECT} FROM stations s {where} ORDER BY s.name COLLATE NOCASE LIMIT ?"
+        return self._stations(sql, [*params, max(1, int(limit))])
+
+    def top(self, metric: str, limit: int) -> List[dict]:
+        """Like ``/stations/topvote`` and ``/stations/topclick``."""
+        column = "clickcount" if metric == "clicks" else "votes"
+        sql = f"SELECT {_SELECT} FROM stations s ORDER BY s.{column} DESC LIMIT ?"
+        return self._stations(sql, [max(1, int(limit))])
+
+    def tags(self, limit: int) -> List[dict]:
+        sql = "SELECT name, stationcount FROM station_tags ORDER BY stationcount DESC LIMIT ?"
+        return [dict(row) for row in self._query(sql, [max(1, int(limit))])]
+
+    def countries(self, limit: int) -> List[dict]:
+        sql = "SELECT name, iso_3166_1, stationcount FROM station_countries ORDER BY stationcount DESC LIMIT ?"
+        return [dict(row) for row in self._query(sql, [max(1, int(limit))])]
+
+    def _stations(self, sql: str, params: list) -> List[dict]:
+        return [dict(row) for row in self._query(sql, params)]
+
+    def _query(self, sql: str, params: list) -> list:
+        if self._reader is None:
+            return []
+        self.stats["queries"] += 1
+        return self._reader.execute(sql, params).fetchall()
+
+    def _count(self) -> int:
+        return self._reader.execute("SELECT COUNT(*) FROM stations").fetchone()[0]
+
+    def _meta(self, key: str) -> Optional[str]:
+        if self._reader is None:
+            return None
+        row = self._reader.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    async def _sync_due(self) -> float:
+        """Run whichever sync is due and return the seconds until the next one."""
+        now = time.time()
+        last_full = float(self._meta("last_full_sync") or 0)
+        last_sync = float(self._meta("last_sync") or 0)
+        if now - last_full >= self._full_sync_interval:
+            await self.sync(full=True)
+        elif now - last_sync >= self._sync_interval:
+            await self.sync(full=False)
+        else:
+            return self._sync_interval - (now - last_sync)
+        return self._sync_interval
+
+    async def _sync(self, full: bool) -> dict:
+        since = None if full else self._meta("last_change")
+        generation = self._reader.execute("SELECT COALESCE(MAX(generation), 0) + 1 FROM stations").fetchone()[0]
+        newest = since or ""
+        offset = 0
+        upserted = 0
+        # Change-time order moves a station to the front whenever it changes, which would
+        # shift the offsets of a long download; only incremental syncs need it.
+        step = self._page_size - self._FULL_SYNC_OVERLAP if full else self._page_size
+        seen: set[str] = set()
+        while True:
+            params = {
+                "order": "name" if full else "changetimestamp",
+                "reverse": "false" if full else "true",
+                "hidebroken": "false",
+                "offset": offset,
+                "limit": self._page_size,
+            }
+            payload, _ = await self._fetch("stations/search", params, timeout=self._page_timeout, hedge=False)
+            items = [item for item in payload if isinstance(item, dict)] if isinstance(payload, list) else []
+            rows = [row for row in (_station_row(item) for item in items) if row]
+            reached_known = False
+            if since:
+                changed = [row for row in rows if row[-1] >= since]
+                reached_known = len(changed) < len(rows)
+                rows = changed
+            # Overlapping full-sync pages repeat rows; write each station once.
+            rows = [row for row in rows if row[0] not in seen]
+            seen.update(row[0] for row in rows)
+            if rows:
+                await asyncio.to_thread(self._upsert, rows, generation)
+                upserted += len(rows)
+                newest = max(newest, max(row[-1] for row in rows))
+            if reached_known or len(items) < self._page_size:
+                break
+            offset += step
+        removed = await asyncio.to_thread(self._finish, full, generation, newest)
+        self.stats["syncs"] += 1
+        self.stats["upserted"] += upserted
+        self.stats["removed"] += removed
+        if full:
+            self.stats["full_syncs"] += 1
+        self._ready = bool(self._meta("last_full_sync")) and self._count() > 0
+        log.info(
+            "Radio station index %s sync: %d stations updated, %d removed",
+            "full" if full else "incremental",
+            upserted,
+            removed,
+        )
+        return {"full": full, "upserted": upserted, "removed": removed}
+
+    def _upsert(self, rows: list[tuple], generation: int) -> None:
+        columns = ", ".join(_COLUMNS)
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in _COLUMNS[1:])
+        sql = (
+            f"INSERT INTO stations ({columns}, generation) VALUES ({placeholders}, ?) "
+            f"ON CONFLICT(stationuuid) DO UPDATE SET {updates}, generation = excluded.generation"
+        )
+        with self._lock:
+            self._writer.execute("BEGIN")
+            try:
+                self._writer.executemany(sql, [(*row, generation) for row in rows])
+                self._writer.execute("COMMIT")
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+
+    def _finish(self, full: bool, generation: int, newest: str) -> int:
+        with self._lock:
+            self._writer.execute("BEGIN")
+            try:
+                removed = 0
+                if full:
+                    # Anything the full download did not touch is gone upstream.
+                    removed = self._writer.execute("DELETE FROM stations WHERE generation < ?", (generation,)).rowcount
+                self._rebuild_facets()
+                now = str(time.time())
+                meta = {"last_sync": now}
+                if newest:
+                    meta["last_change"] = newest
+                if full:
+                    meta["last_full_sync"] = now
+                self._writer.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", list(meta.items()))
+                self._writer.execute("COMMIT")
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+        return removed
+
+    def _rebuild_facets(self) -> None:
+        counts: dict[str, int] = {}
+        for (tags,) in self._writer.execute("SELECT tags FROM stations WHERE tags != ''"):
+            for tag in {part.strip().lower() for part in tags.split(",")}:
+                if tag:
+                    counts[tag] = counts.get(tag, 0) + 1
+        self._writer.execute("DELETE FROM station_tags")
+        self._writer.executemany("INSERT INTO station_tags (name, stationcount) VALUES (?, ?)", counts.items())
+        self._writer.execute("DELETE FROM station_countries")
+        self._writer.execute(
+            "INSERT INTO station_countries (name, iso_3166_1, stationcount) "
+            "SELECT country, NULLIF(MAX(countrycode), ''), COUNT(*) FROM stations WHERE country != '' GROUP BY country"
+        )
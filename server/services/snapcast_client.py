@@ -1,10 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import copy
+import itertools
 import json
-from typing import Optional
+import logging
+import time
+from typing import Any, Optional
 
 import websockets
 
+from services.snapcast_mirror import SnapcastMirror
+
+
+log = logging.getLogger("roomcast")
+
 
 def is_rpc_method_not_found_error(exc: Exception) -> bool:
     if isinstance(exc, RuntimeError):
@@ -21,32 +31,249 @@ def is_rpc_method_not_found_error(exc: Exception) -> bool:
 
 
 class SnapcastClient:
-    def __init__(self, host: str, port: int = 1780) -> None:
+    """JSON-RPC client for snapserver over one long-lived WebSocket.
+
+    Requests are correlated by id, so any number can be in flight at once; the
+    connection is (re)opened on demand and pending calls fail fast when it drops.
+    ``batch`` sends several calls as one JSON-RPC batch.
+
+    ``status`` and ``list_clients`` are served from a :class:`SnapcastMirror` kept
+    current by server notifications while the connection is up. The mirror is reseeded
+    with ``Server.GetStatus`` after a reconnect, after anything it could not apply, and
+    once it is older than ``mirror_max_age`` seconds.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 1780,
+        *,
+        timeout: float = 10.0,
+        mirror_max_age: float = 60.0,
+    ) -> None:
         self.url = f"ws://{host}:{port}/jsonrpc"
+        self._timeout = timeout
+        self._mirror_max_age = mirror_max_age
+        self.mirror = SnapcastMirror()
+        self._refresh: Optional[asyncio.Task] = None
+        self._status_reads = {"reads_served": 0, "reads_refreshed": 0}
         self._supports_client_setstream: Optional[bool] = None
+        self._ws = None
+        self._reader: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._send_lock: Optional[asyncio.Lock] = None
+        self._pending: dict[int, tuple[Any, asyncio.Future, dict]] = {}
+        self._ids = itertools.count(1)
+        self._stats: dict[str, dict] = {}
+        self._connects = 0
 
-    async def _rpc(self, method: str, params: Optional[dict] = None) -> dict:
-        payload = {"id": 1, "jsonrpc": "2.0", "method": method}
+    async def _connection(self):
+        ws = self._ws
+        if ws is not None and not ws.closed:
+            return ws
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+            self._send_lock = asyncio.Lock()
+        async with self._connect_lock:
+            ws = self._ws
+            if ws is not None and not ws.closed:
+                return ws
+            ws = await websockets.connect(self.url, max_size=None)
+            # Notifications sent while we were disconnected are lost.
+            self.mirror.invalidate()
+            self._ws = ws
+            self._connects += 1
+            self._reader = asyncio.create_task(self._read_loop(ws))
+            return ws
+
+    async def _read_loop(self, ws) -> None:
+        error: Exception = ConnectionError("snapserver connection closed")
+        try:
+            async for raw in ws:
+                try:
+                    message = json.loads(raw)
+                except ValueError:
+                    log.debug("Ignoring non-JSON snapserver message")
+                    continue
+                for item in message if isinstance(message, list) else [message]:
+                    if isinstance(item, dict):
+                        self._dispatch(item)
+        except Exception as exc:
+            error = ConnectionError(f"snapserver connection lost: {exc}")
+        finally:
+            if self._ws is ws:
+                self._ws = None
+                self.mirror.invalidate()
+            for request_id, (owner, future, _) in list(self._pending.items()):
+                if owner is not ws:
+                    continue
+                self._pending.pop(request_id, None)
+                if not future.done():
+                    future.set_exception(error)
+
+    def _dispatch(self, message: dict) -> None:
+        request_id = message.get("id")
+        if request_id is None:
+            method = message.get("method")
+            if isinstance(method, str):
+                self.mirror.apply_notification(method, message.get("params"))
+            return
+        entry = self._pending.pop(request_id, None)
+        if entry is None:
+            return
+        _, future, payload = entry
+        if "error" in message:
+            if not future.done():
+                future.set_exception(RuntimeError(message["error"]))
+            return
+        result = message.get("result", {})
+        # Applied here, in arrival order, so later notifications land on top of it.
+        self.mirror.apply_result(payload["method"], payload.get("params"), result)
+        if not future.done():
+            future.set_result(result)
+
+    def _request(self, method: str, params: Optional[dict]) -> dict:
+        payload: dict = {"id": next(self._ids), "jsonrpc": "2.0", "method": method}
         if params:
             payload["params"] = params
+        return payload
+
+    async def _send(self, payloads: list[dict], *, batch: bool) -> list[asyncio.Future]:
+        """Send requests and return one future per payload, resolved by the reader."""
+        encoded = json.dumps(payloads if batch else payloads[0])
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            ws = await self._connection()
+            futures = []
+            for payload in payloads:
+                future = loop.create_future()
+                self._pending[payload["id"]] = (ws, future, payload)
+                futures.append(future)
+            try:
+                async with self._send_lock:
+                    await ws.send(encoded)
+                return futures
+            except websockets.ConnectionClosed:
+                # Nothing was delivered; reconnect once and resend.
+                for payload in payloads:
+                    self._pending.pop(payload["id"], None)
+                if self._ws is ws:
+                    self._ws = None
+                if attempt:
+                    raise
+        raise ConnectionError("snapserver connection closed")
 
-        async with websockets.connect(self.url) as ws:
-            await ws.send(json.dumps(payload))
-            raw = await ws.recv()
-        resp = json.loads(raw)
-        if "error" in resp:
-            raise RuntimeError(resp["error"])
-        return resp.get("result", {})
+    def _forget(self, payloads: list[dict]) -> None:
+        for payload in payloads:
+            if self._pending.pop(payload["id"], None) is not None:
+                # The call may still take effect without us seeing its result.
+                self.mirror.invalidate()
 
-    async def status(self) -> dict:
-        return await self._rpc("Server.GetStatus")
+    def _record(self, method: str, started: float, ok: bool) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        entry = self._stats.setdefault(method, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["calls"] += 1
+        if not ok:
+            entry["errors"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+
+    async def _rpc(self, method: str, params: Optional[dict] = None, *, timeout: Optional[float] = None) -> dict:
+        started = time.perf_counter()
+        payload = self._request(method, params)
+        try:
+            (future,) = await self._send([payload], batch=False)
+            result = await asyncio.wait_for(future, timeout or self._timeout)
+        except BaseException:
+            self._forget([payload])
+            self._record(method, started, False)
+            raise
+        self._record(method, started, True)
+        return result
+
+    async def batch(self, calls: list[tuple[str, Optional[dict]]], *, timeout: Optional[float] = None) -> list[Any]:
+        """Send ``(method, params)`` calls as one JSON-RPC batch.
+
+        Returns one entry per call in order: the result, or the exception for calls
+        that failed.
+        """
+        if not calls:
+            return []
+        started = time.perf_counter()
+        payloads = [self._request(method, params) for method, params in calls]
+        try:
+            futures = await self._send(payloads, batch=True)
+            done = await asyncio.wait_for(
+                asyncio.gather(*futures, return_exceptions=True),
+                timeout or self._timeout,
+            )
+        except BaseException:
+            self._forget(payloads)
+            for method, _ in calls:
+                self._record(method, started, False)
+            raise
+        for (method, _), outcome in zip(calls, done):
+            self._record(method, started, not isinstance(outcome, BaseException))
+        return list(done)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self._ws is not None and not self._ws.closed,
+            "connects": self._connects,
+            "in_flight": len(self._pending),
+            "mirror": {
+                **self.mirror.stats,
+                **self._status_reads,
+                "valid": self.mirror.valid,
+                "age": round(age, 3) if (age := self.mirror.age()) is not None else None,
+                "max_age": self._mirror_max_age,
+            },
+            "methods": {
+                method: {
+                    "calls": entry["calls"],
+                    "errors": entry["errors"],
+                    "avg_ms": round(entry["total_ms"] / entry["calls"], 3) if entry["calls"] else None,
+                    "max_ms": round(entry["max_ms"], 3),
+                }
+                for method, entry in self._stats.items()
+            },
+        }
+
+    async def close(self) -> None:
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            await ws.close()
+        if self._reader is not None:
+            try:
+                await self._reader
+            except Exception:
+                pass
+            self._reader = None
+
+    async def status(self, *, max_age: Optional[float] = None, force: bool = False) -> dict:
+        """Server status from the mirror, refreshed when older than ``max_age`` or when ``force`` is set."""
+        if not force and self._ws is not None and not self._ws.closed:
+            limit = self._mirror_max_age if max_age is None else max_age
+            cached = self.mirror.snapshot(limit)
+            if cached is not None:
+                self._status_reads["reads_served"] += 1
+                return cached
+        self._status_reads["reads_refreshed"] += 1
+        if force:
+            # A refresh already in flight may predate the change the caller is after.
+            return await self._rpc("Server.GetStatus")
+        refresh = self._refresh
+        if refresh is None or refresh.done():
+            refresh = self._refresh = asyncio.create_task(self._rpc("Server.GetStatus"))
+        result = await asyncio.shield(refresh)
+        return copy.deepcopy(result)
 
     async def set_client_volume(self, client_id: str, percent: int) -> dict:
         params = {"id": client_id, "volume": {"percent": percent}}
         return await self._rpc("Client.SetVolume", params)
 
-    async def list_clients(self) -> list:
-        status = await self.status()
+    async def list_clients(self, *, max_age: Optional[float] = None, force: bool = False) -> list:
+        status = await self.status(max_age=max_age, force=force)
         clients = []
         for group in status.get("server", {}).get("groups", []):
             group_id = group.get("id")
@@ -103,3 +330,14 @@ class SnapcastClient:
     async def delete_client(self, client_id: str) -> dict:
         params = {"id": client_id}
         return await self._rpc("Server.DeleteClient", params)
+
+    async def set_client_volumes(self, percents: dict[str, int]) -> dict[str, Any]:
+        """Set several client volumes in one batch; maps client id to result or exception."""
+        ids = list(percents)
+        results = await self.batch([("Client.SetVolume", {"id": cid, "volume": {"percent": percents[cid]}}) for cid in ids])
+        return dict(zip(ids, results))
+
+    async def delete_clients(self, client_ids: list[str]) -> dict[str, Any]:
+        """Delete several clients in one batch; maps client id to result or exception."""
+        results = await self.batch([("Server.DeleteClient", {"id": cid}) for cid in client_ids])
+        return dict(zip(client_ids, results))
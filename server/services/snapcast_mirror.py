@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import copy
+import logging
+import time
+from typing import Any, Callable, Optional
+
+
+log = logging.getLogger("roomcast")
+
+# Calls whose effects, if any, reach us as notifications.
+_NO_TOPOLOGY_CHANGE = frozenset({"Server.Authenticate", "Stream.Control", "Stream.SetProperty"})
+
+
+class SnapcastMirror:
+    """In-memory copy of the snapserver ``Server.GetStatus`` document.
+
+    Seeded from a ``GetStatus`` response and then kept current by applying the server's
+    push notifications and the results of our own calls (snapserver does not notify the
+    connection that made a change). Anything the mirror cannot apply exactly, such as a
+    client joining an unknown group, invalidates it so the next read refreshes.
+    """
+
+    def __init__(self) -> None:
+        self._status: Optional[dict] = None
+        self._seeded_at = 0.0
+        self.stats = {"seeds": 0, "notifications": 0, "applied": 0, "invalidations": 0}
+        self._listeners: list[Callable[[str], None]] = []
+
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """Call ``callback(method)`` after every change to the mirror, including invalidation."""
+        self._listeners.append(callback)
+
+    def _changed(self, method: str) -> None:
+        for callback in list(self._listeners):
+            try:
+                callback(method)
+            except Exception:
+                log.exception("Snapcast mirror listener failed")
+
+    @property
+    def valid(self) -> bool:
+        return self._status is not None
+
+    def age(self) -> Optional[float]:
+        if self._status is None:
+            return None
+        return time.monotonic() - self._seeded_at
+
+    def snapshot(self, max_age: Optional[float] = None) -> Optional[dict]:
+        """A private copy of the mirrored status, or None when missing or older than ``max_age``."""
+        if self._status is None:
+            return None
+        if max_age is not None and time.monotonic() - self._seeded_at > max_age:
+            return None
+        return copy.deepcopy(self._status)
+
+    def seed(self, status: dict) -> None:
+        if not isinstance(status, dict) or not isinstance(status.get("server"), dict):
+            self.invalidate()
+            return
+        self._status = copy.deepcopy(status)
+        self._seeded_at = time.monotonic()
+        self.stats["seeds"] += 1
+        self._changed("Server.GetStatus")
+
+    def invalidate(self) -> None:
+        if self._status is None:
+            return
+        self.stats["invalidations"] += 1
+        self._status = None
+        self._changed("invalidate")
+
+    def apply_notification(self, method: str, params: Any) -> None:
+        self.stats["notifications"] += 1
+        if self._status is None:
+            return
+        if not isinstance(params, dict):
+            self.invalidate()
+            return
+        target = params.get("id")
+        if method in ("Client.OnConnect", "Client.OnDisconnect"):
+            client = params.get("client")
+            self._apply(method, isinstance(client, dict) and self._replace_client(target, client))
+        elif method == "Client.OnVolumeChanged":
+            self._apply(method, self._set_client_config(target, "volume", params.get("volume")))
+        elif method == "Client.OnLatencyChanged":
+            self._apply(method, self._set_client_config(target, "latency", params.get("latency")))
+        elif method == "Client.OnNameChanged":
+            self._apply(method, self._set_client_config(target, "name", params.get("name")))
+        elif method == "Group.OnMute":
+            self._apply(method, self._set_group(target, "muted", params.get("mute")))
+        elif method == "Group.OnStreamChanged":
+            self._apply(method, self._set_group(target, "stream_id", params.get("stream_id")))
+        elif method == "Group.OnNameChanged":
+            self._apply(method, self._set_group(target, "name", params.get("name")))
+        elif method == "Stream.OnUpdate":
+            stream = params.get("stream")
+            self._apply(method, isinstance(stream, dict) and self._replace_stream(target, stream))
+        elif method == "Stream.OnProperties":
+            self._apply(method, self._set_stream(target, "properties", params.get("properties")))
+        elif method == "Server.OnUpdate":
+            self._apply(method, self._replace_server(params.get("server")))
+        else:
+            log.debug("Unhandled snapserver notification %s; refreshing mirror", method)
+            self.invalidate()
+
+    def apply_result(self, method: str, params: Optional[dict], result: Any) -> None:
+        """Fold the outcome of a successful call we made into the mirror."""
+        if method == "Server.GetStatus":
+            self.seed(result)
+            return
+        if self._status is None or ".Get" in method or method in _NO_TOPOLOGY_CHANGE:
+            return
+        target = (params or {}).get("id")
+        result = result if isinstance(result, dict) else {}
+        if method in ("Server.DeleteClient", "Group.SetClients"):
+            self._apply(method, self._replace_server(result.get("server")))
+        elif method == "Client.SetVolume":
+            self._apply(method, self._set_client_config(target, "volume", result.get("volume")))
+        elif method == "Client.SetLatency":
+            self._apply(method, self._set_client_config(target, "latency", result.get("latency")))
+        elif method == "Client.SetName":
+            self._apply(method, self._set_client_config(target, "name", result.get("name")))
+        elif method == "Group.SetMute":
+            self._apply(method, self._set_group(target, "muted", result.get("mute")))
+        elif method == "Group.SetStream":
+            self._apply(method, self._set_group(target, "stream_id", result.get("stream_id")))
+        elif method == "Group.SetName":
+            self._apply(method, self._set_group(target, "name", result.get("name")))
+        else:
+            # e.g. the non-standard Client.SetStream, which may regroup the client.
+            self.invalidate()
+
+    def _apply(self, method: str, ok: Any) -> None:
+        if ok:
+            self.stats["applied"] += 1
+            self._changed(method)
+        else:
+            self.invalidate()
+
+    def _groups(self) -> list:
+        return self._status["server"].setdefault("groups", [])
+
+    def _find_group(self, group_id: Any) -> Optional[dict]:
+        for group in self._groups():
+            if isinstance(group, dict) and group.get("id") == group_id:
+                return group
+        return None
+
+    def _find_client(self, client_id: Any) -> Optional[tuple[dict, int]]:
+        for group in self._groups():
+            if not isinstance(group, dict):
+                continue
+            for index, client in enumerate(group.get("clients") or []):
+                if isinstance(client, dict) and client.get("id") == client_id:
+                    return group, index
+        return None
+
+    def _replace_client(self, client_id: Any, client: dict) -> bool:
+        found = self._find_client(client_id or client.get("id"))
+        if found is None:
+            # New clients land in a group we have not seen; only a refresh tells us which.
+            return False
+        group, index = found
+        group["clients"][index] = copy.deepcopy(client)
+        return True
+
+    def _set_client_config(self, client_id: Any, key: str, value: Any) -> bool:
+        found = self._find_client(client_id)
+        if found is None or value is None:
+            return False
+        group, index = found
+        group["clients"][index].setdefault("config", {})[key] = copy.deepcopy(value)
+        return True
+
+    def _set_group(self, group_id: Any, key: str, value: Any) -> bool:
+        group = self._find_group(group_id)
+        if group is None or value is None:
+            return False
+        group[key] = value
+        return True
+
+    def _find_stream(self, stream_id: Any) -> Optional[int]:
+        for index, stream in enumerate(self._status["server"].get("streams") or []):
+            if isinstance(stream, dict) and stream.get("id") == stream_id:
+                return index
+        return None
+
+    def _replace_stream(self, stream_id: Any, stream: dict) -> bool:
+        streams = self._status["server"].setdefault("streams", [])
+        index = self._find_stream(stream_id or stream.get("id"))
+        if index is None:
+            streams.append(copy.deepcopy(stream))
+        else:
+            streams[index] = copy.deepcopy(stream)
+        return True
+
+    def _set_stream(self, stream_id: Any, key: str, value: Any) -> bool:
+        index = self._find_stream(stream_id)
+        if index is None or value is None:
+            return False
+        self._status["server"]["streams"][index][key] = copy.deepcopy(value)
+        return True
+
+    def _replace_server(self, server: Any) -> bool:
+        if not isinstance(server, dict):
+            return False
+        self._status["server"] = copy.deepcopy(server)
+        return True
@@ -43,6 +43,7 @@ class SonosService:
         scan_http_timeout: float,
         detect_discovery_networks: Callable[[], list[str]],
         hosts_for_networks: Callable[[list[str], int], list[str]],
+        filter_open_hosts: Optional[Callable[[list[str]], Awaitable[list[str]]]] = None,
     ) -> None:
         self._nodes = nodes
         self._get_channels_by_id = get_channels_by_id
@@ -69,6 +70,7 @@ class SonosService:
         self._scan_http_timeout = float(scan_http_timeout)
         self._detect_discovery_networks = detect_discovery_networks
         self._hosts_for_networks = hosts_for_networks
+        self._filter_open_hosts = filter_open_hosts
 
     @staticmethod
     def normalize_stereo_mode(value: object) -> str:
@@ -156,13 +158,22 @@ class SonosService:
             raw = raw[5:]
         return raw if raw.startswith("RINCON_") else None
 
-    async def fetch_description(self, ip: str, *, timeout: Optional[float] = None) -> Optional[dict]:
+    async def fetch_description(
+        self,
+        ip: str,
+        *,
+        timeout: Optional[float] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> Optional[dict]:
         url = f"http://{ip}:1400/xml/device_description.xml"
         headers = {"User-Agent": self._http_user_agent}
         effective_timeout = self._control_timeout if timeout is None else float(timeout)
         try:
-            async with httpx.AsyncClient(timeout=effective_timeout) as client:
-                resp = await client.get(url, headers=headers)
+            if client is None:
+                async with httpx.AsyncClient(timeout=effective_timeout) as own_client:
+                    resp = await own_client.get(url, headers=headers)
+            else:
+                resp = await client.get(url, headers=headers, timeout=effective_timeout)
             if resp.status_code != 200:
                 return None
             root = ElementTree.fromstring(resp.text)
@@ -562,7 +573,7 @@ class SonosService:
         needle = ip.strip().lower()
         if not needle:
             return None
-        for node in self._nodes.values():
+        for node in self._nodes.find(host=needle):
             if node.get("type") != "sonos":
                 continue
             node_ip = self.ip_from_url(node.get("url"))
@@ -943,14 +954,18 @@ class SonosService:
 
     async def http_scan(self, networks: list[str]) -> list[dict]:
         hosts = self._hosts_for_networks(networks, limit=max(1, self._scan_max_hosts))
+        if hosts and self._filter_open_hosts is not None:
+            # TCP pre-scan: only hosts accepting connections on 1400 get an HTTP request.
+            hosts = await self._filter_open_hosts(hosts)
         if not hosts:
             return []
         sem = asyncio.Semaphore(max(4, self._scan_concurrency))
         found: dict[str, dict] = {}
+        client = httpx.AsyncClient(timeout=self._scan_http_timeout)
 
         async def _probe(ip: str) -> None:
             async with sem:
-                desc = await self.fetch_description(ip, timeout=self._scan_http_timeout)
+                desc = await self.fetch_description(ip, timeout=self._scan_http_timeout, client=client)
             if not desc:
                 return
             udn = desc.get("udn")
@@ -962,7 +977,10 @@ class SonosService:
                 desc["zone_name"] = zone_name
             found[ip] = desc
 
-        await asyncio.gather(*(_probe(ip) for ip in hosts))
+        try:
+            await asyncio.gather(*(_probe(ip) for ip in hosts))
+        finally:
+            await client.aclose()
         results: list[dict] = []
         for ip, desc in found.items():
             zone_name = desc.get("zone_name") if isinstance(desc, dict) else None
@@ -1,12 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
 from collections.abc import Awaitable, Callable
 from typing import Any, Optional
 
 import httpx
 from fastapi import HTTPException
 
+from services.spotify_scheduler import SpotifyRequestScheduler, request_priority
+
+try:
+    import h2  # noqa: F401  # enables httpx HTTP/2 support
+except Exception:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+
+log = logging.getLogger("roomcast")
+
+SPOTIFY_API_BASE = "https://api.spotify.com/v1"
+
 
 def parse_spotify_error(detail: Any) -> dict:
     payload: Any = detail
@@ -34,17 +50,19 @@ async def spotify_refresh(
     spotify_auth_broker_url: str,
     save_token: Callable[[dict, Optional[str]], None],
     timeout: float = 10,
+    client: Optional[httpx.AsyncClient] = None,
 ) -> dict:
     if not token or "refresh_token" not in token:
         raise HTTPException(status_code=401, detail="Spotify not authorized")
     if not spotify_auth_broker_url:
         raise HTTPException(status_code=503, detail="Spotify auth broker not configured")
     payload = {"refresh_token": token["refresh_token"]}
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        resp = await client.post(
-            f"{spotify_auth_broker_url.rstrip('/')}/refresh",
-            json=payload,
-        )
+    url = f"{spotify_auth_broker_url.rstrip('/')}/refresh"
+    if client is not None:
+        resp = await client.post(url, json=payload, timeout=timeout)
+    else:
+        async with httpx.AsyncClient(timeout=timeout) as one_off:
+            resp = await one_off.post(url, json=payload)
     if resp.status_code >= 400:
         raise HTTPException(status_code=401, detail="Failed to refresh Spotify token")
     data = resp.json()
@@ -64,21 +82,245 @@ async def spotify_request(
     *,
     spotify_refresh_func: Callable[[dict, Optional[str]], Awaitable[dict]],
     timeout: float = 10,
+    client: Optional[httpx.AsyncClient] = None,
     **kwargs,
 ) -> httpx.Response:
     headers = kwargs.pop("headers", {})
     headers["Authorization"] = f"Bearer {token['access_token']}"
-    url = f"https://api.spotify.com/v1{path}"
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        resp = await client.request(method, url, headers=headers, **kwargs)
+    url = f"{SPOTIFY_API_BASE}{path}"
+
+    async def _send() -> httpx.Response:
+        if client is not None:
+            return await client.request(method, url, headers=headers, timeout=timeout, **kwargs)
+        async with httpx.AsyncClient(timeout=timeout) as one_off:
+            return await one_off.request(method, url, headers=headers, **kwargs)
+
+    resp = await _send()
     if resp.status_code == 401:
         token = await spotify_refresh_func(token, identifier)
         headers["Authorization"] = f"Bearer {token['access_token']}"
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            resp = await client.request(method, url, headers=headers, **kwargs)
+        resp = await _send()
     return resp
 
 
+class SpotifyApiClient:
+    """Process-wide Spotify Web API access.
+
+    Requests share one pooled ``httpx.AsyncClient`` (HTTP/2 when ``h2`` is installed)
+    instead of opening a connection per call. Token refreshes are single-flight per
+    Spotify source: concurrent 401s wait on the refresh already in flight, and a request
+    that still carries the token just replaced picks up the new one without refreshing
+    again. Each source's next refresh is scheduled from its token expiry.
+
+    Every Web API call passes through its source's :class:`SpotifyRequestScheduler`
+    (rate limit, Retry-After backoff, priorities, merging of identical GETs). The
+    priority defaults from the method and path; callers may pass ``priority=``.
+    """
+
+    def __init__(
+        self,
+        *,
+        auth_broker_url: str,
+        save_token: Callable[[dict, Optional[str]], None],
+        load_token: Callable[[Optional[str]], Optional[dict]],
+        resolve_source_id: Callable[[Optional[str]], Optional[str]],
+        seconds_until_expiry: Callable[[Optional[dict]], Optional[float]],
+        refresh_leeway: float = 180.0,
+        min_refresh_delay: float = 30.0,
+        failure_backoff: float = 120.0,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        http2: bool = True,
+        rate_limit: float = 10.0,
+        rate_burst: int = 20,
+        max_concurrency_per_source: int = 8,
+        max_retry_after: float = 10.0,
+    ) -> None:
+        self._auth_broker_url = auth_broker_url
+        self._save_token = save_token
+        self._load_token = load_token
+        self._resolve_source_id = resolve_source_id
+        self._seconds_until_expiry = seconds_until_expiry
+        self._refresh_leeway = max(0.0, float(refresh_leeway))
+        self._min_refresh_delay = max(0.0, float(min_refresh_delay))
+        self._failure_backoff = max(5.0, float(failure_backoff))
+        self._timeout = timeout
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._http2 = bool(http2 and HTTP2_AVAILABLE)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self._replaced: dict[str, tuple[str, dict]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._scheduler_options = {
+            "rate": rate_limit,
+            "burst": rate_burst,
+            "max_concurrency": max_concurrency_per_source,
+            "max_retry_after": max_retry_after,
+        }
+        self._schedulers: dict[str, SpotifyRequestScheduler] = {}
+        self.stats = {"requests": 0, "refreshes": 0, "refresh_waits": 0, "refresh_reused": 0}
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """The shared client; also usable for other Spotify endpoints."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self._timeout, limits=self._limits, http2=self._http2)
+        return self._client
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        token: dict,
+        identifier: Optional[str] = None,
+        *,
+        priority: Optional[int] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        self.stats["requests"] += 1
+        source_id = self._resolve_source_id(identifier) or identifier or ""
+        timeout = kwargs.pop("timeout", self._timeout)
+
+        async def _send() -> httpx.Response:
+            return await spotify_request(
+                method,
+                path,
+                token,
+                identifier,
+                spotify_refresh_func=self.refresh,
+                timeout=timeout,
+                client=self.http,
+                **kwargs,
+            )
+
+        merge_key = None
+        if method.upper() == "GET" and not kwargs:
+            merge_key = (path, token.get("access_token"))
+        return await self.scheduler(source_id).submit(
+            _send,
+            priority=request_priority(method, path) if priority is None else priority,
+            merge_key=merge_key,
+        )
+
+    def scheduler(self, source_id: str) -> SpotifyRequestScheduler:
+        scheduler = self._schedulers.get(source_id)
+        if scheduler is None:
+            scheduler = self._schedulers[source_id] = SpotifyRequestScheduler(**self._scheduler_options)
+        return scheduler
+
+    def diagnostics(self) -> dict:
+        return {
+            **self.stats,
+            "http2": self._http2,
+            "sources": {source_id: scheduler.diagnostics() for source_id, scheduler in self._schedulers.items()},
+        }
+
+    async def refresh(self, token: dict, identifier: Optional[str] = None) -> dict:
+        """Refresh ``token`` in place, sharing one broker call per source."""
+        source_id = self._resolve_source_id(identifier) or identifier or ""
+        stale = token.get("access_token") if token else None
+        replaced = self._replaced.get(source_id)
+        if stale and replaced and replaced[0] == stale:
+            # Another caller already swapped this token out.
+            self.stats["refresh_reused"] += 1
+            token.update(replaced[1])
+            return token
+        task = self._refreshing.get(source_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self._refresh(dict(token or {}), source_id))
+            self._refreshing[source_id] = task
+        else:
+            self.stats["refresh_waits"] += 1
+        fresh = await asyncio.shield(task)
+        if token is not None:
+            token.update(fresh)
+            return token
+        return dict(fresh)
+
+    async def _refresh(self, token: dict, source_id: str) -> dict:
+        stale = token.get("access_token")
+        self.stats["refreshes"] += 1
+        try:
+            fresh = await spotify_refresh(
+                token,
+                source_id or None,
+                spotify_auth_broker_url=self._auth_broker_url,
+                save_token=self._save_token,
+                timeout=self._timeout,
+                client=self.http,
+            )
+        finally:
+            self._refreshing.pop(source_id, None)
+        if stale:
+            self._replaced[source_id] = (stale, dict(fresh))
+        self.schedule_refresh(source_id, fresh)
+        return fresh
+
+    def schedule_refresh(self, source_id: str, token: Optional[dict] = None) -> None:
+        """Arm the proactive refresh for ``source_id`` from its token's expiry."""
+        timer = self._timers.pop(source_id, None)
+        if timer is not None:
+            timer.cancel()
+        if token is None:
+            token = self._load_token(source_id)
+        if not token or "refresh_token" not in token:
+            return
+        seconds_left = self._seconds_until_expiry(token)
+        delay = 0.0 if seconds_left is None else seconds_left - self._refresh_leeway
+        # A token that is already inside the leeway (or one whose refresh returned a short
+        # expiry) must not re-arm a zero-delay timer; request-time refresh covers the gap.
+        delay = max(delay, self._min_refresh_delay)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._timers[source_id] = loop.call_later(delay, self._proactive_refresh, source_id)
+
+    def cancel_refresh(self, source_id: str) -> None:
+        """Forget ``source_id``'s token state, e.g. after its token was deleted."""
+        timer = self._timers.pop(source_id, None)
+        if timer is not None:
+            timer.cancel()
+        self._replaced.pop(source_id, None)
+
+    def _proactive_refresh(self, source_id: str) -> None:
+        self._timers.pop(source_id, None)
+        asyncio.create_task(self._run_proactive_refresh(source_id))
+
+    async def _run_proactive_refresh(self, source_id: str) -> None:
+        token = self._load_token(source_id)
+        if not token or "refresh_token" not in token:
+            return
+        try:
+            await self.refresh(token, source_id)
+        except HTTPException as exc:
+            log.warning("Background Spotify refresh failed for %s: %s", source_id, exc.detail)
+            self._retry_later(source_id)
+        except Exception:  # pragma: no cover - network paths
+            log.exception("Background Spotify refresh failed for %s", source_id)
+            self._retry_later(source_id)
+
+    def _retry_later(self, source_id: str) -> None:
+        if source_id in self._timers:
+            return
+        loop = asyncio.get_running_loop()
+        self._timers[source_id] = loop.call_later(self._failure_backoff, self._proactive_refresh, source_id)
+
+    async def close(self) -> None:
+        for source_id in list(self._timers):
+            self.cancel_refresh(source_id)
+        for scheduler in self._schedulers.values():
+            scheduler.close()
+        tasks = list(self._refreshing.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
 async def spotify_control(
     path: str,
     method: str = "PUT",
@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+
+log = logging.getLogger("roomcast")
+
+# Seconds a catalog response is served without revalidation, per endpoint kind.
+DEFAULT_TTLS = {
+    "playlists": 60.0,
+    "playlist": 300.0,
+    "tracks": 300.0,
+    "search": 600.0,
+    "recent": 30.0,
+}
+
+Fetch = Callable[[], Awaitable[httpx.Response]]
+
+
+@dataclass
+class _Entry:
+    kind: str
+    body: bytes
+    fetched_at: float
+    playlist_id: Optional[str] = None
+    snapshot_id: Optional[str] = None
+
+
+class SpotifyCatalogCache:
+    """Per-source LRU of successful Spotify catalog GET responses, bounded by body bytes.
+
+    A response younger than its kind's TTL is served as is. An older one is still served,
+    up to ``max_stale`` seconds past its TTL, while a background task revalidates it.
+    Playlist responses are revalidated by comparing the playlist's ``snapshot_id`` first,
+    so an unchanged playlist costs one tiny request instead of every page again. Snapshot
+    ids seen in the playlist listing drop outdated pages right away. Error responses are
+    never cached, and concurrent misses for the same path share one request.
+
+    Values derived from a whole playlist, such as its summed duration, are kept per
+    playlist keyed by ``snapshot_id`` so they are computed once per playlist version.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = 16 * 1024 * 1024,
+        ttls: Optional[dict[str, float]] = None,
+        max_stale: float = 3600.0,
+    ) -> None:
+        self._max_bytes = max(0, int(max_bytes))
+        self._ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._max_stale = max(0.0, float(max_stale))
+        self._entries: dict[str, OrderedDict[str, _Entry]] = {}
+        self._sizes: dict[str, int] = {}
+        self._snapshots: dict[str, dict[str, str]] = {}
+        self._summaries: dict[str, dict[str, tuple[str, dict]]] = {}
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+        self._probes: dict[tuple[str, str], asyncio.Task] = {}
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "snapshot_unchanged": 0,
+            "summary_hits": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    async def get(
+        self,
+        source_id: str,
+        kind: str,
+        path: str,
+        fetch: Fetch,
+        *,
+        playlist_id: Optional[str] = None,
+        probe: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+    ) -> httpx.Response:
+        """Response for ``path``, from the cache when possible.
+
+        ``fetch`` performs the real GET. ``probe`` returns the playlist's current
+        ``snapshot_id`` and is used to revalidate entries tagged with ``playlist_id``.
+        """
+        entry = self._entries.get(source_id, {}).get(path)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            ttl = self._ttls.get(kind, 0.0)
+            if age < ttl:
+                self.stats["hits"] += 1
+                self._entries[source_id].move_to_end(path)
+                return self._response(entry)
+            if age < ttl + self._max_stale:
+                self.stats["stale_hits"] += 1
+                self._entries[source_id].move_to_end(path)
+                self._start(source_id, kind, path, fetch, playlist_id, probe, entry)
+                return self._response(entry)
+        self.stats["misses"] += 1
+        task = self._start(source_id, kind, path, fetch, playlist_id, None, None)
+        return await asyncio.shield(task)
+
+    def playlist_summary(self, source_id: str, playlist_id: str, snapshot_id: Optional[str]) -> Optional[dict]:
+        cached = self._summaries.get(source_id, {}).get(playlist_id)
+        if not snapshot_id or cached is None or cached[0] != snapshot_id:
+            return None
+        self.stats["summary_hits"] += 1
+        return dict(cached[1])
+
+    def store_playlist_summary(self, source_id: str, playlist_id: str, snapshot_id: Optional[str], summary: dict) -> None:
+        if snapshot_id:
+            self._summaries.setdefault(source_id, {})[playlist_id] = (snapshot_id, dict(summary))
+
+    def invalidate(
+        self,
+        source_id: Optional[str] = None,
+        *,
+        playlist_id: Optional[str] = None,
+        snapshot_id: Optional[str] = None,
+    ) -> None:
+        """Drop cached responses.
+
+        With no arguments everything goes; with ``source_id`` alone that source's cache.
+        With ``playlist_id`` the playlist's own pages and every playlist listing go (its
+        track count changed), and ``snapshot_id`` records the playlist's new version.
+        """
+        self.stats["invalidations"] += 1
+        if source_id is None:
+            self._entries.clear()
+            self._sizes.clear()
+            self._snapshots.clear()
+            self._summaries.clear()
+            return
+        if playlist_id is None:
+            self._entries.pop(source_id, None)
+            self._sizes.pop(source_id, None)
+            self._snapshots.pop(source_id, None)
+            self._summaries.pop(source_id, None)
+            return
+        snapshots = self._snapshots.setdefault(source_id, {})
+        if snapshot_id:
+            snapshots[playlist_id] = snapshot_id
+        else:
+            snapshots.pop(playlist_id, None)
+        self._summaries.get(source_id, {}).pop(playlist_id, None)
+        self._drop(source_id, lambda entry: entry.playlist_id == playlist_id or entry.kind == "playlists")
+
+    def usage(self) -> dict:
+        return {
+            "sources": len(self._entries),
+            "entries": sum(len(entries) for entries in self._entries.values()),
+            "summaries": sum(len(summaries) for summaries in self._summaries.values()),
+            "bytes": sum(self._sizes.values()),
+            "max_bytes": self._max_bytes,
+            **self.stats,
+        }
+
+    def _response(self, entry: _Entry) -> httpx.Response:
+        return httpx.Response(200, content=entry.body, headers={"content-type": "application/json"})
+
+    def _start(
+        self,
+        source_id: str,
+        kind: str,
+        path: str,
+        fetch: Fetch,
+        playlist_id: Optional[str],
+        probe: Optional[Callable[[], Awaitable[Optional[str]]]],
+        stale: Optional[_Entry],
+    ) -> asyncio.Task:
+        key = (source_id, path)
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            if stale is not None:
+                self.stats["revalidations"] += 1
+                coro = self._revalidate(source_id, kind, path, fetch, playlist_id, probe, stale)
+            else:
+                coro = self._load(source_id, kind, path, fetch, playlist_id)
+            task = self._inflight[key] = asyncio.create_task(coro)
+            task.add_done_callback(lambda done, key=key: self._finished(key, done))
+        return task
+
+    def _finished(self, key: tuple[str, str], task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so background revalidation failures are not reported as unhandled.
+            log.debug("Spotify catalog fetch for %s failed: %s", key[1], task.exception())
+
+    async def _load(
+        self,
+        source_id: str,
+        kind: str,
+        path: str,
+        fetch: Fetch,
+        playlist_id: Optional[str],
+    ) -> httpx.Response:
+        # The version known before the request; a later change must not be masked by it.
+        snapshot_id = self._snapshots.get(source_id, {}).get(playlist_id) if playlist_id else None
+        resp = await fetch()
+        if resp.status_code == 200:
+            self._store(source_id, kind, path, resp.content, playlist_id, snapshot_id)
+        elif resp.status_code == 404:
+            self._remove(source_id, path)
+        return resp
+
+    async def _revalidate(
+        self,
+        source_id: str,
+        kind: str,
+        path: str,
+        fetch: Fetch,
+        playlist_id: Optional[str],
+        probe: Optional[Callable[[], Awaitable[Optional[str]]]],
+        stale: _Entry,
+    ) -> httpx.Response:
+        if playlist_id and probe is not None and stale.snapshot_id:
+            current = await self._probe(source_id, playlist_id, probe)
+            if current == stale.snapshot_id and self._entries.get(source_id, {}).get(path) is stale:
+                self.stats["snapshot_unchanged"] += 1
+                stale.fetched_at = time.monotonic()
+                return self._response(stale)
+        return await self._load(source_id, kind, path, fetch, playlist_id)
+
+    async def _probe(
+        self,
+        source_id: str,
+        playlist_id: str,
+        probe: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        # Every stale page of one playlist shares a single snapshot check.
+        key = (source_id, playlist_id)
+        task = self._probes.get(key)
+        if task is None or task.done():
+            task = self._probes[key] = asyncio.create_task(probe())
+        try:
+            snapshot_id = await asyncio.shield(task)
+        finally:
+            if self._probes.get(key) is task and task.done():
+                self._probes.pop(key, None)
+        if snapshot_id:
+            self._note_snapshot(source_id, playlist_id, snapshot_id)
+        return snapshot_id
+
+    def _note_snapshot(self, source_id: str, playlist_id: str, snapshot_id: str) -> None:
+        snapshots = self._snapshots.setdefault(source_id, {})
+        if snapshots.get(playlist_id) == snapshot_id:
+            return
+        snapshots[playlist_id] = snapshot_id
+        self._drop(source_id, lambda entry: entry.playlist_id == playlist_id and entry.snapshot_id != snapshot_id)
+
+    def _learn_snapshots(self, source_id: str, kind: str, playlist_id: Optional[str], body: bytes) -> Optional[str]:
+        if kind not in ("playlists", "playlist"):
+            return None
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        if kind == "playlist":
+            snapshot_id = data.get("snapshot_id")
+            if playlist_id and isinstance(snapshot_id, str) and snapshot_id:
+                self._note_snapshot(source_id, playlist_id, snapshot_id)
+                return snapshot_id
+            return None
+        for item in data.get("items") or []:
+            if isinstance(item, dict) and isinstance(item.get("id"), str) and item.get("snapshot_id"):
+                self._note_snapshot(source_id, item["id"], str(item["snapshot_id"]))
+        return None
+
+    def _store(
+        self,
+        source_id: str,
+        kind: str,
+        path: str,
+        body: bytes,
+        playlist_id: Optional[str],
+        snapshot_id: Optional[str],
+    ) -> None:
+        snapshot_id = self._learn_snapshots(source_id, kind, playlist_id, body) or snapshot_id
+        self._remove(source_id, path)
+        if len(body) > self._max_bytes // 4:
+            return
+        entries = self._entries.setdefault(source_id, OrderedDict())
+        entries[path] = _Entry(kind, body, time.monotonic(), playlist_id, snapshot_id)
+        self._sizes[source_id] = self._sizes.get(source_id, 0) + len(body)
+        while self._sizes[source_id] > self._max_bytes and entries:
+            _, evicted = entries.popitem(last=False)
+            self._sizes[source_id] -= len(evicted.body)
+            self.stats["evictions"] += 1
+
+    def _remove(self, source_id: str, path: str) -> None:
+        entry = self._entries.get(source_id, {}).pop(path, None)
+        if entry is not None:
+            self._sizes[source_id] -= len(entry.body)
+
+    def _drop(self, source_id: str, predicate: Callable[[_Entry], bool]) -> None:
+        entries = self._entries.get(source_id)
+        if not entries:
+            return
+        for path in [path for path, entry in entries.items() if predicate(entry)]:
+            self._remove(source_id, path)
@@ -8,6 +8,8 @@ from typing import Callable, Optional
 
 from fastapi import HTTPException
 
+from services.file_cache import JsonFileCache
+
 
 class SpotifyConfigService:
     def __init__(
@@ -20,6 +22,7 @@ class SpotifyConfigService:
         spotify_client_id_default: Optional[str],
         spotify_client_secret_default: Optional[str],
         spotify_redirect_uri_default: Optional[str],
+        file_cache: Optional[JsonFileCache] = None,
     ) -> None:
         self._resolve_spotify_source_id = resolve_spotify_source_id
         self._normalize_spotify_source_id = normalize_spotify_source_id
@@ -28,6 +31,7 @@ class SpotifyConfigService:
         self._spotify_client_id_default = spotify_client_id_default
         self._spotify_client_secret_default = spotify_client_secret_default
         self._spotify_redirect_uri_default = spotify_redirect_uri_default
+        self._files = file_cache or JsonFileCache()
 
     @staticmethod
     def _normalize_volume_value(value: object, fallback: int = 75) -> int:
@@ -44,20 +48,29 @@ class SpotifyConfigService:
         stem = config_path.stem if config_path.suffix else config_path.name
         return config_path.with_name(f"{stem}-state{suffix}")
 
-    def _read_state(self, spotify_source_id: str) -> dict:
-        path = self._state_path(spotify_source_id)
-        if not path.exists():
-            return {}
+    def _read_json_dict(self, path: Path) -> dict:
         try:
-            data = json.loads(path.read_text())
-        except json.JSONDecodeError:
+            data = self._files.read(path)
+        except (FileNotFoundError, json.JSONDecodeError):
             return {}
         return data if isinstance(data, dict) else {}
 
+    def _read_state(self, spotify_source_id: str) -> dict:
+        return self._read_json_dict(self._state_path(spotify_source_id))
+
     def _write_state(self, spotify_source_id: str, state: dict) -> None:
-        path = self._state_path(spotify_source_id)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(json.dumps(state, indent=2))
+        self._files.write(self._state_path(spotify_source_id), state)
+
+    def write_config_file(self, spotify_source_id: str, payload: dict) -> None:
+        source = self._get_spotify_source(spotify_source_id)
+        self._files.write(Path(source["config_path"]), payload)
+
+    def update_config_file(self, spotify_source_id: str, updates: dict) -> None:
+        source = self._get_spotify_source(spotify_source_id)
+        cfg_path = Path(source["config_path"])
+        payload = self._read_json_dict(cfg_path)
+        payload.update(updates)
+        self._files.write(cfg_path, payload)
 
     def roomcast_last_volume(self, identifier: Optional[str] = None) -> int:
         spotify_source_id = self._resolve_spotify_source_id(identifier)
@@ -67,14 +80,8 @@ class SpotifyConfigService:
         if "roomcast_last_volume" in state:
             return self._normalize_volume_value(state.get("roomcast_last_volume"), 75)
         source = self._get_spotify_source(spotify_source_id)
-        cfg_path = Path(source["config_path"])
-        if not cfg_path.exists():
-            return 75
-        try:
-            data = json.loads(cfg_path.read_text())
-        except json.JSONDecodeError:
-            return 75
-        if not isinstance(data, dict):
+        data = self._read_json_dict(Path(source["config_path"]))
+        if not data:
             return 75
         return self._normalize_volume_value(data.get("initial_volume"), 75)
 
@@ -121,11 +128,8 @@ class SpotifyConfigService:
         cfg_path = Path(source["config_path"])
         token = self.load_token(spotify_source_id)
         has_token = bool(token and token.get("access_token"))
-        config_exists = cfg_path.exists()
-        try:
-            data = json.loads(cfg_path.read_text()) if config_exists else {}
-        except json.JSONDecodeError:
-            data = {}
+        config_exists = self._files.exists(cfg_path)
+        data = self._read_json_dict(cfg_path) if config_exists else {}
 
         stored_client_id = (
             data.get("client_id")
@@ -173,10 +177,10 @@ class SpotifyConfigService:
             return {"state": "unknown", "message": "Not a Spotify channel"}
         source = self._get_spotify_source(spotify_source_id)
         status_path = Path(source["status_path"])
-        if not status_path.exists():
-            return {"state": "unknown", "message": "No status yet"}
         try:
-            return json.loads(status_path.read_text())
+            return self._files.read(status_path)
+        except FileNotFoundError:
+            return {"state": "unknown", "message": "No status yet"}
         except json.JSONDecodeError:
             return {"state": "unknown", "message": "Invalid status file"}
 
@@ -186,11 +190,9 @@ class SpotifyConfigService:
             return None
         source = self._get_spotify_source(spotify_source_id)
         token_path = Path(source["token_path"])
-        if not token_path.exists():
-            return None
         try:
-            return json.loads(token_path.read_text())
-        except json.JSONDecodeError:
+            return self._files.read(token_path)
+        except (FileNotFoundError, json.JSONDecodeError):
             return None
 
     def save_token(self, data: dict, identifier: Optional[str] = None) -> None:
@@ -210,17 +212,14 @@ class SpotifyConfigService:
                 expires_at = None
         if expires_at is not None:
             data["expires_at"] = expires_at
-        token_path.parent.mkdir(parents=True, exist_ok=True)
-        token_path.write_text(json.dumps(data, indent=2))
+        self._files.write(token_path, data)
 
     def delete_token(self, identifier: Optional[str] = None) -> None:
         spotify_source_id = self._resolve_spotify_source_id(identifier)
         if spotify_source_id is None:
             raise HTTPException(status_code=400, detail="Spotify source not configured")
         source = self._get_spotify_source(spotify_source_id)
-        token_path = Path(source["token_path"])
-        if token_path.exists():
-            token_path.unlink()
+        self._files.delete(Path(source["token_path"]))
 
     @staticmethod
     def token_seconds_until_expiry(token: Optional[dict]) -> Optional[float]:
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+from fastapi import HTTPException, WebSocket
+
+
+log = logging.getLogger("roomcast")
+
+# Progress may drift this far from interpolation before a status counts as changed (seeks).
+_PROGRESS_DRIFT_MS = 2500
+
+
+def build_player_status(data: Optional[dict], preferred_names: list[str]) -> dict:
+    """Map a Spotify ``/me/player`` response (None for 204) to the RoomCast player payload."""
+    if data is None:
+        return {"active": False}
+    device = data.get("device") or {}
+    device_name = (device.get("name") or "").strip().lower()
+    return {
+        "active": bool(data.get("device")),
+        "is_playing": data.get("is_playing", False),
+        "progress_ms": data.get("progress_ms"),
+        "device": device,
+        "device_is_roomcast": bool(device_name) and device_name in [name.lower() for name in preferred_names],
+        "item": data.get("item", {}),
+        "shuffle_state": data.get("shuffle_state", False),
+        "repeat_state": data.get("repeat_state", "off"),
+        "context": data.get("context"),
+    }
+
+
+@dataclass
+class _ChannelState:
+    channel_id: str
+    watchers: set = field(default_factory=set)
+    status: Optional[dict] = None
+    error: Optional[dict] = None
+    fetched_at: float = 0.0
+    fetching: Optional[asyncio.Task] = None
+    task: Optional[asyncio.Task] = None
+    wake: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class SpotifyPlayerPoller:
+    """One Spotify player-state poller per watched channel, fanned out to WebSocket watchers.
+
+    The poll interval adapts to what is playing: it shortens to land just after the
+    current track ends, relaxes while paused or inactive, and backs off on errors. The
+    poller for a channel stops when its last watcher leaves. Watchers are only sent a
+    status when it changed beyond normal progress, and interpolate progress locally.
+    ``status`` serves REST callers from the same state, fetching at most once per
+    ``cache_ttl`` for channels nobody watches.
+    """
+
+    def __init__(
+        self,
+        *,
+        ensure_spotify_token: Callable[[Optional[str]], dict],
+        spotify_request: Callable[..., Awaitable[Any]],
+        preferred_roomcast_device_names: Callable[[Optional[str]], list[str]],
+        get_player_snapshot: Callable[[Optional[str]], Optional[dict]],
+        public_player_snapshot: Callable[[Optional[dict]], Optional[dict]],
+        set_player_snapshot: Callable[[str, dict], None],
+        send: Callable[[WebSocket, dict], None],
+        playing_interval: float = 5.0,
+        paused_interval: float = 15.0,
+        error_interval: float = 30.0,
+        boundary_lead: float = 0.75,
+        min_interval: float = 1.0,
+        cache_ttl: float = 2.0,
+    ) -> None:
+        self._ensure_spotify_token = ensure_spotify_token
+        self._spotify_request = spotify_request
+        self._preferred_roomcast_device_names = preferred_roomcast_device_names
+        self._get_player_snapshot = get_player_snapshot
+        self._public_player_snapshot = public_player_snapshot
+        self._set_player_snapshot = set_player_snapshot
+        self._send = send
+        self._playing_interval = max(1.0, float(playing_interval))
+        self._paused_interval = max(self._playing_interval, float(paused_interval))
+        self._error_interval = max(1.0, float(error_interval))
+        self._boundary_lead = max(0.0, float(boundary_lead))
+        self._min_interval = max(0.2, float(min_interval))
+        self._cache_ttl = max(0.0, float(cache_ttl))
+        self._channels: dict[str, _ChannelState] = {}
+        self._watching: dict[WebSocket, str] = {}
+        self.stats = {"fetches": 0, "pushes": 0, "served_cached": 0}
+
+    async def status(self, channel_id: str) -> dict:
+        """Current player status for REST callers; raises HTTPException like the Spotify call."""
+        state = self._channel(channel_id)
+        max_age = self._playing_interval if state.watchers else self._cache_ttl
+        if state.fetched_at and time.monotonic() - state.fetched_at <= max_age:
+            self.stats["served_cached"] += 1
+        else:
+            await self._refresh(state)
+        if state.error is not None:
+            raise HTTPException(status_code=state.error["status"], detail=state.error["detail"])
+        return self._current(state)
+
+    def watch(self, ws: WebSocket, channel_id: Optional[str]) -> None:
+        """Point ``ws`` at ``channel_id`` (None to stop watching) and send it the latest state."""
+        self.unwatch(ws)
+        if not channel_id:
+            return
+        state = self._channel(channel_id)
+        state.watchers.add(ws)
+        self._watching[ws] = channel_id
+        if state.fetched_at:
+            self._send(ws, self._message(state))
+        if state.task is None or state.task.done():
+            state.task = asyncio.create_task(self._poll(state))
+        else:
+            state.wake.set()
+
+    def unwatch(self, ws: WebSocket) -> None:
+        channel_id = self._watching.pop(ws, None)
+        state = self._channels.get(channel_id) if channel_id else None
+        if state is None:
+            return
+        state.watchers.discard(ws)
+        if not state.watchers:
+            state.wake.set()
+
+    def changed(self, channel_id: str) -> None:
+        """Playback was just controlled: drop the cached state and poll again shortly."""
+        state = self._channels.get(channel_id)
+        if state is None:
+            return
+        state.fetched_at = 0.0
+        state.wake.set()
+
+    def watchers(self) -> dict[str, int]:
+        return {cid: len(state.watchers) for cid, state in self._channels.items() if state.watchers}
+
+    async def close(self) -> None:
+        tasks = [state.task for state in self._channels.values() if state.task]
+        self._watching.clear()
+        for state in self._channels.values():
+            state.watchers.clear()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _channel(self, channel_id: str) -> _ChannelState:
+        state = self._channels.get(channel_id)
+        if state is None:
+            state = self._channels[channel_id] = _ChannelState(channel_id)
+        return state
+
+    async def _refresh(self, state: _ChannelState) -> None:
+        # Concurrent refreshes of one channel share a single Spotify call.
+        task = state.fetching
+        if task is None or task.done():
+            task = state.fetching = asyncio.create_task(self._fetch(state))
+        await asyncio.shield(task)
+
+    async def _fetch(self, state: _ChannelState) -> None:
+        channel_id = state.channel_id
+        self.stats["fetches"] += 1
+        try:
+            token = self._ensure_spotify_token(channel_id)
+            resp = await self._spotify_request("GET", "/me/player", token, channel_id)
+        except HTTPException as exc:
+            self._set_error(state, exc.status_code, exc.detail)
+            return
+        except httpx.RequestError as exc:
+            self._set_error(state, 503, f"Spotify API request failed: {exc}")
+            return
+        if resp.status_code >= 400:
+            self._set_error(state, resp.status_code, resp.text)
+            return
+        data = None if resp.status_code == 204 else resp.json()
+        status = build_player_status(data, self._preferred_roomcast_device_names(channel_id))
+        if data and status["device_is_roomcast"] and data.get("item"):
+            self._set_player_snapshot(channel_id, data)
+        if not status["active"]:
+            snapshot = self._public_player_snapshot(self._get_player_snapshot(channel_id))
+            if snapshot:
+                status["snapshot"] = snapshot
+        previous = self._current(state) if state.status is not None and state.error is None else None
+        state.status = status
+        state.error = None
+        state.fetched_at = time.monotonic()
+        if previous is None or self._differs(previous, status):
+            self._push(state)
+
+    def _set_error(self, state: _ChannelState, status_code: int, detail: Any) -> None:
+        changed = state.error != {"status": status_code, "detail": detail}
+        state.error = {"status": status_code, "detail": detail}
+        state.fetched_at = time.monotonic()
+        if changed:
+            self._push(state)
+
+    @staticmethod
+    def _differs(previous: dict, status: dict) -> bool:
+        progress_prev = previous.get("progress_ms")
+        progress_now = status.get("progress_ms")
+        if {k: v for k, v in previous.items() if k != "progress_ms"} != {
+            k: v for k, v in status.items() if k != "progress_ms"
+        }:
+            return True
+        if progress_prev is None or progress_now is None:
+            return progress_prev != progress_now
+        return abs(int(progress_now) - int(progress_prev)) > _PROGRESS_DRIFT_MS
+
+    def _current(self, state: _ChannelState) -> dict:
+        """The cached status with progress advanced to now."""
+        status = dict(state.status or {"active": False})
+        progress = status.get("progress_ms")
+        if status.get("is_playing") and isinstance(progress, (int, float)):
+            elapsed_ms = int((time.monotonic() - state.fetched_at) * 1000)
+            duration = (status.get("item") or {}).get("duration_ms") or 0
+            progress = int(progress) + elapsed_ms
+            status["progress_ms"] = min(progress, duration) if duration else progress
+        return status
+
+    def _message(self, state: _ChannelState) -> dict:
+        if state.error is not None:
+            return {"type": "player_error", "channel_id": state.channel_id, **state.error}
+        return {"type": "player_status", "channel_id": state.channel_id, "status": self._current(state)}
+
+    def _push(self, state: _ChannelState) -> None:
+        if not state.watchers:
+            return
+        message = self._message(state)
+        self.stats["pushes"] += 1
+        for ws in list(state.watchers):
+            self._send(ws, message)
+
+    def _next_delay(self, state: _ChannelState) -> float:
+        if state.error is not None:
+            return self._error_interval
+        status = state.status or {}
+        if not status.get("active") or not status.get("is_playing"):
+            return self._paused_interval
+        delay = self._playing_interval
+        progress = status.get("progress_ms")
+        duration = (status.get("item") or {}).get("duration_ms")
+        if isinstance(progress, (int, float)) and duration:
+            # Land just after the track boundary so the next track shows up promptly.
+            delay = min(delay, (duration - progress) / 1000 + self._boundary_lead)
+        return max(self._min_interval, delay)
+
+    async def _poll(self, state: _ChannelState) -> None:
+        try:
+            while state.watchers:
+                state.wake.clear()
+                if not state.fetched_at or time.monotonic() - state.fetched_at >= self._min_interval:
+                    await self._refresh(state)
+                delay = self._next_delay(state)
+                try:
+                    await asyncio.wait_for(state.wake.wait(), timeout=delay)
+                    if state.watchers:
+                        # Control commands take a moment to show up in /me/player.
+                        await asyncio.sleep(self._min_interval / 2)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # pragma: no cover - defensive
+            log.exception("Spotify player poller for %s crashed", state.channel_id)
+        finally:
+            if state.task is asyncio.current_task():
+                state.task = None
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Optional
+
+import httpx
+
+
+log = logging.getLogger("roomcast")
+
+PRIORITY_CONTROL = 0
+PRIORITY_PLAYER = 1
+PRIORITY_CATALOG = 2
+PRIORITY_NAMES = {PRIORITY_CONTROL: "control", PRIORITY_PLAYER: "player", PRIORITY_CATALOG: "catalog"}
+
+
+def request_priority(method: str, path: str) -> int:
+    """Default class for a Web API call: writes are playback control, /me/player reads are player state."""
+    if method.upper() != "GET":
+        return PRIORITY_CONTROL
+    if path.startswith("/me/player"):
+        return PRIORITY_PLAYER
+    return PRIORITY_CATALOG
+
+
+def retry_after_seconds(resp: httpx.Response, default: float = 1.0) -> float:
+    value = resp.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else default
+    except ValueError:
+        return default
+
+
+class SpotifyRequestScheduler:
+    """Admission control for one Spotify source's Web API calls.
+
+    Calls take a token from a bucket refilled at ``rate`` per second (up to ``burst``)
+    and are admitted in priority order: control, then player state, then catalog
+    browsing. Control calls are not bound by ``max_concurrency`` so bulk browsing cannot
+    hold them up. A 429 pauses the whole source for its ``Retry-After`` and the call is
+    retried when that wait is at most ``max_retry_after``; otherwise the 429 is returned.
+    Identical GETs in flight at the same time share one response.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = 10.0,
+        burst: int = 20,
+        max_concurrency: int = 8,
+        max_retry_after: float = 10.0,
+        max_retries: int = 2,
+    ) -> None:
+        self._rate = max(0.1, float(rate))
+        self._burst = max(1.0, float(burst))
+        self._max_concurrency = max(1, int(max_concurrency))
+        self._max_retry_after = max(0.0, float(max_retry_after))
+        self._max_retries = max(0, int(max_retries))
+        self._tokens = self._burst
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._merging: dict[Hashable, asyncio.Task] = {}
+        self.stats = {
+            "admitted": {name: 0 for name in PRIORITY_NAMES.values()},
+            "queued_total": 0,
+            "merged": 0,
+            "throttled": 0,
+            "retried": 0,
+            "throttled_returned": 0,
+            "wait_ms_max": 0.0,
+        }
+
+    async def submit(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        *,
+        priority: int = PRIORITY_CATALOG,
+        merge_key: Optional[Hashable] = None,
+    ) -> httpx.Response:
+        if merge_key is None:
+            return await self._run(send, priority)
+        task = self._merging.get(merge_key)
+        if task is not None and not task.done():
+            self.stats["merged"] += 1
+            return await asyncio.shield(task)
+        task = self._merging[merge_key] = asyncio.create_task(self._run(send, priority))
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done() and self._merging.get(merge_key) is task:
+                self._merging.pop(merge_key, None)
+
+    def diagnostics(self) -> dict:
+        self._refill(time.monotonic())
+        depth: dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                depth[PRIORITY_NAMES.get(priority, "catalog")] += 1
+        return {
+            "active": self._active,
+            "queue_depth": depth,
+            "tokens": round(self._tokens, 2),
+            "blocked_for": round(max(0.0, self._blocked_until - time.monotonic()), 3),
+            **self.stats,
+        }
+
+    def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for _, _, future in self._waiters:
+            if not future.done():
+                future.cancel()
+        self._waiters.clear()
+
+    async def _run(self, send: Callable[[], Awaitable[httpx.Response]], priority: int) -> httpx.Response:
+        attempt = 0
+        while True:
+            await self._acquire(priority)
+            try:
+                resp = await send()
+            finally:
+                self._release()
+            if resp.status_code != 429:
+                return resp
+            wait = retry_after_seconds(resp)
+            self.stats["throttled"] += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + wait)
+            if attempt >= self._max_retries or wait > self._max_retry_after:
+                self.stats["throttled_returned"] += 1
+                return resp
+            attempt += 1
+            self.stats["retried"] += 1
+            log.info("Spotify rate limited; retrying %s call in %.1fs", PRIORITY_NAMES.get(priority), wait)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self._burst, self._tokens + (now - self._refilled_at) * self._rate)
+        self._refilled_at = now
+
+    def _admissible(self, priority: int) -> bool:
+        return priority == PRIORITY_CONTROL or self._active < self._max_concurrency
+
+    async def _acquire(self, priority: int) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and now >= self._blocked_until and self._tokens >= 1 and self._admissible(priority):
+            self._admit(priority)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self.stats["queued_total"] += 1
+        self._pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as we were cancelled: hand the slot back.
+                self._release()
+            raise
+        waited_ms = (time.monotonic() - now) * 1000
+        self.stats["wait_ms_max"] = round(max(self.stats["wait_ms_max"], waited_ms), 3)
+
+    def _admit(self, priority: int) -> None:
+        self._tokens -= 1
+        self._active += 1
+        self.stats["admitted"][PRIORITY_NAMES.get(priority, "catalog")] += 1
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._pump()
+
+    def _pump(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            now = time.monotonic()
+            self._refill(now)
+            delay = max(self._blocked_until - now, (1 - self._tokens) / self._rate if self._tokens < 1 else 0.0)
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._pump)
+                return
+            if not self._admissible(priority):
+                # Woken again by the next release.
+                return
+            heapq.heappop(self._waiters)
+            self._admit(priority)
+            future.set_result(None)
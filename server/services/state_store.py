@@ -0,0 +1,376 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+
+log = logging.getLogger("roomcast")
+
+
+def write_json_atomic(path: Path, data: Any, *, indent: Optional[int] = 2, sort_keys: bool = False) -> None:
+    """Replace ``path`` with the JSON encoding of ``data`` via temp file, fsync and rename."""
+    encoded = json.dumps(data, indent=indent, sort_keys=sort_keys)
+    directory = path.parent
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as handle:
+            handle.write(encoded)
+            handle.flush()
+            os.fsync(handle.fileno())
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+class JsonFileStore:
+    """Default state backend: one JSON document per file.
+
+    ``documents`` maps the well-known state files to document names, which is what
+    ``export`` uses as keys.
+    """
+
+    backend = "json"
+
+    def __init__(self, documents: dict[Path, str]) -> None:
+        self._documents = dict(documents)
+
+    def exists(self, path: Path) -> bool:
+        return path.exists()
+
+    def read(self, path: Path) -> Any:
+        return json.loads(path.read_text())
+
+    def write(self, path: Path, data: Any, *, indent: Optional[int] = 2, sort_keys: bool = False) -> None:
+        write_json_atomic(path, data, indent=indent, sort_keys=sort_keys)
+
+    def export(self) -> dict:
+        exported: dict[str, Any] = {}
+        for path, name in self._documents.items():
+            if not path.exists():
+                continue
+            try:
+                exported[name] = self.read(path)
+            except (OSError, ValueError) as exc:
+                log.warning("Skipping %s in state export: %s", path, exc)
+        return exported
+
+    def stats(self) -> dict:
+        return {"backend": self.backend}
+
+    def close(self) -> None:
+        return None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    skeleton TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    document TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    host TEXT,
+    fingerprint TEXT,
+    channel_id TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (document, key)
+);
+CREATE INDEX IF NOT EXISTS records_host ON records (document, host);
+CREATE INDEX IF NOT EXISTS records_fingerprint ON records (document, fingerprint);
+CREATE INDEX IF NOT EXISTS records_channel ON records (document, channel_id);
+"""
+
+_ROWS = "$rows"
+_KEYS = "$keys"
+
+
+def _is_entity_list(value: Any) -> bool:
+    if not isinstance(value, list) or not value:
+        return False
+    ids = [item.get("id") if isinstance(item, dict) else None for item in value]
+    return all(isinstance(item_id, str) and item_id for item_id in ids) and len(set(ids)) == len(ids)
+
+
+def _split_document(data: Any) -> tuple[Any, dict[str, Any]]:
+    """Split a document into a skeleton and one row per entity.
+
+    Lists of dicts with unique ``id`` values (at the top level or one level down) and
+    dicts whose values are all dicts become rows, so changing one entity only
+    rewrites its row.
+    """
+    rows: dict[str, Any] = {}
+
+    def _take(items: list[dict], prefix: str) -> dict:
+        keys = []
+        for item in items:
+            key = f"{prefix}{item['id']}"
+            rows[key] = item
+            keys.append(key)
+        return {_ROWS: keys}
+
+    if _is_entity_list(data):
+        return _take(data, ""), rows
+    if isinstance(data, dict):
+        if data and all(isinstance(value, dict) for value in data.values()):
+            rows.update(data)
+            return {_KEYS: list(data)}, rows
+        skeleton = {}
+        for key, value in data.items():
+            skeleton[key] = _take(value, f"{key}/") if _is_entity_list(value) else value
+        return skeleton, rows
+    return data, rows
+
+
+def _join_document(skeleton: Any, rows: dict[str, Any]) -> Any:
+    def _rows(marker: Any) -> Optional[list]:
+        if isinstance(marker, dict) and set(marker) == {_ROWS}:
+            return [rows[key] for key in marker[_ROWS] if key in rows]
+        return None
+
+    whole = _rows(skeleton)
+    if whole is not None:
+        return whole
+    if isinstance(skeleton, dict) and set(skeleton) == {_KEYS}:
+        return {key: rows[key] for key in skeleton[_KEYS] if key in rows}
+    if isinstance(skeleton, dict):
+        joined = {}
+        for key, value in skeleton.items():
+            nested = _rows(value)
+            joined[key] = nested if nested is not None else value
+        return joined
+    return skeleton
+
+
+def _index_columns(row: Any) -> tuple[Optional[str], Optional[str], Optional[str]]:
+    if not isinstance(row, dict):
+        return None, None, None
+    host = None
+    url = row.get("url")
+    if isinstance(url, str) and url:
+        try:
+            host = urlparse(url).hostname
+        except ValueError:
+            host = None
+    fingerprint = row.get("fingerprint") if isinstance(row.get("fingerprint"), str) else None
+    channel_id = row.get("channel_id") if isinstance(row.get("channel_id"), str) else None
+    return host, fingerprint, channel_id
+
+
+class SqliteStateStore:
+    """State backend keeping every document in one SQLite database (WAL mode).
+
+    Documents are split into rows per entity (see ``_split_document``) and writes only
+    touch rows whose encoding changed. Paths that are not registered documents fall
+    through to plain JSON files. On first open, registered documents that only exist
+    as JSON files are imported once; the files are left in place as a backup.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, db_path: Path, documents: dict[Path, str]) -> None:
+        self._db_path = db_path
+        self._documents = dict(documents)
+        self._files = JsonFileStore(documents)
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._skeletons: dict[str, str] = {}
+        self._rows: dict[str, dict[str, str]] = {}
+        self._stats = {"reads": 0, "writes": 0, "rows_written": 0, "rows_deleted": 0, "rows_unchanged": 0}
+        self._migrate_from_files()
+
+    def exists(self, path: Path) -> bool:
+        name = self._documents.get(path)
+        if name is None:
+            return self._files.exists(path)
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM documents WHERE name = ?", (name,)).fetchone() is not None
+
+    def read(self, path: Path) -> Any:
+        name = self._documents.get(path)
+        if name is None:
+            return self._files.read(path)
+        with self._lock:
+            data = self._read_document(name)
+        if data is None:
+            raise FileNotFoundError(str(path))
+        return data
+
+    def write(self, path: Path, data: Any, *, indent: Optional[int] = 2, sort_keys: bool = False) -> None:
+        name = self._documents.get(path)
+        if name is None:
+            self._files.write(path, data, indent=indent, sort_keys=sort_keys)
+            return
+        with self._lock:
+            self._write_document(name, data)
+
+    def find(
+        self,
+        path: Path,
+        *,
+        host: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        channel_id: Optional[str] = None,
+    ) -> list[Any]:
+        """Indexed lookup of a document's rows by host, fingerprint or channel."""
+        name = self._documents.get(path)
+        if name is None:
+            return []
+        clauses = ["document = ?"]
+        params: list[Any] = [name]
+        for column, value in (("host", host), ("fingerprint", fingerprint), ("channel_id", channel_id)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT data FROM records WHERE {' AND '.join(clauses)}", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def export(self) -> dict:
+        exported: dict[str, Any] = {}
+        with self._lock:
+            for (name,) in self._conn.execute("SELECT name FROM documents ORDER BY name").fetchall():
+                data = self._read_document(name)
+                if data is not None:
+                    exported[name] = data
+        return exported
+
+    def stats(self) -> dict:
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            records = self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        return {
+            "backend": self.backend,
+            "path": str(self._db_path),
+            "documents": documents,
+            "records": records,
+            **self._stats,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _read_document(self, name: str) -> Any:
+        self._stats["reads"] += 1
+        row = self._conn.execute("SELECT skeleton FROM documents WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        encoded_rows = {
+            key: data
+            for key, data in self._conn.execute("SELECT key, data FROM records WHERE document = ?", (name,)).fetchall()
+        }
+        self._skeletons[name] = row[0]
+        self._rows[name] = dict(encoded_rows)
+        return _join_document(json.loads(row[0]), {key: json.loads(data) for key, data in encoded_rows.items()})
+
+    def _write_document(self, name: str, data: Any) -> None:
+        if name not in self._rows:
+            self._load_cache(name)
+        skeleton, rows = _split_document(data)
+        encoded_skeleton = json.dumps(skeleton, sort_keys=True)
+        encoded_rows = {key: json.dumps(row, sort_keys=True) for key, row in rows.items()}
+        previous = self._rows.get(name, {})
+        changed = {key: value for key, value in encoded_rows.items() if previous.get(key) != value}
+        removed = [key for key in previous if key not in encoded_rows]
+        now = time.time()
+        self._conn.execute("BEGIN")
+        try:
+            if self._skeletons.get(name) != encoded_skeleton:
+                self._conn.execute(
+                    "INSERT INTO documents (name, skeleton, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET skeleton = excluded.skeleton, updated_at = excluded.updated_at",
+                    (name, encoded_skeleton, now),
+                )
+            for key, encoded in changed.items():
+                host, fingerprint, channel_id = _index_columns(rows[key])
+                self._conn.execute(
+                    "INSERT INTO records (document, key, data, host, fingerprint, channel_id, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(document, key) DO UPDATE SET data = excluded.data, host = excluded.host, "
+                    "fingerprint = excluded.fingerprint, channel_id = excluded.channel_id, "
+                    "updated_at = excluded.updated_at",
+                    (name, key, encoded, host, fingerprint, channel_id, now),
+                )
+            if removed:
+                self._conn.executemany(
+                    "DELETE FROM records WHERE document = ? AND key = ?",
+                    [(name, key) for key in removed],
+                )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._skeletons[name] = encoded_skeleton
+        self._rows[name] = encoded_rows
+        self._stats["writes"] += 1
+        self._stats["rows_written"] += len(changed)
+        self._stats["rows_deleted"] += len(removed)
+        self._stats["rows_unchanged"] += len(encoded_rows) - len(changed)
+
+    def _load_cache(self, name: str) -> None:
+        row = self._conn.execute("SELECT skeleton FROM documents WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            self._skeletons[name] = row[0]
+        self._rows[name] = {
+            key: data
+            for key, data in self._conn.execute("SELECT key, data FROM records WHERE document = ?", (name,)).fetchall()
+        }
+
+    def _migrate_from_files(self) -> None:
+        imported = []
+        with self._lock:
+            for path, name in self._documents.items():
+                if self._conn.execute("SELECT 1 FROM documents WHERE name = ?", (name,)).fetchone():
+                    continue
+                if not path.exists():
+                    continue
+                try:
+                    data = self._files.read(path)
+                except (OSError, ValueError) as exc:
+                    log.warning("Not importing %s into the state database: %s", path, exc)
+                    continue
+                self._write_document(name, data)
+                imported.append(name)
+            if imported:
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('migrated_at', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (str(time.time()),),
+                )
+        if imported:
+            log.info("Imported %s into %s", ", ".join(sorted(imported)), self._db_path)
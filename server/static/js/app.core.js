@@ -534,6 +534,7 @@ function stopDataPolling() {
     playerPollTimer = null;
   }
   stopNodeSocket();
+  stopPlayerSocket();
   setWebNodeRequests([]);
   resetChannelUiState();
   stopPrivateBrowserNodeSession({ unregister: false, silent: true });
@@ -768,6 +769,7 @@ async function handleBrowserNodeToggle(evt) {
 function startDataPolling() {
   if (!isAuthenticated()) return;
   startNodeSocket();
+  startPlayerSocket();
   const runNodePoll = () => {
     if (nodesSocketConnected) return;
     fetchNodes();
@@ -213,6 +213,12 @@ async function discoverNodes() {
       discoverStatus.textContent = `Scanning ${nets} (${payload.host_count ?? '?'} hosts)${limited}.`;
       return;
     }
+    if (payload.type === 'prescan') {
+      if (!discoverResultsCount) {
+        discoverStatus.textContent = `Probing ${payload.responsive ?? 0} responsive host${payload.responsive === 1 ? '' : 's'}…`;
+      }
+      return;
+    }
     if (payload.type === 'discovered') {
       if (discoverResultsCount === 0) {
         discoverList.innerHTML = '';
@@ -74,6 +74,9 @@ async function fetchPlayerStatus() {
       setPlayerIdleState('No music provider configured', { forceClear: true });
       return;
     }
+    if (isRadioChannel(channel) || isAudiobookshelfChannel(channel)) {
+      watchPlayerSocketChannel(null);
+    }
     if (isRadioChannel(channel)) {
       await fetchRadioPlaybackStatus(channel);
       return;
@@ -82,6 +85,8 @@ async function fetchPlayerStatus() {
       await fetchAudiobookshelfPlaybackStatus(channel);
       return;
     }
+    watchPlayerSocketChannel(channel.id);
+    if (isPlayerSocketLive(channel.id)) return;
     await fetchSpotifyPlayerStatus(channel.id);
   } finally {
     fetchPlayerStatusInFlight = false;
@@ -96,25 +101,7 @@ async function fetchSpotifyPlayerStatus(channelId) {
     const res = await fetch(withChannel('/api/spotify/player/status', channelId), { signal: controller.signal });
     clearTimeout(timeoutId);
     await ensureOk(res);
-    playerStatus = await res.json();
-    const serverSnapshot = hydrateServerSnapshot(playerStatus?.snapshot);
-    if (serverSnapshot) {
-      delete playerStatus.snapshot;
-    }
-    const cachedSnapshot = !playerStatus?.active ? getPlayerSnapshot() : null;
-    if (!playerStatus?.active && cachedSnapshot) {
-      playerStatus = {
-        ...playerStatus,
-        item: playerStatus?.item || cachedSnapshot.item,
-        context: playerStatus?.context || cachedSnapshot.context,
-        shuffle_state: playerStatus?.shuffle_state ?? cachedSnapshot.shuffle_state,
-        repeat_state: playerStatus?.repeat_state ?? cachedSnapshot.repeat_state,
-        allowResume: true,
-        __fromSnapshot: true,
-      };
-    }
-    renderPlayer(playerStatus);
-    markSpotifyHealthy();
+    applySpotifyPlayerStatus(await res.json());
   } catch (err) {
     if (err?.name === 'AbortError') return;
     setPlayerIdleState('Player unavailable');
@@ -122,6 +109,142 @@ async function fetchSpotifyPlayerStatus(channelId) {
   }
 }
 
+function applySpotifyPlayerStatus(status) {
+  playerStatus = status;
+  const serverSnapshot = hydrateServerSnapshot(playerStatus?.snapshot);
+  if (serverSnapshot) {
+    delete playerStatus.snapshot;
+  }
+  const cachedSnapshot = !playerStatus?.active ? getPlayerSnapshot() : null;
+  if (!playerStatus?.active && cachedSnapshot) {
+    playerStatus = {
+      ...playerStatus,
+      item: playerStatus?.item || cachedSnapshot.item,
+      context: playerStatus?.context || cachedSnapshot.context,
+      shuffle_state: playerStatus?.shuffle_state ?? cachedSnapshot.shuffle_state,
+      repeat_state: playerStatus?.repeat_state ?? cachedSnapshot.repeat_state,
+      allowResume: true,
+      __fromSnapshot: true,
+    };
+  }
+  renderPlayer(playerStatus);
+  markSpotifyHealthy();
+}
+
+let playerSocket = null;
+let playerSocketRetryTimer = null;
+let playerSocketRetryAttempt = 0;
+let playerSocketShouldConnect = false;
+let playerSocketChannelId = null;
+let playerSocketLiveChannelId = null;
+
+function getPlayerSocketUrl() {
+  const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+  return `${protocol}//${window.location.host}/ws/spotify/player`;
+}
+
+function isPlayerSocketLive(channelId) {
+  return !!channelId && playerSocketLiveChannelId === channelId && playerSocket?.readyState === WebSocket.OPEN;
+}
+
+function sendPlayerSocketSubscription() {
+  if (!playerSocket || playerSocket.readyState !== WebSocket.OPEN) return;
+  try {
+    playerSocket.send(JSON.stringify({ type: 'subscribe', channel_id: playerSocketChannelId }));
+  } catch (_) {
+    /* close handler reconnects and resubscribes */
+  }
+}
+
+function watchPlayerSocketChannel(channelId) {
+  const next = channelId || null;
+  if (next === playerSocketChannelId) return;
+  playerSocketChannelId = next;
+  playerSocketLiveChannelId = null;
+  sendPlayerSocketSubscription();
+}
+
+function schedulePlayerSocketReconnect() {
+  if (!playerSocketShouldConnect || playerSocketRetryTimer) return;
+  const delay = Math.min(1500 * (2 ** playerSocketRetryAttempt), 30000);
+  playerSocketRetryAttempt = Math.min(playerSocketRetryAttempt + 1, 6);
+  playerSocketRetryTimer = setTimeout(() => {
+    playerSocketRetryTimer = null;
+    if (playerSocketShouldConnect && !playerSocket) startPlayerSocket();
+  }, delay);
+}
+
+function handlePlayerSocketOpen() {
+  playerSocketRetryAttempt = 0;
+  sendPlayerSocketSubscription();
+}
+
+function handlePlayerSocketMessage(event) {
+  let payload;
+  try {
+    payload = JSON.parse(event?.data || '');
+  } catch (_) {
+    return;
+  }
+  if (!payload?.channel_id || payload.channel_id !== playerSocketChannelId) return;
+  if (payload.channel_id !== getActiveChannelId()) return;
+  if (payload.type === 'player_status') {
+    playerSocketLiveChannelId = payload.channel_id;
+    applySpotifyPlayerStatus(payload.status || { active: false });
+    return;
+  }
+  if (payload.type === 'player_error') {
+    playerSocketLiveChannelId = payload.channel_id;
+    setPlayerIdleState('Player unavailable');
+    reportSpotifyError(payload.detail);
+  }
+}
+
+function handlePlayerSocketClose(event) {
+  if (event?.target !== playerSocket) return;
+  playerSocket = null;
+  playerSocketLiveChannelId = null;
+  if (playerSocketShouldConnect) schedulePlayerSocketReconnect();
+}
+
+function startPlayerSocket() {
+  if (!isAuthenticated()) return;
+  playerSocketShouldConnect = true;
+  if (playerSocket) return;
+  let socket;
+  try {
+    socket = new WebSocket(getPlayerSocketUrl());
+  } catch (_) {
+    schedulePlayerSocketReconnect();
+    return;
+  }
+  playerSocket = socket;
+  socket.addEventListener('open', handlePlayerSocketOpen);
+  socket.addEventListener('message', handlePlayerSocketMessage);
+  socket.addEventListener('close', handlePlayerSocketClose);
+  socket.addEventListener('error', () => socket.close());
+}
+
+function stopPlayerSocket() {
+  playerSocketShouldConnect = false;
+  playerSocketRetryAttempt = 0;
+  playerSocketChannelId = null;
+  playerSocketLiveChannelId = null;
+  if (playerSocketRetryTimer) {
+    clearTimeout(playerSocketRetryTimer);
+    playerSocketRetryTimer = null;
+  }
+  const socket = playerSocket;
+  playerSocket = null;
+  if (socket) {
+    try {
+      socket.close();
+    } catch (_) {
+      /* ignore close errors */
+    }
+  }
+}
+
 async function fetchRadioPlaybackStatus(channel) {
   if (!channel?.id) return;
   try {
@@ -558,6 +681,8 @@ function noteOptimisticSeek(requestedProgress) {
   playerTimeCurrent.textContent = msToTime(clamped);
   if (playerStatus) {
     playerStatus.progress_ms = clamped;
+    playerStatus.__progressBase = clamped;
+    playerStatus.__progressAt = performance.now();
   }
 }
 
@@ -655,6 +780,9 @@ function renderPlayer(status) {
   setRangeProgress(playerSeek, displayProgress, duration || 1);
   playerTimeCurrent.textContent = msToTime(displayProgress);
   status.progress_ms = displayProgress;
+  // Progress between updates is interpolated from the last reported position.
+  status.__progressBase = displayProgress;
+  status.__progressAt = performance.now();
   playerTimeTotal.textContent = msToTime(duration);
   const playing = !!status?.is_playing && active;
   setPlayButtonIcon(playing);
@@ -686,7 +814,9 @@ function renderPlayer(status) {
   if (active) {
     playerTick = setInterval(() => {
       if (!playerStatus || !playerStatus.is_playing) return;
-      playerStatus.progress_ms = (playerStatus.progress_ms || 0) + 1000;
+      const base = playerStatus.__progressBase ?? playerStatus.progress_ms ?? 0;
+      const since = performance.now() - (playerStatus.__progressAt ?? performance.now());
+      playerStatus.progress_ms = Math.round(base + since);
       if (playerStatus.progress_ms > (playerStatus.item?.duration_ms || 0)) {
         playerStatus.progress_ms = playerStatus.item?.duration_ms || 0;
       }
@@ -779,6 +909,7 @@ function buildPlayerContextMenuActions() {
           station_id: state.station_id,
           name: state.station_name,
           stream_url: state.stream_url,
+          source_url: state.source_url || null,
           country: state.station_country || null,
           countrycode: state.station_countrycode || null,
           bitrate: state.bitrate || null,
@@ -423,6 +423,7 @@ async function tuneRadioStation(channelId, station, btn) {
       station_id: station.station_id,
       name: station.name || 'Radio station',
       stream_url: station.stream_url,
+      source_url: station.source_url || null,
       country: station.country,
       countrycode: station.countrycode,
       bitrate: station.bitrate,
@@ -2109,6 +2110,7 @@ function flushPendingNodeVolumeUpdate(nodeId) {
 }
 
 let nodesCache = [];
+let nodesRevision = null;
 let nodeSectionsCache = [];
 let nodeSectionsEditMode = false;
 let nodeDragActive = false;
@@ -2489,15 +2491,15 @@ function handleNodesSocketMessage(event) {
     return;
   }
   if (payload?.type === 'nodes' && Array.isArray(payload.nodes)) {
+    nodesRevision = Number.isInteger(payload.revision) ? payload.revision : null;
     if (Array.isArray(payload.sections)) {
       setNodeSections(payload.sections);
     }
-    if (isNodeSectionEditMode()) {
-      // Avoid destroying in-progress edits; save/cancel will refresh.
-      nodesCache = payload.nodes;
-      return;
-    }
-    renderNodes(payload.nodes);
+    applyNodesFromSocket(payload.nodes);
+    return;
+  }
+  if (payload?.type === 'nodes_patch') {
+    handleNodesPatch(payload);
     return;
   }
   if (payload?.type === 'web_node_requests' && Array.isArray(payload.requests)) {
@@ -2509,6 +2511,71 @@ function handleNodesSocketMessage(event) {
   }
 }
 
+function applyNodesFromSocket(nodes) {
+  if (isNodeSectionEditMode()) {
+    // Avoid destroying in-progress edits; save/cancel will refresh.
+    nodesCache = nodes;
+    return;
+  }
+  renderNodes(nodes);
+}
+
+function requestNodesResync(revision) {
+  if (!nodesSocket || nodesSocket.readyState !== WebSocket.OPEN) return;
+  try {
+    nodesSocket.send(JSON.stringify({ type: 'resync', revision: Number.isInteger(revision) ? revision : -1 }));
+  } catch (_) {
+    /* socket close handler reconnects and receives a fresh snapshot */
+  }
+}
+
+function handleNodesPatch(patch) {
+  if (!Number.isInteger(patch.revision)) return;
+  if (nodesRevision !== null && patch.revision <= nodesRevision) return;
+  if (nodesRevision === null || patch.base !== nodesRevision) {
+    requestNodesResync(nodesRevision);
+    return;
+  }
+  const byId = new Map(nodesCache.map(node => [node.id, node]));
+  const changes = Array.isArray(patch.changes) ? patch.changes : [];
+  for (const change of changes) {
+    if (!change?.id) continue;
+    if (change.node) {
+      byId.set(change.id, change.node);
+      continue;
+    }
+    const existing = byId.get(change.id);
+    if (!existing) {
+      // The node just became visible to us; only a full snapshot carries all its fields.
+      requestNodesResync(-1);
+      return;
+    }
+    const updated = { ...existing, ...(change.fields || {}) };
+    if (Array.isArray(change.unset)) {
+      change.unset.forEach(key => delete updated[key]);
+    }
+    byId.set(change.id, updated);
+  }
+  if (Array.isArray(patch.removed)) {
+    patch.removed.forEach(nodeId => byId.delete(nodeId));
+  }
+  let nodes;
+  if (Array.isArray(patch.order)) {
+    nodes = patch.order.map(nodeId => byId.get(nodeId)).filter(Boolean);
+  } else {
+    nodes = nodesCache.map(node => byId.get(node.id)).filter(Boolean);
+    const known = new Set(nodes.map(node => node.id));
+    byId.forEach((node, nodeId) => {
+      if (!known.has(nodeId)) nodes.push(node);
+    });
+  }
+  nodesRevision = patch.revision;
+  if (Array.isArray(patch.sections)) {
+    setNodeSections(patch.sections);
+  }
+  applyNodesFromSocket(nodes);
+}
+
 function handleWebNodeRequestBroadcast(payload) {
   if (!payload || typeof payload !== 'object') return;
   const action = payload.action;
@@ -2526,6 +2593,7 @@ function handleNodesSocketClose(event) {
   if (event?.target !== nodesSocket) return;
   nodesSocketConnected = false;
   nodesSocket = null;
+  nodesRevision = null;
   if (nodesSocketShouldConnect) {
     scheduleNodeSocketReconnect();
   }
@@ -691,10 +691,12 @@ class WebAudioRelay:
         channel_idle_timeout: float = 10.0,
         assign_stream: Optional[Callable[[str, str], Awaitable[None]]] = None,
         on_session_closed: Optional[Callable[[str], Awaitable[None]]] = None,
+        on_listeners_changed: Optional[Callable[[str], None]] = None,
     ) -> None:
         self._sample_rate = max(8000, min(192000, int(sample_rate)))
         self._sessions: Dict[str, WebNodeSession] = {}
         self._on_session_closed = on_session_closed
+        self._on_listeners_changed = on_listeners_changed
         self._rtc_config = RTCConfiguration(iceServers=[RTCIceServer("stun:stun.l.google.com:19302")])
         self._lock = asyncio.Lock()
         self._snap_host = snap_host
@@ -862,6 +864,7 @@ class WebAudioRelay:
             stop_task = self._channel_stop_tasks.pop(channel_id, None)
         if stop_task:
             stop_task.cancel()
+        self._listeners_changed(channel_id)
         return await source.broadcaster.subscribe()
 
     async def _unsubscribe_channel(self, channel_id: str, queue: asyncio.Queue[AudioChunk]) -> None:
@@ -872,9 +875,18 @@ class WebAudioRelay:
             source.ref_count = max(0, source.ref_count - 1)
             should_stop = source.ref_count == 0
         await source.broadcaster.unsubscribe(queue)
+        self._listeners_changed(channel_id)
         if should_stop:
             self._schedule_channel_stop(channel_id)
 
+    def _listeners_changed(self, channel_id: str) -> None:
+        if not self._on_listeners_changed:
+            return
+        try:
+            self._on_listeners_changed(channel_id)
+        except Exception:  # pragma: no cover - defensive
+            log.exception("WebRTC listener change callback failed")
+
     def _schedule_channel_stop(self, channel_id: str) -> None:
         if channel_id in self._channel_stop_tasks:
             return